@@ -0,0 +1,116 @@
+"""
+Бенчмарк конкурентности хендлеров при медленном запросе к БД
+
+Сравнивает синхронные сессии SQLAlchemy (как было раньше в DatabaseService)
+с асинхронным DatabaseService. Медленный запрос имитируется SQL-функцией
+slow_query(seconds), которая спит внутри драйвера SQLite.
+
+Запуск:
+    python -m benchmarks.bench_db_concurrency --handlers 10 --delay 0.2
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from src.services.database import DatabaseService
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Измерение максимальной задержки event loop"""
+    max_lag = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - started - interval)
+    return max_lag
+
+
+async def _run(handler, handlers: int) -> tuple[float, float]:
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(handlers)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return elapsed, await heartbeat
+
+
+async def bench_sync(database_url: str, handlers: int, delay: float) -> tuple[float, float]:
+    """До: синхронная сессия внутри async-хендлера"""
+    engine = create_engine(database_url)
+    event.listen(
+        engine, 'connect',
+        lambda conn, _: conn.create_function('slow_query', 1, _sleep)
+    )
+    SessionLocal = sessionmaker(bind=engine)
+
+    @contextmanager
+    def get_session():
+        session = SessionLocal()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    async def handler():
+        with get_session() as session:
+            session.execute(text('SELECT slow_query(:delay)'), {'delay': delay})
+
+    try:
+        return await _run(handler, handlers)
+    finally:
+        engine.dispose()
+
+
+async def bench_async(database_url: str, handlers: int, delay: float) -> tuple[float, float]:
+    """После: AsyncSession из DatabaseService"""
+    db = DatabaseService(database_url)
+
+    @event.listens_for(db.engine.sync_engine, 'connect')
+    def register_slow_query(dbapi_connection, _):
+        dbapi_connection.run_async(
+            lambda conn: conn.create_function('slow_query', 1, _sleep)
+        )
+
+    async def handler():
+        async with db.get_session() as session:
+            await session.execute(text('SELECT slow_query(:delay)'), {'delay': delay})
+
+    try:
+        return await _run(handler, handlers)
+    finally:
+        await db.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--handlers', type=int, default=10)
+    parser.add_argument('--delay', type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        for name, bench in (('sync', bench_sync), ('async', bench_async)):
+            elapsed, max_lag = await bench(database_url, args.handlers, args.delay)
+            print(
+                f"{name:>5}: {args.handlers} хендлеров × {args.delay:.2f} c — "
+                f"общее время {elapsed:.2f} c, "
+                f"макс. задержка event loop {max_lag * 1000:.0f} мс"
+            )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+"""
+Бенчмарк статистики использования для группы пользователей
+
+Сравнивает цикл по пользователям с четырьмя запросами count()
+(как было раньше в AnalyticsService.get_user_statistics), цикл
+с одним запросом на пользователя и пакетный get_bulk_user_statistics.
+SQLite работает в процессе, поэтому выигрыш от сокращения числа запросов
+на пользователя здесь меньше, чем с PostgreSQL по сети.
+
+Запуск:
+    python -m benchmarks.bench_user_statistics --users 1000 10000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from src.models.goal import Goal, GoalStatus
+from src.models.sleep_weight import SleepRecord
+from src.models.transaction import Transaction
+from src.models.workout import Exercise
+from src.services.analytics import AnalyticsService
+from src.services.database import DatabaseService
+
+
+async def seed(db: DatabaseService, users: int):
+    """Заполнение БД: несколько транзакций, упражнений, записей сна и целей на пользователя"""
+    now = datetime.utcnow()
+    rnd = random.Random(42)
+
+    def moment():
+        # Не ближе суток к границе недельного окна, чтобы прогоны разных
+        # вариантов в разное время давали одинаковый результат
+        return now - timedelta(days=rnd.choice((rnd.uniform(0, 6), rnd.uniform(8, 14))))
+
+    transactions, exercises, sleep_records, goals = [], [], [], []
+    for user_id in range(1, users + 1):
+        for _ in range(rnd.randint(0, 10)):
+            transactions.append({
+                'user_id': user_id, 'category_id': 1, 'amount': 100, 'created_at': moment()
+            })
+        for _ in range(rnd.randint(0, 6)):
+            exercises.append({
+                'user_id': user_id, 'name': 'bench', 'weight': 60, 'reps': 8, 'sets': 3,
+                'workout_date': now, 'created_at': moment()
+            })
+        for _ in range(rnd.randint(0, 7)):
+            started = moment()
+            sleep_records.append({
+                'user_id': user_id, 'sleep_time': started,
+                'wake_time': started + timedelta(hours=8), 'created_at': started
+            })
+        for _ in range(rnd.randint(0, 2)):
+            goals.append({
+                'user_id': user_id, 'title': 'goal', 'goal_type': 'weight',
+                'target_value': 70, 'start_value': 80, 'current_value': 80,
+                'deadline': now + timedelta(days=30), 'status': GoalStatus.ACTIVE.value,
+                'created_at': now
+            })
+
+    async with db.get_session() as session:
+        for model, rows in (
+            (Transaction, transactions),
+            (Exercise, exercises),
+            (SleepRecord, sleep_records),
+            (Goal, goals)
+        ):
+            if rows:
+                await session.execute(model.__table__.insert(), rows)
+
+
+async def legacy_user_statistics(db: DatabaseService, user_id: int, days: int = 7) -> dict:
+    """До: четыре отдельных запроса count() на пользователя"""
+    start_date = datetime.utcnow() - timedelta(days=days)
+    async with db.get_session() as session:
+        return {
+            'total_transactions': await session.scalar(
+                select(func.count(Transaction.id))
+                .where(Transaction.user_id == user_id, Transaction.created_at >= start_date)
+            ),
+            'total_workouts': await session.scalar(
+                select(func.count(Exercise.id))
+                .where(Exercise.user_id == user_id, Exercise.created_at >= start_date)
+            ),
+            'sleep_records': await session.scalar(
+                select(func.count(SleepRecord.id))
+                .where(SleepRecord.user_id == user_id, SleepRecord.created_at >= start_date)
+            ),
+            'active_goals': await session.scalar(
+                select(func.count(Goal.id))
+                .where(Goal.user_id == user_id, Goal.status == GoalStatus.ACTIVE.value)
+            )
+        }
+
+
+async def bench(database_url: str, users: int):
+    db = DatabaseService(database_url)
+    await db.create_tables()
+    await seed(db, users)
+    analytics = AnalyticsService(db)
+    user_ids = list(range(1, users + 1))
+
+    try:
+        started = time.perf_counter()
+        legacy = {user_id: await legacy_user_statistics(db, user_id) for user_id in user_ids}
+        legacy_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        single = {user_id: await analytics.get_user_statistics(user_id) for user_id in user_ids}
+        single_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        bulk = await analytics.get_bulk_user_statistics(user_ids)
+        bulk_elapsed = time.perf_counter() - started
+
+        assert legacy == single == bulk, "результаты расходятся"
+
+        for name, elapsed in (
+            ('4 запроса/польз.', legacy_elapsed),
+            ('1 запрос/польз.', single_elapsed),
+            ('пакетно', bulk_elapsed)
+        ):
+            print(
+                f"{users:>6} пользователей, {name:>16}: {elapsed:.2f} c "
+                f"(x{legacy_elapsed / elapsed:.1f})"
+            )
+    finally:
+        await db.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+
+    for users in args.users:
+        with tempfile.TemporaryDirectory() as tmp:
+            await bench(f"sqlite:///{os.path.join(tmp, 'bench.db')}", users)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Нагрузочный тест webhook-эндпоинта
+
+Отправляет синтетические обновления Telegram POST-запросами и измеряет
+время ответа (p50/p99). Без --url поднимает локальный WebhookServer с
+хендлером, который имитирует работу задержкой --handler-delay, и
+дополнительно показывает время до завершения всей обработки.
+
+Запуск:
+    python -m benchmarks.bench_webhook --updates 2000 --concurrency 40
+    python -m benchmarks.bench_webhook --url http://127.0.0.1:8080/webhook --secret SECRET
+"""
+import argparse
+import asyncio
+import time
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+from aiohttp import ClientSession, TCPConnector
+
+from src.bot.webhook import WebhookServer
+
+
+# Формат токена проверяется при создании Bot, запросов к API тест не делает
+FAKE_TOKEN = "123456:AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA"
+
+
+def make_update(update_id: int) -> dict:
+    """Синтетическое обновление с текстовым сообщением"""
+    user_id = 100000 + update_id % 1000
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': {'id': user_id, 'is_bot': False, 'first_name': 'Load'},
+            'text': 'ping'
+        }
+    }
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Перцентиль по отсортированному списку (ближайший ранг)"""
+    index = min(len(values) - 1, max(0, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+async def post_updates(url: str, secret: str, updates: int, concurrency: int) -> tuple[list, int, float]:
+    """
+    Отправка обновлений с ограничением одновременных запросов
+
+    :return: (время ответов в секундах, количество ответов не 200, общее время)
+    """
+    headers = {'X-Telegram-Bot-Api-Secret-Token': secret} if secret else {}
+    latencies = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for update_id in range(1, updates + 1):
+        queue.put_nowait(update_id)
+
+    async def worker(session: ClientSession):
+        nonlocal errors
+        while not queue.empty():
+            update = make_update(queue.get_nowait())
+            started = time.perf_counter()
+            async with session.post(url, json=update, headers=headers) as response:
+                await response.read()
+                latencies.append(time.perf_counter() - started)
+                if response.status != 200:
+                    errors += 1
+
+    started = time.perf_counter()
+    async with ClientSession(connector=TCPConnector(limit=concurrency)) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    return sorted(latencies), errors, time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', help='Внешний эндпоинт (по умолчанию - локальный сервер)')
+    parser.add_argument('--secret', default='bench-secret')
+    parser.add_argument('--updates', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=40)
+    parser.add_argument('--handler-delay', type=float, default=0.05, help='Имитация работы хендлера, сек')
+    parser.add_argument('--port', type=int, default=18080)
+    args = parser.parse_args()
+
+    server = None
+    handled = 0
+    url = args.url
+    if url is None:
+        bot = Bot(token=FAKE_TOKEN)
+        dp = Dispatcher()
+
+        @dp.message()
+        async def handler(message: Message):
+            nonlocal handled
+            await asyncio.sleep(args.handler_delay)
+            handled += 1
+
+        server = WebhookServer(dp, bot, path='/webhook', secret_token=args.secret, host='127.0.0.1', port=args.port)
+        await server.start()
+        url = f"http://127.0.0.1:{args.port}/webhook"
+
+    try:
+        latencies, errors, elapsed = await post_updates(url, args.secret, args.updates, args.concurrency)
+        print(
+            f"{len(latencies)} обновлений, {args.concurrency} соединений: "
+            f"p50 {percentile(latencies, 0.5) * 1000:.1f} мс, "
+            f"p99 {percentile(latencies, 0.99) * 1000:.1f} мс, "
+            f"max {latencies[-1] * 1000:.1f} мс, "
+            f"{len(latencies) / elapsed:.0f} запр./с, ошибок {errors}"
+        )
+    finally:
+        if server is not None:
+            started = time.perf_counter()
+            await server.stop()
+            await bot.session.close()
+            print(
+                f"Обработано хендлером: {handled}, "
+                f"ожидание завершения при остановке {time.perf_counter() - started:.2f} c"
+            )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""
+Бенчмарк векторизованной аналитики тренировок
+
+Сравнивает расчет объема, 1ПМ (Эпли и Бжицки), скользящего среднего,
+недельного тоннажа и ACWR циклами Python по списку записей (как строился
+прогресс раньше в ExerciseService.get_exercise_progress) с расчетом
+по столбцам NumPy из src.services.workout_analytics.
+
+Запуск:
+    python -m benchmarks.bench_workout_analytics --rows 100000
+"""
+import argparse
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.services.workout_analytics import ExerciseSeries, WorkoutAnalyticsService
+
+
+def make_rows(count: int, seed: int = 42) -> list:
+    """Синтетическая история: несколько записей в день на протяжении лет"""
+    rnd = np.random.default_rng(seed)
+    start = datetime(2015, 1, 1)
+    offsets = np.sort(rnd.uniform(0, count / 6, count))
+    weights = rnd.uniform(20, 180, count).round(1)
+    reps = rnd.integers(1, 16, count)
+    sets = rnd.integers(1, 6, count)
+    return [
+        (start + timedelta(days=float(offset)), float(weight), int(rep), int(set_))
+        for offset, weight, rep, set_ in zip(offsets, weights, reps, sets)
+    ]
+
+
+def python_progress(rows: list, window: int = 5) -> dict:
+    """До: показатели циклами по записям"""
+    volumes, epley, brzycki, rolling = [], [], [], []
+    for _, weight, reps, sets in rows:
+        volumes.append(weight * reps * sets)
+        epley.append(weight if reps <= 1 else weight * (1 + reps / 30))
+        brzycki.append(weight if reps <= 1 else weight * 36 / (37 - reps))
+    for index in range(len(epley)):
+        chunk = epley[max(0, index - window + 1):index + 1]
+        rolling.append(sum(chunk) / len(chunk))
+
+    weekly = defaultdict(float)
+    daily = defaultdict(float)
+    for (date, _, _, _), load in zip(rows, volumes):
+        day = date.date()
+        weekly[day - timedelta(days=day.weekday())] += load
+        daily[day] += load
+
+    acwr = []
+    if daily:
+        day, last = min(daily), max(daily)
+        history = []
+        while day <= last:
+            history.append(daily.get(day, 0.0))
+            acute = sum(history[-7:]) / 7
+            chronic = sum(history[-28:]) / 28
+            acwr.append(acute / chronic if len(history) >= 28 and chronic > 0 else float('nan'))
+            day += timedelta(days=1)
+
+    return {
+        'volume': volumes,
+        'e1rm_epley': epley,
+        'e1rm_brzycki': brzycki,
+        'e1rm_rolling': rolling,
+        'weekly_tonnage': [weekly[week] for week in sorted(weekly)],
+        'acwr': acwr
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+
+    python_elapsed = float('inf')
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        expected = python_progress(rows)
+        python_elapsed = min(python_elapsed, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    series = ExerciseSeries.from_rows(rows)
+    convert_elapsed = time.perf_counter() - started
+
+    numpy_elapsed = float('inf')
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        actual = WorkoutAnalyticsService.compute(series)
+        numpy_elapsed = min(numpy_elapsed, time.perf_counter() - started)
+
+    for key, values in expected.items():
+        assert np.allclose(actual[key], values, equal_nan=True), f"{key}: результаты расходятся"
+
+    print(f"{args.rows} записей, {len(actual['days'])} дней, {len(actual['weeks'])} недель")
+    print(f"  циклы Python:        {python_elapsed * 1000:8.1f} мс")
+    print(f"  NumPy (расчет):      {numpy_elapsed * 1000:8.1f} мс (x{python_elapsed / numpy_elapsed:.0f})")
+    print(f"  NumPy (+ загрузка):  {(numpy_elapsed + convert_elapsed) * 1000:8.1f} мс "
+          f"(x{python_elapsed / (numpy_elapsed + convert_elapsed):.0f})")
+
+
+if __name__ == '__main__':
+    main()
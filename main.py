@@ -7,11 +7,7 @@ async def main():
    config = Config()
    
    # Создание и запуск бота
-   bot = FinanceTrackerBot(
-       token=config.BOT_TOKEN,
-       db_url=config.DATABASE_URL,
-       redis_url=config.REDIS_URL
-   )
+   bot = FinanceTrackerBot(config)
    await bot.start()
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+import asyncio
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.models.base import Base
+from src.services.database import to_async_url
+
+# Импорт моделей регистрирует их таблицы в Base.metadata
+from src.models import analytics, goal, reminder, savings, sleep_weight, transaction, workout  # noqa: F401
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def get_url() -> str:
+    """Строка подключения: DATABASE_URL из окружения или sqlalchemy.url из alembic.ini"""
+    return to_async_url(os.environ.get('DATABASE_URL') or config.get_main_option('sqlalchemy.url'))
+
+
+def run_migrations_offline() -> None:
+    """Генерация SQL без подключения к БД"""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={'paramstyle': 'named'},
+        render_as_batch=True
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # batch-режим нужен SQLite для изменения колонок
+        render_as_batch=True
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    """Применение миграций через асинхронный движок"""
+    engine = create_async_engine(get_url())
+
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
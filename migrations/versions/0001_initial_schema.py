@@ -0,0 +1,127 @@
+"""Исходная схема БД
+
+Таблицы, которые раньше создавались только через Base.metadata.create_all.
+Уже существующие таблицы пропускаются, поэтому миграцию можно применять
+и к базе, созданной ботом до появления Alembic.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _base_columns():
+    return [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    ]
+
+
+def _create_table(name, *columns):
+    if not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *_base_columns(), *columns)
+        return True
+    return False
+
+
+def upgrade() -> None:
+    _create_table(
+        'categories',
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('type', sa.String(20), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+    )
+    _create_table(
+        'transactions',
+        sa.Column('amount', sa.Numeric(10, 2), nullable=False),
+        sa.Column('category_id', sa.Integer(), sa.ForeignKey('categories.id'), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(200)),
+    )
+    _create_table(
+        'exercises',
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('weight', sa.Numeric(5, 2)),
+        sa.Column('reps', sa.Integer()),
+        sa.Column('sets', sa.Integer()),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('workout_date', sa.DateTime(), nullable=False),
+    )
+    _create_table(
+        'sleep_records',
+        sa.Column('sleep_time', sa.DateTime(), nullable=False),
+        sa.Column('wake_time', sa.DateTime(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+    )
+    _create_table(
+        'weight_records',
+        sa.Column('weight', sa.Numeric(4, 1), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('record_date', sa.DateTime(), nullable=False),
+    )
+    if _create_table(
+        'user_activities',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'action',
+            sa.Enum(
+                'EXPENSE_ADDED', 'INCOME_ADDED', 'WEIGHT_RECORDED', 'SLEEP_STARTED',
+                'SLEEP_ENDED', 'GOAL_CREATED', 'GOAL_COMPLETED', 'REPORT_VIEWED',
+                'SETTINGS_CHANGED',
+                name='activitytype'
+            ),
+            nullable=False
+        ),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('additional_data', sa.String(500)),
+    ):
+        op.create_index('ix_user_activities_user_id', 'user_activities', ['user_id'])
+    _create_table(
+        'goals',
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('description', sa.String(500)),
+        sa.Column('goal_type', sa.String(20), nullable=False),
+        sa.Column('target_value', sa.Numeric(10, 2), nullable=False),
+        sa.Column('current_value', sa.Numeric(10, 2), nullable=False),
+        sa.Column('start_value', sa.Numeric(10, 2), nullable=False),
+        sa.Column('deadline', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(20)),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+    )
+    _create_table(
+        'reminders',
+        sa.Column('text', sa.String(500), nullable=False),
+        sa.Column('remind_at', sa.DateTime(), nullable=False),
+        sa.Column('is_completed', sa.Boolean()),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+    )
+    _create_table(
+        'user_settings',
+        sa.Column('user_id', sa.Integer(), nullable=False, unique=True),
+        sa.Column('rounding_step', sa.Enum('STEP_10', 'STEP_50', 'STEP_100', name='roundingstep')),
+        sa.Column('savings_enabled', sa.Boolean()),
+    )
+    _create_table(
+        'savings_accounts',
+        sa.Column('user_id', sa.Integer(), nullable=False, unique=True),
+        sa.Column('balance', sa.Numeric(10, 2)),
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        'savings_accounts', 'user_settings', 'reminders', 'goals', 'user_activities',
+        'weight_records', 'sleep_records', 'exercises', 'transactions', 'categories'
+    ):
+        op.drop_table(table)
+    sa.Enum(name='activitytype').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='roundingstep').drop(op.get_bind(), checkfirst=True)
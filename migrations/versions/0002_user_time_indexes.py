@@ -0,0 +1,70 @@
+"""Составные индексы (user_id, время) для запросов по периодам
+
+Почти все запросы сервисов фильтруют по user_id и временной колонке.
+Индекс на user_activities.user_id заменяется составным, sleep_records.wake_time
+становится nullable (незавершенный сон), для таких записей добавлен
+частичный индекс.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+USER_TIME_INDEXES = (
+    ('ix_transactions_user_id_created_at', 'transactions', 'created_at'),
+    ('ix_exercises_user_id_workout_date', 'exercises', 'workout_date'),
+    ('ix_sleep_records_user_id_sleep_time', 'sleep_records', 'sleep_time'),
+    ('ix_weight_records_user_id_record_date', 'weight_records', 'record_date'),
+    ('ix_user_activities_user_id_timestamp', 'user_activities', 'timestamp'),
+)
+
+
+def _index_names(table: str) -> set:
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    # Незавершенная запись сна хранится с wake_time = NULL
+    columns = {column['name']: column for column in sa.inspect(op.get_bind()).get_columns('sleep_records')}
+    if not columns['wake_time']['nullable']:
+        with op.batch_alter_table('sleep_records') as batch_op:
+            batch_op.alter_column('wake_time', existing_type=sa.DateTime(), nullable=True)
+
+    for name, table, time_column in USER_TIME_INDEXES:
+        if name not in _index_names(table):
+            op.create_index(name, table, ['user_id', time_column])
+
+    if 'ix_sleep_records_open' not in _index_names('sleep_records'):
+        op.create_index(
+            'ix_sleep_records_open',
+            'sleep_records',
+            ['user_id', 'sleep_time'],
+            postgresql_where=sa.text('wake_time IS NULL'),
+            sqlite_where=sa.text('wake_time IS NULL')
+        )
+
+    # Составной индекс покрывает запросы только по user_id
+    if 'ix_user_activities_user_id' in _index_names('user_activities'):
+        op.drop_index('ix_user_activities_user_id', table_name='user_activities')
+
+
+def downgrade() -> None:
+    op.create_index('ix_user_activities_user_id', 'user_activities', ['user_id'])
+    op.drop_index('ix_sleep_records_open', table_name='sleep_records')
+
+    for name, table, _ in reversed(USER_TIME_INDEXES):
+        op.drop_index(name, table_name=table)
+
+    # Перед возвратом NOT NULL незавершенные записи сна удаляются
+    op.execute('DELETE FROM sleep_records WHERE wake_time IS NULL')
+    with op.batch_alter_table('sleep_records') as batch_op:
+        batch_op.alter_column('wake_time', existing_type=sa.DateTime(), nullable=False)
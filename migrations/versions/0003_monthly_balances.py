@@ -0,0 +1,52 @@
+"""Помесячные итоги транзакций
+
+Таблица monthly_balances хранит суммы доходов и расходов пользователя
+за месяц и заполняется по уже существующим транзакциям.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'monthly_balances',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('category_type', sa.String(20), nullable=False),
+        sa.Column('total', sa.Numeric(12, 2), nullable=False),
+        sa.Column('transactions_count', sa.Integer(), nullable=False),
+        sa.UniqueConstraint('user_id', 'month', 'category_type', name='uq_monthly_balances_user_month_type'),
+    )
+
+    if op.get_bind().dialect.name == 'sqlite':
+        month = "date(t.created_at, 'start of month')"
+        now = "CURRENT_TIMESTAMP"
+    else:
+        month = "date_trunc('month', t.created_at)::date"
+        now = "now()"
+
+    op.execute(f"""
+        INSERT INTO monthly_balances
+            (user_id, month, category_type, total, transactions_count, created_at, updated_at)
+        SELECT t.user_id, {month}, c.type, SUM(t.amount), COUNT(t.id), {now}, {now}
+        FROM transactions t
+        JOIN categories c ON c.id = t.category_id
+        GROUP BY t.user_id, {month}, c.type
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('monthly_balances')
@@ -0,0 +1,59 @@
+"""Журнал пополнений накопительного счёта
+
+Округления записываются в savings_entries, а savings_accounts хранит
+снимок баланса до snapshot_entry_id. Текущие балансы становятся
+снимками с snapshot_entry_id = 0.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'savings_entries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Numeric(10, 2), nullable=False),
+        sa.Column('transaction_id', sa.Integer(), sa.ForeignKey('transactions.id')),
+    )
+    op.create_index('ix_savings_entries_user_id_id', 'savings_entries', ['user_id', 'id'])
+
+    op.add_column(
+        'savings_accounts',
+        sa.Column('snapshot_entry_id', sa.Integer(), nullable=False, server_default='0')
+    )
+
+
+def downgrade() -> None:
+    # Несвернутые записи журнала переносятся в баланс счёта
+    op.execute("""
+        UPDATE savings_accounts
+        SET balance = COALESCE(balance, 0) + COALESCE((
+            SELECT SUM(e.amount) FROM savings_entries e
+            WHERE e.user_id = savings_accounts.user_id
+              AND e.id > savings_accounts.snapshot_entry_id
+        ), 0)
+    """)
+    op.execute("""
+        INSERT INTO savings_accounts (user_id, balance, created_at, updated_at)
+        SELECT e.user_id, SUM(e.amount), MIN(e.created_at), MAX(e.created_at)
+        FROM savings_entries e
+        WHERE NOT EXISTS (SELECT 1 FROM savings_accounts a WHERE a.user_id = e.user_id)
+        GROUP BY e.user_id
+    """)
+    with op.batch_alter_table('savings_accounts') as batch_op:
+        batch_op.drop_column('snapshot_entry_id')
+    op.drop_index('ix_savings_entries_user_id_id', table_name='savings_entries')
+    op.drop_table('savings_entries')
@@ -0,0 +1,35 @@
+"""Новые типы активности: запуск бота, тренировка, отправка отчета
+
+В PostgreSQL значения добавляются в тип activitytype. SQLAlchemy
+хранит Enum по имени члена, поэтому добавляются имена.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+NEW_ACTIVITY_TYPES = ('BOT_STARTED', 'WORKOUT_RECORDED', 'REPORT_SENT')
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # ALTER TYPE ... ADD VALUE нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        for value in NEW_ACTIVITY_TYPES:
+            op.execute(f"ALTER TYPE activitytype ADD VALUE IF NOT EXISTS '{value}'")
+
+
+def downgrade() -> None:
+    # Удаление значений из enum в PostgreSQL не поддерживается,
+    # лишние значения не мешают предыдущей версии схемы
+    pass
@@ -0,0 +1,63 @@
+"""Счетчики активности по часовым и дневным корзинам
+
+Таблица activity_counters заполняется по журналу user_activities:
+последние двое суток - часовыми корзинами, более старые события -
+дневными.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'activity_counters',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.Column('granularity', sa.String(10), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('action', sa.String(50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.UniqueConstraint('granularity', 'bucket_start', 'action', name='uq_activity_counters_bucket_action'),
+    )
+
+    if op.get_bind().dialect.name == 'sqlite':
+        hour = "strftime('%Y-%m-%d %H:00:00.000000', timestamp)"
+        day = "strftime('%Y-%m-%d 00:00:00.000000', timestamp)"
+        action = "lower(action)"
+        cutoff = "date(CURRENT_TIMESTAMP, '-2 days')"
+        now = "CURRENT_TIMESTAMP"
+    else:
+        hour = "date_trunc('hour', timestamp)"
+        day = "date_trunc('day', timestamp)"
+        action = "lower(action::text)"
+        cutoff = "date_trunc('day', now() - interval '2 days')"
+        now = "now()"
+
+    # В user_activities хранится имя члена ActivityType, в счетчиках - значение
+    for granularity, bucket, condition in (
+        ('hour', hour, f"timestamp >= {cutoff}"),
+        ('day', day, f"timestamp < {cutoff}"),
+    ):
+        op.execute(f"""
+            INSERT INTO activity_counters
+                (granularity, bucket_start, action, count, created_at, updated_at)
+            SELECT '{granularity}', {bucket}, {action}, COUNT(*), {now}, {now}
+            FROM user_activities
+            WHERE {condition}
+            GROUP BY {bucket}, {action}
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table('activity_counters')
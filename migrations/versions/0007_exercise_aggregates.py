@@ -0,0 +1,81 @@
+"""Накопленные показатели упражнений
+
+Таблица exercise_aggregates хранит по паре (пользователь, упражнение)
+последний и максимальный вес, сумму повторений, объем и число
+тренировок и заполняется по уже существующим записям.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'exercise_aggregates',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('last_weight', sa.Numeric(5, 2)),
+        sa.Column('prev_weight', sa.Numeric(5, 2)),
+        sa.Column('last_workout_date', sa.DateTime(), nullable=False),
+        sa.Column('max_weight', sa.Numeric(5, 2)),
+        sa.Column('reps_sum', sa.Integer(), nullable=False),
+        sa.Column('reps_count', sa.Integer(), nullable=False),
+        sa.Column('total_volume', sa.Numeric(14, 2), nullable=False),
+        sa.Column('sessions_count', sa.Integer(), nullable=False),
+        sa.Column('last_session_date', sa.Date(), nullable=False),
+        sa.UniqueConstraint('user_id', 'name', name='uq_exercise_aggregates_user_name'),
+    )
+
+    if op.get_bind().dialect.name == 'sqlite':
+        day = "date(workout_date)"
+        now = "CURRENT_TIMESTAMP"
+    else:
+        day = "workout_date::date"
+        now = "now()"
+
+    op.execute(f"""
+        INSERT INTO exercise_aggregates
+            (user_id, name, last_weight, prev_weight, last_workout_date, max_weight,
+             reps_sum, reps_count, total_volume, sessions_count, last_session_date,
+             created_at, updated_at)
+        SELECT
+            e.user_id,
+            e.name,
+            MAX(CASE WHEN e.position = 1 THEN e.weight END),
+            MAX(CASE WHEN e.position = 2 THEN e.weight END),
+            MAX(e.workout_date),
+            MAX(e.weight),
+            COALESCE(SUM(e.reps), 0),
+            COUNT(e.reps),
+            COALESCE(SUM(e.weight * e.reps * e.sets), 0),
+            COUNT(DISTINCT e.day),
+            MAX(e.day),
+            {now},
+            {now}
+        FROM (
+            SELECT
+                user_id, name, weight, reps, sets, workout_date,
+                {day} AS day,
+                ROW_NUMBER() OVER (
+                    PARTITION BY user_id, name ORDER BY workout_date DESC, id DESC
+                ) AS position
+            FROM exercises
+        ) e
+        GROUP BY e.user_id, e.name
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('exercise_aggregates')
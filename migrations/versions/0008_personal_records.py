@@ -0,0 +1,70 @@
+"""Личные рекорды по упражнению и диапазону повторений
+
+Таблица personal_records хранит лучший вес, расчетный 1ПМ (по Эпли)
+и объем подхода для диапазонов повторений 1-3, 4-6, 7-12 и 13+ и
+заполняется по уже существующим записям упражнений.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'personal_records',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('rep_range', sa.String(10), nullable=False),
+        sa.Column('best_weight', sa.Numeric(5, 2), nullable=False),
+        sa.Column('best_e1rm', sa.Numeric(6, 2), nullable=False),
+        sa.Column('best_volume', sa.Numeric(10, 2), nullable=False),
+        sa.Column('achieved_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('user_id', 'name', 'rep_range', name='uq_personal_records_user_name_range'),
+    )
+
+    now = "CURRENT_TIMESTAMP" if op.get_bind().dialect.name == 'sqlite' else "now()"
+
+    op.execute(f"""
+        INSERT INTO personal_records
+            (user_id, name, rep_range, best_weight, best_e1rm, best_volume, achieved_at,
+             created_at, updated_at)
+        SELECT
+            user_id,
+            name,
+            rep_range,
+            MAX(weight),
+            ROUND(MAX(CASE WHEN reps = 1 THEN weight ELSE weight * (1 + reps / 30.0) END), 2),
+            MAX(weight * reps * COALESCE(sets, 1)),
+            MAX(workout_date),
+            {now},
+            {now}
+        FROM (
+            SELECT
+                user_id, name, weight, reps, sets, workout_date,
+                CASE
+                    WHEN reps <= 3 THEN '1-3'
+                    WHEN reps <= 6 THEN '4-6'
+                    WHEN reps <= 12 THEN '7-12'
+                    ELSE '13+'
+                END AS rep_range
+            FROM exercises
+            WHERE weight > 0 AND reps >= 1
+        ) e
+        GROUP BY user_id, name, rep_range
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('personal_records')
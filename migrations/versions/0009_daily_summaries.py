@@ -0,0 +1,62 @@
+"""Суточные итоги сна и веса
+
+Таблицы sleep_daily_summaries и weight_daily_summaries заполняет ночное
+задание DailySummaryService, daily_summary_states хранит для каждого
+пользователя первый непосчитанный день. Первый запуск задания считает
+всю историю пользователя; до него статистика читается из исходных записей.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sleep_daily_summaries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('total_hours', sa.Numeric(5, 2), nullable=False),
+        sa.Column('sessions_count', sa.Integer(), nullable=False),
+        sa.Column('first_bedtime', sa.DateTime(), nullable=False),
+        sa.Column('last_wake_time', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('user_id', 'day', name='uq_sleep_daily_summaries_user_day'),
+    )
+    op.create_table(
+        'weight_daily_summaries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('min_weight', sa.Numeric(4, 1), nullable=False),
+        sa.Column('avg_weight', sa.Numeric(5, 2), nullable=False),
+        sa.Column('records_count', sa.Integer(), nullable=False),
+        sa.Column('trend_weight', sa.Numeric(5, 2), nullable=False),
+        sa.UniqueConstraint('user_id', 'day', name='uq_weight_daily_summaries_user_day'),
+    )
+    op.create_table(
+        'daily_summary_states',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.Column('user_id', sa.Integer(), nullable=False, unique=True),
+        sa.Column('summarized_through', sa.Date(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_summary_states')
+    op.drop_table('weight_daily_summaries')
+    op.drop_table('sleep_daily_summaries')
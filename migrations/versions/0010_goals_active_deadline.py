@@ -0,0 +1,31 @@
+"""Частичный индекс активных целей по дедлайну
+
+Ночная проверка просроченных целей выбирает активные цели с истекшим
+дедлайном пачками по id, индекс ограничивает ее только активными целями.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_goals_active_deadline',
+        'goals',
+        ['deadline'],
+        postgresql_where=sa.text("status = 'active'"),
+        sqlite_where=sa.text("status = 'active'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_goals_active_deadline', table_name='goals')
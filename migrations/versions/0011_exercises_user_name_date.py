@@ -0,0 +1,28 @@
+"""Индекс упражнений по (user_id, name, workout_date)
+
+При записи подхода проверяется, был ли уже в этот день подход того же
+упражнения, чтобы подходы задним числом не считались новой тренировкой.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_exercises_user_id_name_workout_date',
+        'exercises',
+        ['user_id', 'name', 'workout_date']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_exercises_user_id_name_workout_date', table_name='exercises')
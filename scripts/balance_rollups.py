@@ -0,0 +1,50 @@
+"""
+Обслуживание помесячных итогов транзакций (monthly_balances)
+
+Запуск:
+    python -m scripts.balance_rollups check [--user-id 123]
+    python -m scripts.balance_rollups rebuild [--user-id 123]
+
+Строка подключения берется из --database-url или DATABASE_URL.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+from src.services.balance_rollups import BalanceRollupService
+from src.services.database import DatabaseService
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=('check', 'rebuild'))
+    parser.add_argument('--user-id', type=int, help='Только для одного пользователя')
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'))
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error('Укажите --database-url или переменную окружения DATABASE_URL')
+
+    db = DatabaseService(args.database_url)
+    rollups = BalanceRollupService(db)
+    try:
+        if args.command == 'rebuild':
+            rows = await rollups.rebuild(args.user_id)
+            print(f"Итоги пересчитаны: {rows} строк")
+            return 0
+
+        mismatches = await rollups.check(args.user_id)
+        for user_id, month, category_type, actual, expected in mismatches:
+            print(
+                f"user_id={user_id} {month:%Y-%m} {category_type}: "
+                f"итог {actual[0]} ({actual[1]} шт.), по транзакциям {expected[0]} ({expected[1]} шт.)"
+            )
+        print(f"Расхождений: {len(mismatches)}")
+        return 1 if mismatches else 0
+    finally:
+        await db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,41 @@
+"""
+Расчет суточных итогов сна и веса вне расписания
+
+Запуск:
+    python -m scripts.daily_summaries [--through 2026-10-17]
+
+Прерванный запуск можно повторить: уже посчитанные пользователи
+пропускаются. Строка подключения берется из --database-url или DATABASE_URL.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+from src.services.daily_summaries import DailySummaryService
+from src.services.database import DatabaseService
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--through', type=date.fromisoformat, help='Первый непосчитываемый день (по умолчанию - сегодня)')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Пользователей в одной транзакции')
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'))
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error('Укажите --database-url или переменную окружения DATABASE_URL')
+
+    db = DatabaseService(args.database_url)
+    summaries = DailySummaryService(db, chunk_size=args.chunk_size)
+    try:
+        processed = await summaries.run(args.through)
+        print(f"Итоги посчитаны: {processed} пользователей")
+        return 0
+    finally:
+        await db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,188 @@
+"""
+Проверка планов горячих запросов
+
+Создает схему, наполняет базу тестовыми данными и выполняет EXPLAIN
+для основных запросов сервисов по (user_id, время). Завершается с кодом 1,
+если какой-то запрос не использует ожидаемый индекс.
+
+Запуск:
+    python -m scripts.explain_hot_queries                      # временная SQLite
+    python -m scripts.explain_hot_queries --database-url postgresql://... --users 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, text
+
+from src.models.analytics import ActivityType, UserActivity
+from src.models.sleep_weight import SleepRecord, WeightRecord
+from src.models.transaction import Category, Transaction
+from src.models.workout import Exercise
+from src.services.database import DatabaseService
+
+
+def hot_queries(user_id: int) -> list:
+    """Запросы сервисов и индексы, которые они должны использовать"""
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    month_ago = now - timedelta(days=30)
+
+    return [
+        (
+            'Транзакции пользователя за период',
+            select(Transaction.id).where(
+                Transaction.user_id == user_id,
+                Transaction.created_at >= month_ago
+            ),
+            'ix_transactions_user_id_created_at'
+        ),
+        (
+            'Последние упражнения',
+            select(Exercise).where(
+                Exercise.user_id == user_id
+            ).order_by(Exercise.workout_date.desc()).limit(5),
+            'ix_exercises_user_id_workout_date'
+        ),
+        (
+            'Тренировки за месяц',
+            select(Exercise.workout_date).where(
+                Exercise.user_id == user_id,
+                Exercise.workout_date >= month_ago
+            ),
+            'ix_exercises_user_id_workout_date'
+        ),
+        (
+            'Статистика сна за неделю',
+            select(SleepRecord).where(
+                SleepRecord.user_id == user_id,
+                SleepRecord.sleep_time >= week_ago,
+                SleepRecord.wake_time != None
+            ),
+            'ix_sleep_records_user_id_sleep_time'
+        ),
+        (
+            'Незавершенная запись сна',
+            select(SleepRecord).where(
+                SleepRecord.user_id == user_id,
+                SleepRecord.wake_time == None
+            ).order_by(SleepRecord.sleep_time.desc()).limit(1),
+            'ix_sleep_records_open'
+        ),
+        (
+            'Последние записи веса',
+            select(WeightRecord).where(
+                WeightRecord.user_id == user_id
+            ).order_by(WeightRecord.record_date.desc()).limit(2),
+            'ix_weight_records_user_id_record_date'
+        ),
+        (
+            'Вес на начало недели',
+            select(WeightRecord).where(
+                WeightRecord.user_id == user_id,
+                WeightRecord.record_date >= week_ago
+            ).order_by(WeightRecord.record_date).limit(1),
+            'ix_weight_records_user_id_record_date'
+        ),
+        (
+            'Активность пользователя за период',
+            select(UserActivity.id).where(
+                UserActivity.user_id == user_id,
+                UserActivity.timestamp >= week_ago
+            ),
+            'ix_user_activities_user_id_timestamp'
+        ),
+    ]
+
+
+async def seed(db: DatabaseService, users: int, rows_per_user: int):
+    """Наполнение базы случайными данными"""
+    now = datetime.utcnow()
+    rnd = random.Random(42)
+
+    def moment():
+        return now - timedelta(minutes=rnd.randint(0, 365 * 24 * 60))
+
+    async with db.get_session() as session:
+        await session.execute(insert(Category), [
+            {'id': user_id, 'name': 'Продукты', 'type': 'expense', 'user_id': user_id}
+            for user_id in range(1, users + 1)
+        ])
+
+        for user_id in range(1, users + 1):
+            rows = range(rows_per_user)
+            await session.execute(insert(Transaction), [
+                {'user_id': user_id, 'category_id': user_id, 'amount': rnd.randint(100, 5000), 'created_at': moment()}
+                for _ in rows
+            ])
+            await session.execute(insert(Exercise), [
+                {'user_id': user_id, 'name': 'присед', 'weight': 80, 'reps': 5, 'sets': 5, 'workout_date': moment()}
+                for _ in rows
+            ])
+            sleep_rows = []
+            for i in rows:
+                sleep_time = moment()
+                # Незавершенной остается только малая часть записей
+                wake_time = None if i % 50 == 0 else sleep_time + timedelta(hours=rnd.uniform(5, 9))
+                sleep_rows.append({'user_id': user_id, 'sleep_time': sleep_time, 'wake_time': wake_time})
+            await session.execute(insert(SleepRecord), sleep_rows)
+            await session.execute(insert(WeightRecord), [
+                {'user_id': user_id, 'weight': rnd.uniform(60, 90), 'record_date': moment()}
+                for _ in rows
+            ])
+            await session.execute(insert(UserActivity), [
+                {'user_id': user_id, 'action': rnd.choice(list(ActivityType)), 'timestamp': moment()}
+                for _ in rows
+            ])
+
+
+async def explain(db: DatabaseService, statement) -> str:
+    """Выполнение EXPLAIN для запроса в диалекте текущей БД"""
+    async with db.engine.connect() as conn:
+        compiled = statement.compile(dialect=conn.dialect)
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        prefix = 'EXPLAIN QUERY PLAN ' if db.dialect_name == 'sqlite' else 'EXPLAIN '
+        result = await conn.exec_driver_sql(prefix + str(compiled), params)
+        # SQLite возвращает план в последней колонке, PostgreSQL - в единственной
+        return "\n".join(str(row[-1]) for row in result)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database-url', help='По умолчанию - временная SQLite')
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--rows-per-user', type=int, default=100)
+    parser.add_argument('--no-seed', action='store_true', help='Не наполнять базу')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'explain.db')}"
+        db = DatabaseService(database_url)
+        try:
+            await db.create_tables()
+            if not args.no_seed:
+                await seed(db, args.users, args.rows_per_user)
+
+            # Обновляем статистику планировщика
+            async with db.engine.begin() as conn:
+                await conn.execute(text('ANALYZE'))
+
+            failed = 0
+            for title, statement, index_name in hot_queries(user_id=1):
+                plan = await explain(db, statement)
+                uses_index = index_name in plan
+                failed += not uses_index
+                print(f"{'OK  ' if uses_index else 'FAIL'} {title} ({index_name})")
+                print("     " + plan.replace("\n", "\n     "))
+        finally:
+            await db.close()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
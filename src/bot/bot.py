@@ -1,11 +1,17 @@
+import asyncio
+from contextlib import suppress
+from datetime import timedelta
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.redis import RedisStorage
 from aiogram.types import Message
 from aiogram.utils.callback_answer import CallbackAnswerMiddleware
 from typing import Dict, Any, Callable, Awaitable
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from datetime import datetime, timedelta
-from sqlalchemy import distinct
+from apscheduler.triggers.cron import CronTrigger
+from loguru import logger
+
+from src.bot.config import Config
+from src.bot.webhook import WebhookServer
 
 from src.handlers.navigation import navigation_router
 from src.handlers.expenses import expenses_router
@@ -13,15 +19,25 @@ from src.handlers.workout import workout_router
 from src.handlers.sleep_weight import sleep_weight_router
 from src.handlers.goals import goals_router
 
+from src.services.activity_buffer import ActivityBuffer
+from src.services.activity_counters import ActivityCounterService
+from src.services.cache import CacheService
+from src.services.charts import ChartService
+from src.services.daily_summaries import DailySummaryService
 from src.services.database import DatabaseService
 from src.services.expenses import ExpensesService
 from src.services.sleep_weight import SleepWeightService
 from src.services.goals import GoalService
+from src.services.goal_engine import GoalCompletion, GoalEngine
+from src.services.jobs import JobQueue, create_scheduler
+from src.services.leader import LeaderElection
 from src.services.analytics import AnalyticsService
 from src.services.workout import ExerciseService
+from src.services.stats_screen import StatisticsScreenService, StatsCache
 
 from src.models.analytics import ActivityType
-from src.models.transaction import Transaction
+from src.utils.formatters import format_goal_completed
+from src.utils.signals import shutdown_event
 
 class ServicesMiddleware:
    """Middleware для внедрения сервисов в хендлеры"""
@@ -40,77 +56,127 @@ class ServicesMiddleware:
 
 class FinanceTrackerBot:
    """Основной класс бота"""
-   def __init__(self, token: str, db_url: str, redis_url: str):
+   def __init__(self, config: Config):
+       self.config = config
+       self.logger = logger
+
        # Инициализация бота и диспетчера
-       self.bot = Bot(token=token)
-       self.storage = RedisStorage.from_url(redis_url)
+       self.bot = Bot(token=config.BOT_TOKEN)
+       self.storage = RedisStorage.from_url(config.REDIS_URL)
        self.dp = Dispatcher(storage=self.storage)
        
-       # Инициализация базы данных
-       self.db = DatabaseService(db_url)
-       self.db.create_tables()
+       # Инициализация базы данных с настройками пула из конфигурации
+       db_args = config.get_database_args()
+       self.db = DatabaseService(db_args.pop("database_url"), **db_args)
+       
+       # Кэши поверх Redis из хранилища FSM
+       cache_args = config.get_cache_args()
+       self.caches = {
+           'user_settings': CacheService(self.storage.redis, namespace='user_settings', **cache_args),
+           'categories': CacheService(self.storage.redis, namespace='categories', **cache_args),
+           'stats': CacheService(self.storage.redis, namespace='stats', **cache_args),
+           'charts': CacheService(self.storage.redis, namespace='charts', **cache_args)
+       }
+       stats_cache = StatsCache(self.caches['stats'])
+       
+       # Фоновая пакетная запись активности пользователей и счетчиков по корзинам
+       self.activity_counters = ActivityCounterService(
+           self.db,
+           hourly_retention=timedelta(hours=config.ACTIVITY_HOURLY_RETENTION)
+       )
+       self.activity_buffer = ActivityBuffer(
+           self.db,
+           counters=self.activity_counters,
+           max_size=config.ACTIVITY_BUFFER_SIZE,
+           batch_size=config.ACTIVITY_BATCH_SIZE,
+           flush_interval=config.ACTIVITY_FLUSH_INTERVAL,
+           put_timeout=config.ACTIVITY_PUT_TIMEOUT
+       )
+       
+       # Ночной расчет суточных итогов сна и веса
+       self.daily_summaries = DailySummaryService(self.db, **config.get_summary_args())
+       
+       # Прогресс целей в транзакциях записи веса и накоплений
+       self.goal_engine = GoalEngine(self.db)
+       self.goal_engine.subscribe(self._on_goal_completed)
        
        # Инициализация сервисов
        self.services = {
            'db_service': self.db,
-           'expenses_service': ExpensesService(self.db),
-           'sleep_weight_service': SleepWeightService(self.db),
-           'goals_service': GoalService(self.db),
-           'analytics_service': AnalyticsService(self.db),
-           'workout_service': ExerciseService(self.db)
+           'expenses_service': ExpensesService(
+               self.db,
+               settings_cache=self.caches['user_settings'],
+               categories_cache=self.caches['categories'],
+               stats_cache=stats_cache,
+               goal_engine=self.goal_engine
+           ),
+           'sleep_weight_service': SleepWeightService(
+               self.db,
+               stats_cache=stats_cache,
+               summaries=self.daily_summaries,
+               goal_engine=self.goal_engine
+           ),
+           'goals_service': GoalService(
+               self.db,
+               stats_cache=stats_cache,
+               sweep_chunk_size=config.GOAL_SWEEP_CHUNK_SIZE
+           ),
+           'analytics_service': AnalyticsService(
+               self.db,
+               buffer=self.activity_buffer,
+               counters=self.activity_counters
+           ),
+           'exercise_service': ExerciseService(self.db)
        }
        
-       # Настройка планировщика
+       # Графики веса и сна в отдельных процессах
+       self.services['chart_service'] = ChartService(
+           self.db,
+           cache=self.caches['charts'],
+           workers=config.CHART_WORKERS,
+           max_points=config.CHART_MAX_POINTS
+       )
+       
+       # Экран статистики из кэшированных разделов
+       self.services['stats_service'] = StatisticsScreenService(
+           self.services['expenses_service'],
+           self.services['sleep_weight_service'],
+           self.services['goals_service'],
+           stats_cache
+       )
+       
+       # Локальный планировщик для метрик процесса
        self.scheduler = AsyncIOScheduler()
        
+       # Фоновые задания только ставятся в очередь в Redis, выполняет их worker.py
+       self.jobs = JobQueue(create_scheduler(**config.get_job_store_args()))
+       
+       # При нескольких репликах long polling ведет только ведущая
+       self.leader = None
+       if config.LEADER_ELECTION:
+           self.leader = LeaderElection(self.storage.redis, **config.get_leader_args())
+       
        # Инициализация middleware
        self._setup_middleware()
        
        # Регистрация роутеров
        self._setup_routers()
 
-   async def _send_weekly_report(self):
-       """Отправка еженедельного отчета"""
-       try:
-            # Получаем всех активных пользователей за последнюю неделю
-            with self.db.get_session() as session:
-                active_users = session.query(
-                    distinct(Transaction.user_id)
-                ).filter(
-                    Transaction.created_at >= datetime.utcnow() - timedelta(days=7)
-                ).all()
-                
-                active_user_ids = [user[0] for user in active_users]  # Распаковываем результат запроса
-
-            for user_id in active_user_ids:
-                try:
-                    # Собираем статистику
-                    stats = await self._get_user_statistics(
-                        user_id,
-                        self.expenses_service,
-                        self.sleep_weight_service,
-                        self.goals_service
-                    )
-                    
-                    # Отправляем отчет
-                    await self.bot.send_message(
-                        chat_id=user_id,
-                        text=stats
-                    )
-                    
-                    # Логируем успешную отправку
-                    await self.analytics_service.log_activity(
-                        user_id=user_id,
-                        action=ActivityType.REPORT_SENT
-                    )
-                    
-                except Exception as user_error:
-                    self.logger.error(
-                        f"Ошибка при отправке отчета пользователю {user_id}: {user_error}"
-                    )
-                    
-       except Exception as e:
-            self.logger.error(f"Ошибка при отправке еженедельных отчетов: {e}")
+   async def _on_goal_completed(self, completion: GoalCompletion):
+       """Поздравление с достижением цели и учет в аналитике"""
+       await self.bot.send_message(completion.user_id, format_goal_completed(completion))
+       await self.services['analytics_service'].log_activity(
+           user_id=completion.user_id,
+           action=ActivityType.GOAL_COMPLETED,
+           metadata={'goal_id': completion.goal_id}
+       )
+
+   async def _log_pool_stats(self):
+       """Логирование состояния пула соединений с БД, кэшей и буфера активности"""
+       self.logger.info(f"DB pool: {self.db.pool_metrics.format_log()}")
+       for name, cache in self.caches.items():
+           self.logger.info(f"Cache {name}: {cache.stats()}")
+       self.logger.info(f"Activity buffer: {self.activity_buffer.stats()}")
 
    def _setup_middleware(self):
        """Настройка middleware"""
@@ -131,34 +197,123 @@ class FinanceTrackerBot:
        self.dp.include_router(goals_router)
 
    async def _setup_scheduler(self):
-       """Настройка планировщика задач"""
-       # Еженедельный отчет по субботам в 10:00
-       self.scheduler.add_job(
-           self._send_weekly_report,
-           trigger='cron',
-           day_of_week='sat',
-           hour=10,
-           minute=0
-       )
+       """Регистрация расписаний фоновых заданий и запуск локального планировщика"""
+       self.jobs.start()
+       timezone = self.jobs.scheduler.timezone
        
-       # Ежедневная проверка просроченных целей
-       self.scheduler.add_job(
-           self.services['goals_service'].check_overdue_goals,
-           trigger='cron',
-           hour=0,
-           minute=0
-       )
+       # Еженедельный отчет (по умолчанию по субботам в 10:00)
+       report_hour, report_minute = self.config.WEEKLY_REPORT_TIME.split(':')
+       self.jobs.schedule('weekly_report', CronTrigger(
+           day_of_week=self.config.WEEKLY_REPORT_DAY.lower(),
+           hour=report_hour,
+           minute=report_minute,
+           timezone=timezone
+       ))
+       
+       # Ежедневная проверка просроченных целей с уведомлением пользователей
+       self.jobs.schedule('expire_overdue_goals', CronTrigger(hour=0, minute=0, timezone=timezone))
+       
+       # Ежедневный перенос журнала накоплений в снимки балансов
+       self.jobs.schedule('savings_compact', CronTrigger(hour=3, minute=0, timezone=timezone))
+       
+       # Ежедневный расчет суточных итогов сна и веса за завершенные дни.
+       # Сутки в итогах считаются по UTC, а run() по умолчанию считает все дни
+       # до текущего дня UTC, поэтому запуск - после полуночи по UTC
+       self.jobs.schedule('daily_summaries', CronTrigger(hour=2, minute=0, timezone='UTC'))
+       
+       # Ежечасная свертка старых часовых счетчиков активности в дневные
+       self.jobs.schedule('activity_counters_compact', CronTrigger(minute=5, timezone=timezone))
+       
+       # Периодическое логирование метрик пула соединений
+       if self.config.DB_POOL_LOG_INTERVAL > 0:
+           self.scheduler.add_job(
+               self._log_pool_stats,
+               trigger='interval',
+               seconds=self.config.DB_POOL_LOG_INTERVAL
+           )
        
        self.scheduler.start()
 
+   async def _run_webhook(self):
+       """Прием обновлений через webhook до сигнала остановки"""
+       server = WebhookServer(self.dp, self.bot, **self.config.get_webhook_args())
+       await server.start()
+       try:
+           await self.dp.emit_startup(bot=self.bot)
+           await self.bot.set_webhook(
+               url=self.config.WEBHOOK_URL.rstrip('/') + self.config.WEBHOOK_PATH,
+               secret_token=self.config.WEBHOOK_SECRET,
+               allowed_updates=self.dp.resolve_used_update_types(),
+               max_connections=self.config.WEBHOOK_MAX_CONNECTIONS
+           )
+           await shutdown_event().wait()
+       finally:
+           # Webhook не удаляется: обновления копятся в Telegram до перезапуска
+           await server.stop()
+           await self.dp.emit_shutdown(bot=self.bot)
+
+   async def _run_polling(self):
+       """Прием обновлений через long polling"""
+       if self.leader is None:
+           await self.dp.start_polling(self.bot)
+           return
+
+       # Telegram допускает один getUpdates на токен: опрашивает ведущая
+       # реплика, остальные подхватывают опрос при ее отказе
+       stop = shutdown_event()
+       while True:
+           await self._wait_any(self.leader.elected, stop)
+           if stop.is_set():
+               return
+
+           polling = asyncio.create_task(
+               self.dp.start_polling(self.bot, handle_signals=False, close_bot_session=False)
+           )
+           interrupted = asyncio.create_task(self._wait_any(self.leader.lost, stop))
+           await asyncio.wait({polling, interrupted}, return_when=asyncio.FIRST_COMPLETED)
+           if not polling.done():
+               with suppress(RuntimeError):
+                   await self.dp.stop_polling()
+           interrupted.cancel()
+           await polling
+
+   @staticmethod
+   async def _wait_any(*events: asyncio.Event):
+       """Ожидание первого из событий"""
+       waiters = [asyncio.create_task(event.wait()) for event in events]
+       try:
+           await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+       finally:
+           for waiter in waiters:
+               waiter.cancel()
+
    async def start(self):
        """Запуск бота"""
        try:
-           # Настройка и запуск планировщика
+           # Создание таблиц без блокировки event loop
+           await self.db.create_tables()
+           
+           # Запуск фоновой записи активности
+           self.activity_buffer.start()
+
+           # Расписания фоновых заданий и локальный планировщик
            await self._setup_scheduler()
+           if self.leader is not None:
+               self.leader.start()
            
            # Запуск бота
-           await self.dp.start_polling(self.bot)
+           if self.config.WEBHOOK_URL:
+               await self._run_webhook()
+           else:
+               await self._run_polling()
        finally:
+           # Передача лидерства другой реплике без ожидания ttl
+           if self.leader is not None:
+               await self.leader.stop()
+           # Запись накопленной активности до закрытия пула соединений
+           await self.activity_buffer.stop()
+           self.jobs.shutdown()
+           self.services['chart_service'].close()
            await self.storage.close()
            await self.bot.session.close()
+           await self.db.close()
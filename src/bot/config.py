@@ -10,10 +10,40 @@ class Config(BaseSettings):
    
    # Настройки базы данных
    DATABASE_URL: str
+   DB_ECHO: bool = False
+   DB_POOL_SIZE: int = 5              # Постоянные соединения в пуле
+   DB_MAX_OVERFLOW: int = 10          # Дополнительные соединения сверх пула
+   DB_POOL_TIMEOUT: float = 30        # Ожидание свободного соединения, сек
+   DB_POOL_RECYCLE: int = 1800        # Пересоздание соединений старше, сек
+   DB_POOL_PRE_PING: bool = True      # Проверка соединения перед выдачей
+   DB_POOL_LOG_INTERVAL: int = 300    # Период логирования метрик пула, сек (0 - выкл.)
    
    # Настройки Redis
    REDIS_URL: str = "redis://localhost:6379/0"
    
+   # Получение обновлений через webhook (если задан WEBHOOK_URL, иначе long polling)
+   WEBHOOK_URL: Optional[str] = None      # Публичный адрес бота, например https://bot.example.com
+   WEBHOOK_PATH: str = "/webhook"         # Путь обработчика
+   WEBHOOK_SECRET: Optional[str] = None   # Секрет в заголовке X-Telegram-Bot-Api-Secret-Token
+   WEBHOOK_HOST: str = "0.0.0.0"          # Адрес встроенного сервера
+   WEBHOOK_PORT: int = 8080               # Порт встроенного сервера
+   WEBHOOK_MAX_CONNECTIONS: int = 40      # Одновременных соединений от Telegram
+   WEBHOOK_DRAIN_TIMEOUT: float = 30      # Ожидание обработки обновлений при остановке, сек
+   
+   # Несколько реплик бота: long polling только на ведущей
+   LEADER_ELECTION: bool = False          # Выбор ведущей реплики через блокировку в Redis
+   LEADER_KEY: str = "finance_bot:leader" # Ключ блокировки
+   LEADER_TTL: float = 30                 # Время жизни блокировки (время перехода при отказе), сек
+   LEADER_RENEW_INTERVAL: float = 10      # Период продления блокировки, сек
+   
+   # Фоновые задания: расписания в Redis, выполнение в отдельном процессе (worker.py)
+   JOB_KEY_PREFIX: str = "finance_bot:jobs"   # Префикс ключей хранилища заданий
+   JOB_MISFIRE_GRACE_TIME: int = 21600        # Допустимое опоздание пропущенного запуска, сек
+   JOB_STORE_SOCKET_TIMEOUT: float = 2        # Таймаут синхронных запросов к хранилищу заданий, сек
+   WORKER_LEADER_KEY: str = "finance_bot:worker_leader"  # Блокировка ведущего воркера
+   WORKER_POLL_INTERVAL: float = 30           # Проверка новых заданий в хранилище, сек
+   WORKER_DRAIN_TIMEOUT: float = 300          # Ожидание выполняемых заданий при остановке, сек
+   
    # Временная зона по умолчанию
    DEFAULT_TIMEZONE: str = "Europe/Moscow"
    
@@ -28,6 +58,36 @@ class Config(BaseSettings):
    WEEKLY_REPORT_TIME: str = "10:00"  # Время отправки еженедельных отчетов
    WEEKLY_REPORT_DAY: str = "SAT"     # День отправки еженедельных отчетов
    
+   # Ограничения рассылки (лимиты Telegram: ~30 сообщений/с, 1 сообщение/с в чат)
+   DELIVERY_CONCURRENCY: int = 20     # Одновременно отправляемых сообщений
+   DELIVERY_GLOBAL_RATE: float = 25   # Сообщений в секунду на бота
+   DELIVERY_CHAT_INTERVAL: float = 1  # Минимальный интервал между сообщениями в чат, сек
+   DELIVERY_MAX_RETRIES: int = 3      # Повторов при сетевых ошибках и RetryAfter
+   
+   # Буфер записи активности пользователей
+   ACTIVITY_BUFFER_SIZE: int = 10000      # Максимум событий в памяти
+   ACTIVITY_BATCH_SIZE: int = 500         # Событий в одной пачке записи
+   ACTIVITY_FLUSH_INTERVAL: float = 2.0   # Максимальная задержка записи, сек
+   ACTIVITY_PUT_TIMEOUT: float = 1.0      # Ожидание места в буфере, сек
+   ACTIVITY_HOURLY_RETENTION: int = 48    # Сколько часов хранить часовые счетчики
+   
+   # Ночная проверка просроченных целей
+   GOAL_SWEEP_CHUNK_SIZE: int = 500   # Целей в одной транзакции
+   
+   # Суточные итоги сна и веса
+   SUMMARY_CHUNK_SIZE: int = 500      # Пользователей в одной транзакции ночного расчета
+   SUMMARY_LOOKBACK_DAYS: int = 3     # Дней, пересчитываемых заново (записи задним числом)
+   SUMMARY_TREND_SMOOTHING: float = 0.1  # Доля нового дня в сглаженном тренде веса
+   
+   # Графики веса и сна
+   CHART_WORKERS: int = 2             # Процессов отрисовки
+   CHART_MAX_POINTS: int = 500        # Точек на графике после прореживания (LTTB)
+   
+   # Кэширование (LRU в процессе перед Redis)
+   CACHE_LOCAL_SIZE: int = 10000      # Записей в локальном LRU на каждый кэш
+   CACHE_LOCAL_TTL: float = 60        # Время жизни локальной записи, сек
+   CACHE_REDIS_TTL: int = 3600        # Время жизни записи в Redis, сек
+   
    class Config:
        """Настройки для pydantic"""
        env_file = ".env"
@@ -46,9 +106,56 @@ class Config(BaseSettings):
        """Получение аргументов для подключения к БД"""
        return {
            "database_url": self.DATABASE_URL,
-           "echo": False,  # Отключаем вывод SQL-запросов
-           "pool_size": 5,
-           "max_overflow": 10
+           "echo": self.DB_ECHO,
+           "pool_size": self.DB_POOL_SIZE,
+           "max_overflow": self.DB_MAX_OVERFLOW,
+           "pool_timeout": self.DB_POOL_TIMEOUT,
+           "pool_recycle": self.DB_POOL_RECYCLE,
+           "pool_pre_ping": self.DB_POOL_PRE_PING
+       }
+
+   def get_cache_args(self) -> dict:
+       """Получение аргументов для кэшей"""
+       return {
+           "maxsize": self.CACHE_LOCAL_SIZE,
+           "local_ttl": self.CACHE_LOCAL_TTL,
+           "redis_ttl": self.CACHE_REDIS_TTL
+       }
+
+   def get_summary_args(self) -> dict:
+       """Получение аргументов для расчета суточных итогов"""
+       return {
+           "chunk_size": self.SUMMARY_CHUNK_SIZE,
+           "lookback_days": self.SUMMARY_LOOKBACK_DAYS,
+           "trend_smoothing": self.SUMMARY_TREND_SMOOTHING
+       }
+
+   def get_webhook_args(self) -> dict:
+       """Получение аргументов для встроенного webhook-сервера"""
+       return {
+           "path": self.WEBHOOK_PATH,
+           "secret_token": self.WEBHOOK_SECRET,
+           "host": self.WEBHOOK_HOST,
+           "port": self.WEBHOOK_PORT,
+           "drain_timeout": self.WEBHOOK_DRAIN_TIMEOUT
+       }
+
+   def get_leader_args(self, key: Optional[str] = None) -> dict:
+       """Получение аргументов для выбора ведущей реплики"""
+       return {
+           "key": key or self.LEADER_KEY,
+           "ttl": self.LEADER_TTL,
+           "renew_interval": self.LEADER_RENEW_INTERVAL
+       }
+
+   def get_job_store_args(self) -> dict:
+       """Получение аргументов для планировщика с хранилищем заданий в Redis"""
+       return {
+           "redis_url": self.REDIS_URL,
+           "key_prefix": self.JOB_KEY_PREFIX,
+           "misfire_grace_time": self.JOB_MISFIRE_GRACE_TIME,
+           "timezone": self.DEFAULT_TIMEZONE,
+           "socket_timeout": self.JOB_STORE_SOCKET_TIMEOUT
        }
 
    def get_redis_args(self) -> dict:
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from aiohttp import web
+from loguru import logger
+
+
+class WebhookHandler(SimpleRequestHandler):
+    """
+    Прием обновлений Telegram через webhook
+
+    Ответ 200 отправляется сразу после разбора тела запроса, обработка
+    идет в фоновой задаче. Задачи отслеживаются, чтобы при остановке
+    дождаться их завершения. Во время остановки новые обновления получают
+    503, и Telegram доставит их повторно.
+    """
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, secret_token: Optional[str] = None, **data: Any):
+        super().__init__(dispatcher, bot, handle_in_background=True, secret_token=secret_token, **data)
+        self._tasks: Set[asyncio.Task] = set()
+        self._accepting = True
+
+    @property
+    def pending(self) -> int:
+        """Количество обновлений в обработке"""
+        return len(self._tasks)
+
+    async def _background_feed_update(self, bot: Bot, update: Dict[str, Any]) -> None:
+        try:
+            await super()._background_feed_update(bot, update)
+        except Exception as e:
+            logger.error(f"Ошибка обработки обновления {update.get('update_id')}: {e}")
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        if not self._accepting:
+            return web.Response(status=503)
+
+        update = await request.json(loads=bot.session.json_loads)
+        task = asyncio.create_task(self._background_feed_update(bot=bot, update=update))
+        # Ссылка на задачу хранится до ее завершения
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    async def close(self) -> None:
+        """Сессию бота закрывает его владелец, а не обработчик webhook"""
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Остановка приема и ожидание обновлений в обработке
+
+        :param timeout: Максимальное ожидание, сек
+        :return: Количество отмененных по таймауту обновлений
+        """
+        self._accepting = False
+        if not self._tasks:
+            return 0
+
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        return len(pending)
+
+
+class WebhookServer:
+    """Встроенный aiohttp-сервер для webhook"""
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        path: str = "/webhook",
+        secret_token: Optional[str] = None,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        drain_timeout: float = 30
+    ):
+        self.path = path
+        self.host = host
+        self.port = port
+        self.drain_timeout = drain_timeout
+        self.handler = WebhookHandler(dispatcher, bot, secret_token=secret_token)
+        self.app = web.Application()
+        self.handler.register(self.app, path=path)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self):
+        """Запуск приема запросов"""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Webhook принимает обновления на {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        """Остановка с ожиданием обновлений в обработке"""
+        if self._runner is None:
+            return
+
+        logger.info(f"Webhook: остановка, в обработке {self.handler.pending} обновлений")
+        cancelled = await self.handler.drain(self.drain_timeout)
+        if cancelled:
+            logger.warning(f"Webhook: {cancelled} обновлений прервано по таймауту")
+        await self._runner.cleanup()
+        self._runner = None
@@ -0,0 +1,221 @@
+import asyncio
+from contextlib import suppress
+from datetime import timedelta
+from functools import partial
+from itertools import groupby
+from operator import attrgetter
+
+from aiogram import Bot
+from apscheduler.jobstores.memory import MemoryJobStore
+from loguru import logger
+from redis.asyncio import Redis
+
+from src.bot.config import Config
+from src.services import jobs
+from src.services.activity_buffer import ActivityBuffer
+from src.services.activity_counters import ActivityCounterService
+from src.services.analytics import AnalyticsService
+from src.services.cache import CacheService
+from src.services.daily_summaries import DailySummaryService
+from src.services.database import DatabaseService
+from src.services.goals import GoalService
+from src.services.leader import LeaderElection
+from src.services.notifications import NotificationService
+from src.services.reports import ReportStatisticsService, UserReportStats
+from src.services.savings_ledger import SavingsLedgerService
+from src.services.stats_screen import StatsCache
+
+from src.models.analytics import ActivityType
+from src.utils.formatters import format_expired_goals, format_user_statistics
+from src.utils.signals import shutdown_event
+
+
+class JobWorker:
+    """
+    Выполнение фоновых заданий вне процесса бота
+
+    Бот только записывает расписания в хранилище заданий в Redis, а воркер
+    выполняет их в своем event loop, не занимая обработчики сообщений.
+    Задания выполняет один ведущий воркер, остальные ждут на паузе и
+    подхватывают выполнение при его отказе.
+    """
+    def __init__(self, config: Config):
+        self.config = config
+        self.logger = logger
+
+        # Бот нужен только для отправки сообщений, без диспетчера
+        self.bot = Bot(token=config.BOT_TOKEN)
+        self.redis = Redis.from_url(config.REDIS_URL)
+
+        db_args = config.get_database_args()
+        self.db = DatabaseService(db_args.pop("database_url"), **db_args)
+
+        # Изменения целей сбрасывают кэш статистики, общий с ботом
+        self.stats_cache = CacheService(self.redis, namespace='stats', **config.get_cache_args())
+
+        self.activity_counters = ActivityCounterService(
+            self.db,
+            hourly_retention=timedelta(hours=config.ACTIVITY_HOURLY_RETENTION)
+        )
+        self.activity_buffer = ActivityBuffer(
+            self.db,
+            counters=self.activity_counters,
+            max_size=config.ACTIVITY_BUFFER_SIZE,
+            batch_size=config.ACTIVITY_BATCH_SIZE,
+            flush_interval=config.ACTIVITY_FLUSH_INTERVAL,
+            put_timeout=config.ACTIVITY_PUT_TIMEOUT
+        )
+        self.analytics = AnalyticsService(self.db, buffer=self.activity_buffer, counters=self.activity_counters)
+        self.goals = GoalService(
+            self.db,
+            stats_cache=StatsCache(self.stats_cache),
+            sweep_chunk_size=config.GOAL_SWEEP_CHUNK_SIZE
+        )
+        self.savings = SavingsLedgerService(self.db)
+        self.daily_summaries = DailySummaryService(self.db, **config.get_summary_args())
+        self.report_stats = ReportStatisticsService(self.db)
+        self.notifications = NotificationService(
+            self.bot,
+            concurrency=config.DELIVERY_CONCURRENCY,
+            global_rate=config.DELIVERY_GLOBAL_RATE,
+            chat_interval=config.DELIVERY_CHAT_INTERVAL,
+            max_retries=config.DELIVERY_MAX_RETRIES
+        )
+
+        # Задания из Redis и локальные метрики процесса в одном планировщике,
+        # который работает только на ведущем воркере
+        self.scheduler = jobs.create_scheduler(**config.get_job_store_args())
+        self.scheduler.add_jobstore(MemoryJobStore(), 'local')
+        self.leader = LeaderElection(self.redis, **config.get_leader_args(key=config.WORKER_LEADER_KEY))
+        self.leader.on_elected(self._resume_scheduler)
+        self.leader.on_lost(self._pause_scheduler)
+
+        self._register_jobs()
+
+    def _register_jobs(self):
+        """Обработчики заданий, расписания которых регистрирует бот"""
+        jobs.registry.register('weekly_report', self._send_weekly_report)
+        jobs.registry.register('expire_overdue_goals', self._expire_overdue_goals)
+        jobs.registry.register('savings_compact', self.savings.compact)
+        jobs.registry.register('daily_summaries', self.daily_summaries.run)
+        jobs.registry.register('activity_counters_compact', self.activity_counters.compact)
+
+    async def _send_weekly_report(self):
+        """Отправка еженедельного отчета"""
+        try:
+            # Статистика считается пачками по всем активным пользователям
+            # и передается в рассылку по мере готовности. Текст строится в
+            # воркере рассылки, поэтому ошибка форматирования для одного
+            # пользователя не прерывает рассылку остальным
+            messages = (
+                (stats.user_id, partial(self._format_weekly_report, stats))
+                async for stats in self.report_stats.iter_weekly_stats(days=7)
+            )
+
+            report = await self.notifications.broadcast(messages, on_sent=self._on_report_sent)
+            self.logger.info(f"Еженедельный отчет: {report.format()}")
+
+        except Exception as e:
+            self.logger.error(f"Ошибка при отправке еженедельных отчетов: {e}")
+
+    @staticmethod
+    async def _format_weekly_report(stats: UserReportStats) -> str:
+        """Текст еженедельного отчета пользователя"""
+        return format_user_statistics(
+            stats.expenses_stats,
+            stats.weight_stats,
+            stats.sleep_stats,
+            stats.goals
+        )
+
+    async def _expire_overdue_goals(self):
+        """Перевод просроченных целей в FAILED и уведомление пользователей"""
+        try:
+            report = await self.notifications.broadcast(self._expired_goal_messages())
+            self.logger.info(f"Уведомления об истекших целях: {report.format()}")
+
+        except Exception as e:
+            self.logger.error(f"Ошибка при проверке просроченных целей: {e}")
+
+    async def _expired_goal_messages(self):
+        """
+        Одно сообщение на пользователя по пачкам истекших целей
+
+        Пачки отдаются после фиксации и сразу уходят в рассылку. Цели
+        пользователя в конце пачки придерживаются до следующей: она может
+        начаться с того же пользователя.
+        """
+        pending = []
+        async for chunk in self.goals.expire_overdue_goals():
+            for user_id, goals in groupby(chunk, key=attrgetter('user_id')):
+                if pending and pending[0].user_id != user_id:
+                    yield pending[0].user_id, format_expired_goals(pending)
+                    pending = []
+                pending.extend(goals)
+
+        if pending:
+            yield pending[0].user_id, format_expired_goals(pending)
+
+    async def _on_report_sent(self, user_id: int):
+        """Логирование успешной отправки отчета"""
+        await self.analytics.log_activity(
+            user_id=user_id,
+            action=ActivityType.REPORT_SENT
+        )
+
+    async def _log_pool_stats(self):
+        """Логирование состояния пула соединений с БД и буфера активности"""
+        self.logger.info(f"Worker DB pool: {self.db.pool_metrics.format_log()}")
+        self.logger.info(f"Worker activity buffer: {self.activity_buffer.stats()}")
+
+    async def _resume_scheduler(self):
+        """Запуск заданий на ведущем воркере (пропущенные выполняются сразу)"""
+        self.scheduler.resume()
+
+    async def _pause_scheduler(self):
+        """Остановка запуска новых заданий при потере лидерства"""
+        if self.scheduler.running:
+            self.scheduler.pause()
+
+    async def _wait_for_stop(self, stop: asyncio.Event):
+        """Периодическая проверка хранилища до сигнала остановки"""
+        while not stop.is_set():
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), timeout=self.config.WORKER_POLL_INTERVAL)
+            # Задания, добавленные ботом, планировщик видит только при пробуждении
+            self.scheduler.wakeup()
+
+    async def start(self):
+        """Запуск воркера"""
+        stop = shutdown_event()
+        try:
+            self.activity_buffer.start()
+
+            # Планировщик стартует на паузе и выполняет задания после избрания
+            if self.config.DB_POOL_LOG_INTERVAL > 0:
+                self.scheduler.add_job(
+                    self._log_pool_stats,
+                    trigger='interval',
+                    seconds=self.config.DB_POOL_LOG_INTERVAL,
+                    jobstore='local'
+                )
+            self.scheduler.start(paused=True)
+            self.leader.start()
+
+            await self._wait_for_stop(stop)
+        finally:
+            # Новые задания не запускаются, выполняемые дорабатывают
+            if self.scheduler.running:
+                self.scheduler.pause()
+            cancelled = await jobs.registry.drain(self.config.WORKER_DRAIN_TIMEOUT)
+            if cancelled:
+                self.logger.warning(f"Воркер: {cancelled} заданий прервано по таймауту")
+            if self.scheduler.running:
+                self.scheduler.shutdown(wait=False)
+
+            await self.leader.stop()
+            # Запись накопленной активности до закрытия пула соединений
+            await self.activity_buffer.stop()
+            await self.redis.aclose()
+            await self.bot.session.close()
+            await self.db.close()
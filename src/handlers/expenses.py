@@ -12,6 +12,8 @@ from src.models.savings import RoundingStep
 from src.services.expenses import ExpensesService
 from src.services.analytics import AnalyticsService
 from src.models.analytics import ActivityType
+from src.utils.keyboards import KeyboardFactory
+from src.utils.pagination import Cursor
 
 
 expenses_router = Router()
@@ -49,17 +51,14 @@ async def transaction_type_selected(callback: CallbackQuery, state: FSMContext,
     trans_type = callback.data.split(":")[1]
     await state.update_data(transaction_type=trans_type)
     
-    # Получаем категории для выбранного типа транзакции
+    # Получаем категории для выбранного типа транзакции (из кэша)
     categories = await expenses_service.get_user_categories(
         callback.from_user.id,
         CategoryType[trans_type.upper()]
     )
     
-    # Формируем клавиатуру с категориями
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text=cat.name, callback_data=f"cat:{cat.id}")]
-        for cat in categories
-    ] + [[InlineKeyboardButton(text="➕ Новая категория", callback_data="new_category")]])
+    # Клавиатура с категориями собирается один раз на список
+    keyboard = KeyboardFactory.get_categories_keyboard(categories)
     
     await callback.message.edit_text(
         "Выберите категорию:",
@@ -135,12 +134,17 @@ async def process_description(
     data = await state.get_data()
     
     # Создаем транзакцию
-    transaction, savings = await expenses_service.create_transaction(
-        user_id=message.from_user.id,
-        category_id=data['category_id'],
-        amount=data['amount'],
-        description=description
-    )
+    try:
+        transaction, savings = await expenses_service.create_transaction(
+            user_id=message.from_user.id,
+            category_id=data['category_id'],
+            amount=data['amount'],
+            description=description
+        )
+    except ValueError:
+        await message.answer("Категория не найдена. Начните добавление транзакции заново.")
+        await state.clear()
+        return
     
     # Логируем действие в аналитику
     await analytics_service.log_activity(
@@ -221,6 +225,36 @@ async def cmd_balance(message: Message, expenses_service: ExpensesService):
     
     await message.answer(response)
 
+@expenses_router.callback_query(F.data.startswith("finance:history"))
+async def show_transactions_history(callback: CallbackQuery, expenses_service: ExpensesService):
+    """Показ истории транзакций (постранично, курсор в callback data)"""
+    cursor = Cursor.decode(callback.data.removeprefix("finance:history").lstrip(":"))
+    page = await expenses_service.get_transactions_page(callback.from_user.id, cursor=cursor)
+    
+    response = "🔄 История операций\n\n"
+    
+    if not page.items:
+        response += "Операций пока нет."
+    
+    current_date = None
+    for transaction, category_name, category_type in page.items:
+        transaction_date = transaction.created_at.strftime("%d.%m.%Y")
+        
+        if transaction_date != current_date:
+            response += f"\n📅 {transaction_date}\n"
+            current_date = transaction_date
+        
+        sign = "+" if category_type == CategoryType.INCOME.value else "−"
+        response += f"• {sign}{transaction.amount:,.2f} ₽ {category_name}"
+        if transaction.description:
+            response += f" — {transaction.description}"
+        response += "\n"
+    
+    await callback.message.edit_text(
+        response,
+        reply_markup=KeyboardFactory.get_pagination_keyboard("finance:history", page, "menu:finances")
+    )
+
 @expenses_router.callback_query(F.data == "add_category")
 async def start_category_creation(callback: CallbackQuery, state: FSMContext):
     """Обработчик начала создания категории"""
@@ -236,6 +270,45 @@ async def start_category_creation(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(CategoryStates.choosing_type)
 
+@expenses_router.callback_query(CategoryStates.choosing_type, F.data.startswith("cat_type:"))
+async def category_type_selected(callback: CallbackQuery, state: FSMContext):
+    """Обработчик выбора типа новой категории"""
+    category_type = callback.data.split(":")[1]
+    await state.update_data(category_type=category_type)
+    await callback.message.edit_text("Введите название категории:")
+    await state.set_state(CategoryStates.entering_name)
+
+@expenses_router.message(CategoryStates.entering_name)
+async def process_category_name(message: Message, state: FSMContext, expenses_service: ExpensesService):
+    """Обработчик ввода названия категории"""
+    name = message.text.strip() if message.text else ""
+    if not name or len(name) > 100:
+        await message.answer("Название должно содержать от 1 до 100 символов. Попробуйте снова:")
+        return
+    
+    data = await state.get_data()
+    category_type = CategoryType(data['category_type'])
+    
+    # Создание категории сбрасывает кэш списка категорий этого типа
+    await expenses_service.create_category(
+        user_id=message.from_user.id,
+        name=name,
+        category_type=category_type
+    )
+    
+    # Если категория создавалась при вводе транзакции - возвращаемся к выбору
+    if data.get('transaction_type') == category_type.value:
+        categories = await expenses_service.get_user_categories(message.from_user.id, category_type)
+        await message.answer(
+            f"✅ Категория «{name}» создана!\n\nВыберите категорию:",
+            reply_markup=KeyboardFactory.get_categories_keyboard(categories)
+        )
+        await state.set_state(TransactionStates.choosing_category)
+        return
+    
+    await message.answer(f"✅ Категория «{name}» создана!")
+    await state.clear()
+
 @expenses_router.message(Command("settings"))
 async def cmd_settings(message: Message, expenses_service: ExpensesService):
     """Обработчик команды настроек округления"""
@@ -1,13 +1,10 @@
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
-from datetime import datetime, timedelta
 
 from src.utils.keyboards import KeyboardFactory
-from src.services.expenses import ExpensesService
-from src.services.sleep_weight import SleepWeightService
-from src.services.goals import GoalService
 from src.services.analytics import AnalyticsService
+from src.services.stats_screen import StatisticsScreenService
 from src.models.analytics import ActivityType
 
 navigation_router = Router()
@@ -41,12 +38,7 @@ async def cmd_menu(message: Message):
     )
 
 @navigation_router.callback_query(F.data.startswith("menu:"))
-async def process_menu_navigation(
-    callback: CallbackQuery,
-    expenses_service: ExpensesService,
-    sleep_weight_service: SleepWeightService,
-    goals_service: GoalService
-):
+async def process_menu_navigation(callback: CallbackQuery, stats_service: StatisticsScreenService):
     """Обработчик навигации по меню"""
     section = callback.data.split(":")[1]
     
@@ -93,12 +85,8 @@ async def process_menu_navigation(
         )
     
     elif section == "stats":
-        stats = await get_user_statistics(
-            callback.from_user.id,
-            expenses_service,
-            sleep_weight_service,
-            goals_service
-        )
+        # Разделы берутся из кэша, недостающие считаются параллельно
+        stats = await stats_service.render(callback.from_user.id)
         await callback.message.edit_text(
             stats,
             reply_markup=KeyboardFactory.get_main_menu()
@@ -113,49 +101,3 @@ async def process_menu_navigation(
             "• Часовой пояс",
             reply_markup=KeyboardFactory.get_settings_menu()
         )
-
-async def get_user_statistics(
-    user_id: int,
-    expenses_service: ExpensesService,
-    sleep_weight_service: SleepWeightService,
-    goals_service: GoalService
-) -> str:
-    """Формирование общей статистики пользователя"""
-    # Получаем данные из разных сервисов
-    expenses_stats = await expenses_service.get_balance(user_id)
-    weight_stats = await sleep_weight_service.get_weight_stats(user_id)
-    sleep_stats = await sleep_weight_service.get_sleep_stats(user_id)
-    goals = await goals_service.get_user_goals(user_id)
-    
-    # Формируем текст статистики
-    stats = "📊 Ваша статистика:\n\n"
-    
-    # Финансы
-    stats += "💰 Финансы (текущий месяц):\n"
-    stats += f"• Доходы: {expenses_stats['income']:,.2f} ₽\n"
-    stats += f"• Расходы: {expenses_stats['expenses']:,.2f} ₽\n"
-    stats += f"• Баланс: {expenses_stats['balance']:+,.2f} ₽\n\n"
-    
-    # Вес
-    if weight_stats['current_weight']:
-        stats += "⚖️ Вес:\n"
-        stats += f"• Текущий: {weight_stats['current_weight']} кг\n"
-        if weight_stats['week_start_weight']:
-            change = weight_stats['current_weight'] - weight_stats['week_start_weight']
-            stats += f"• Изменение за неделю: {change:+.1f} кг\n\n"
-    
-    # Сон
-    if sleep_stats['avg_duration']:
-        stats += "😴 Сон:\n"
-        stats += f"• Средняя продолжительность: {sleep_stats['avg_duration']:.1f} ч\n"
-        stats += f"• Записей за неделю: {sleep_stats['records_count']}\n\n"
-    
-    # Цели
-    if goals:
-        stats += "🎯 Активные цели:\n"
-        for goal in goals:
-            progress = (goal.current_value - goal.start_value) / \
-                      (goal.target_value - goal.start_value) * 100
-            stats += f"• {goal.title}: {abs(progress):.1f}%\n"
-    
-    return stats
\ No newline at end of file
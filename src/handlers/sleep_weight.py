@@ -1,11 +1,13 @@
 from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, BufferedInputFile
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from datetime import datetime, time, timedelta
 import re
 
+from src.services.charts import ChartService
+
 
 sleep_weight_router = Router()
 
@@ -151,4 +153,33 @@ async def process_sleep_time(message: Message, state: FSMContext):
         "Введите время пробуждения в формате ЧЧ:ММ\n"
         "Например: 07:30"
     )
-    await state.set_state(SleepRecordStates.entering_wake_time)
\ No newline at end of file
+    await state.set_state(SleepRecordStates.entering_wake_time)
+
+@sleep_weight_router.callback_query(F.data.in_({"health:weight_graph", "health:sleep_analysis"}))
+async def show_health_chart(callback: CallbackQuery, chart_service: ChartService, sleep_weight_service):
+    """Отправка графика веса или анализа сна"""
+    user_id = callback.from_user.id
+    
+    if callback.data == "health:weight_graph":
+        chart = await chart_service.weight_chart(user_id)
+        caption = "📈 Динамика веса"
+        empty = "Записей веса пока нет. Запишите вес командой /weight"
+    else:
+        chart = await chart_service.sleep_chart(user_id)
+        stats = await sleep_weight_service.get_sleep_stats(user_id, days=chart_service.sleep_days)
+        caption = f"📊 Сон за {chart_service.sleep_days} дней"
+        if stats['avg_duration']:
+            caption += f"\nСредняя продолжительность: {stats['avg_duration']:.1f} ч"
+        if stats['bedtime_deviation'] is not None:
+            caption += f"\nРазброс времени засыпания: ±{stats['bedtime_deviation']:.0f} мин"
+        empty = "Завершенных записей сна пока нет. Отмечайте сон командой /sleep"
+    
+    if chart is None:
+        await callback.message.answer(empty)
+        return
+    
+    # Неизмененный график отправляется по file_id без повторной загрузки
+    photo = chart.file_id or BufferedInputFile(chart.png, filename="chart.png")
+    message = await callback.message.answer_photo(photo, caption=caption)
+    if chart.file_id is None:
+        await chart_service.remember(chart, message.photo[-1].file_id)
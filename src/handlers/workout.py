@@ -7,6 +7,8 @@ from datetime import datetime
 
 from src.models.workout import Exercise
 from src.models.analytics import ActivityType
+from src.utils.keyboards import KeyboardFactory
+from src.utils.pagination import Cursor
 
 workout_router = Router()
 
@@ -26,7 +28,8 @@ async def cmd_workout(message: Message):
             InlineKeyboardButton(text="📊 Статистика", callback_data="workout:stats")
         ],
         [
-            InlineKeyboardButton(text="📋 История тренировок", callback_data="workout:history")
+            InlineKeyboardButton(text="📋 История тренировок", callback_data="workout:history"),
+            InlineKeyboardButton(text="🏆 Рекорды", callback_data="workout:records")
         ]
     ])
     await message.answer(
@@ -92,8 +95,8 @@ async def process_sets(
         sets = int(message.text)
         data = await state.get_data()
         
-        # Создаем запись об упражнении
-        exercise = await exercise_service.add_exercise(
+        # Создаем запись об упражнении и проверяем рекорды
+        exercise, new_records = await exercise_service.add_exercise(
             user_id=message.from_user.id,
             name=data['exercise_name'],
             weight=data['weight'],
@@ -129,12 +132,18 @@ async def process_sets(
         )
         
         if stats['prev_weight']:
-            weight_diff = data['weight'] - stats['prev_weight']
+            weight_diff = data['weight'] - float(stats['prev_weight'])
             response += f"Изменение веса: {weight_diff:+.1f} кг\n"
         
         if stats['max_weight']:
             response += f"Ваш рекорд: {stats['max_weight']} кг\n"
         
+        if stats['sessions_count'] > 1:
+            response += f"Тренировок с упражнением: {stats['sessions_count']}\n"
+        
+        if new_records:
+            response += f"\n🎉 Новый рекорд ({data['reps']} повт.): {', '.join(new_records)}!\n"
+        
         await message.answer(response)
         await state.clear()
         
@@ -170,18 +179,22 @@ async def show_workout_stats(callback: CallbackQuery, exercise_service):
         ]])
     )
 
-@workout_router.callback_query(F.data == "workout:history")
+@workout_router.callback_query(F.data.startswith("workout:history"))
 async def show_workout_history(callback: CallbackQuery, exercise_service):
-    """Показ истории тренировок"""
-    exercises = await exercise_service.get_user_history(
+    """Показ истории тренировок (постранично, курсор в callback data)"""
+    cursor = Cursor.decode(callback.data.removeprefix("workout:history").lstrip(":"))
+    page = await exercise_service.get_history_page(
         user_id=callback.from_user.id,
-        limit=10
+        cursor=cursor
     )
     
     response = "📋 История тренировок\n\n"
     
+    if not page.items:
+        response += "Записей пока нет."
+    
     current_date = None
-    for exercise in exercises:
+    for exercise in page.items:
         exercise_date = exercise.workout_date.strftime("%d.%m.%Y")
         
         if exercise_date != current_date:
@@ -195,6 +208,33 @@ async def show_workout_history(callback: CallbackQuery, exercise_service):
             f"{exercise.sets}\n"
         )
     
+    await callback.message.edit_text(
+        response,
+        reply_markup=KeyboardFactory.get_pagination_keyboard("workout:history", page, "workout:back")
+    )
+
+@workout_router.callback_query(F.data == "workout:records")
+async def show_workout_records(callback: CallbackQuery, exercise_service):
+    """Показ личных рекордов"""
+    top_exercises = await exercise_service.get_user_top_exercises(callback.from_user.id)
+    records = await exercise_service.records.get_records(callback.from_user.id)
+    
+    response = "🏆 Личные рекорды\n\n"
+    
+    if not top_exercises:
+        response += "Пока нет рекордов — запишите первое упражнение!"
+    
+    for exercise in top_exercises:
+        response += (
+            f"🏋️‍♂️ {exercise['name']}: {exercise['max_weight']} кг, "
+            f"1ПМ ≈ {exercise['best_e1rm']} кг, записей: {exercise['total_sets']}\n"
+        )
+        for record in records.get(exercise['name'], []):
+            response += (
+                f"   • {record.rep_range} повт.: {record.best_weight} кг, "
+                f"объем {record.best_volume:.0f} кг\n"
+            )
+    
     await callback.message.edit_text(
         response,
         reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
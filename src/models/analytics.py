@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum, Index, UniqueConstraint
 from enum import Enum
 from datetime import datetime
 from src.models.base import BaseModel
@@ -17,14 +17,39 @@ class ActivityType(Enum):
     GOAL_COMPLETED = "goal_completed"        
     REPORT_VIEWED = "report_viewed"          
     SETTINGS_CHANGED = "settings_changed"    
+    BOT_STARTED = "bot_started"
+    WORKOUT_RECORDED = "workout_recorded"
+    REPORT_SENT = "report_sent"
 
 class UserActivity(BaseModel):
     """
     Модель для отслеживания активности пользователя
     """
     __tablename__ = 'user_activities'
+    __table_args__ = (
+        Index('ix_user_activities_user_id_timestamp', 'user_id', 'timestamp'),
+    )
 
-    user_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
     action = Column(SQLEnum(ActivityType), nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
-    additional_data = Column(String(500))
\ No newline at end of file
+    additional_data = Column(String(500))
+
+class ActivityGranularity(str, Enum):
+    """Размер корзины счетчиков активности"""
+    HOUR = "hour"
+    DAY = "day"
+
+class ActivityCounter(BaseModel):
+    """
+    Предагрегированные счетчики действий по часовым и дневным корзинам
+    """
+    __tablename__ = 'activity_counters'
+    __table_args__ = (
+        UniqueConstraint('granularity', 'bucket_start', 'action', name='uq_activity_counters_bucket_action'),
+    )
+
+    granularity = Column(String(10), nullable=False)  # 'hour' или 'day'
+    bucket_start = Column(DateTime, nullable=False)
+    action = Column(String(50), nullable=False)  # Значение ActivityType
+    count = Column(Integer, nullable=False, default=0)
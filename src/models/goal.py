@@ -1,5 +1,5 @@
 from enum import Enum
-from sqlalchemy import Column, Integer, String, Numeric, DateTime
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Index, text
 from src.models.base import BaseModel
 
 class GoalType(str, Enum):
@@ -16,6 +16,15 @@ class GoalStatus(str, Enum):
 class Goal(BaseModel):
    """Модель целей пользователя"""
    __tablename__ = 'goals'
+   __table_args__ = (
+       # Частичный индекс для ночной проверки просроченных активных целей
+       Index(
+           'ix_goals_active_deadline',
+           'deadline',
+           postgresql_where=text("status = 'active'"),
+           sqlite_where=text("status = 'active'")
+       ),
+   )
    
    title = Column(String(200), nullable=False)
    description = Column(String(500))
@@ -1,6 +1,6 @@
 from decimal import Decimal
 from src.models.base import BaseModel
-from sqlalchemy import Column, Integer, Numeric, Enum, Boolean
+from sqlalchemy import Column, Integer, Numeric, Enum, Boolean, ForeignKey, Index
 import enum
 
 class RoundingStep(enum.Enum):
@@ -18,8 +18,25 @@ class UserSettings(BaseModel):
     savings_enabled = Column(Boolean, default=True)
 
 class SavingsAccount(BaseModel):
-    """Модель накопительного счёта"""
+    """
+    Снимок накопительного счёта
+    
+    balance учитывает записи журнала до snapshot_entry_id включительно,
+    более новые записи досуммируются при чтении баланса
+    """
     __tablename__ = 'savings_accounts'
     
     user_id = Column(Integer, unique=True, nullable=False)
-    balance = Column(Numeric(10, 2), default=0)
\ No newline at end of file
+    balance = Column(Numeric(10, 2), default=0)
+    snapshot_entry_id = Column(Integer, nullable=False, default=0)
+
+class SavingsEntry(BaseModel):
+    """Запись журнала пополнений накопительного счёта (только добавление)"""
+    __tablename__ = 'savings_entries'
+    __table_args__ = (
+        Index('ix_savings_entries_user_id_id', 'user_id', 'id'),
+    )
+    
+    user_id = Column(Integer, nullable=False)
+    amount = Column(Numeric(10, 2), nullable=False)
+    transaction_id = Column(Integer, ForeignKey('transactions.id'))
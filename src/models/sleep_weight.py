@@ -1,19 +1,85 @@
-from sqlalchemy import Column, DateTime, Integer, Numeric
+from sqlalchemy import Column, Date, DateTime, Integer, Numeric, Index, UniqueConstraint, text
 from src.models.base import BaseModel
 
 class SleepRecord(BaseModel):
     '''Модель записи сна'''
     __tablename__ = 'sleep_records'
+    __table_args__ = (
+        Index('ix_sleep_records_user_id_sleep_time', 'user_id', 'sleep_time'),
+        # Частичный индекс для поиска незавершенной записи сна
+        Index(
+            'ix_sleep_records_open',
+            'user_id', 'sleep_time',
+            postgresql_where=text('wake_time IS NULL'),
+            sqlite_where=text('wake_time IS NULL')
+        ),
+    )
 
     sleep_time = Column(DateTime, nullable=False)
-    wake_time = Column(DateTime, nullable=False)
+    wake_time = Column(DateTime)  # NULL, пока сон не завершен
     user_id = Column(Integer, nullable=False)
 
 
 class WeightRecord(BaseModel):
     '''Модель записи веса'''
     __tablename__ = 'weight_records'
+    __table_args__ = (
+        Index('ix_weight_records_user_id_record_date', 'user_id', 'record_date'),
+    )
 
     weight = Column(Numeric(4, 1), nullable=False)
     user_id = Column(Integer, nullable=False)
-    record_date = Column(DateTime, nullable=False)
\ No newline at end of file
+    record_date = Column(DateTime, nullable=False)
+
+
+class SleepDailySummary(BaseModel):
+    '''
+    Итоги сна пользователя за сутки
+
+    Сутки сна начинаются в 12:00 предыдущего дня, поэтому ночь целиком
+    попадает в один день. Заполняется ночным заданием по завершенным суткам.
+    '''
+    __tablename__ = 'sleep_daily_summaries'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'day', name='uq_sleep_daily_summaries_user_day'),
+    )
+
+    user_id = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False)
+    total_hours = Column(Numeric(5, 2), nullable=False)  # Суммарный сон за сутки
+    sessions_count = Column(Integer, nullable=False)
+    first_bedtime = Column(DateTime, nullable=False)  # Самое раннее засыпание
+    last_wake_time = Column(DateTime, nullable=False)  # Самое позднее пробуждение
+
+
+class WeightDailySummary(BaseModel):
+    '''
+    Итоги взвешиваний пользователя за сутки
+
+    trend_weight - экспоненциально сглаженный вес, продолжающий тренд
+    предыдущего дня с измерениями.
+    '''
+    __tablename__ = 'weight_daily_summaries'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'day', name='uq_weight_daily_summaries_user_day'),
+    )
+
+    user_id = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False)
+    min_weight = Column(Numeric(4, 1), nullable=False)
+    avg_weight = Column(Numeric(5, 2), nullable=False)
+    records_count = Column(Integer, nullable=False)
+    trend_weight = Column(Numeric(5, 2), nullable=False)
+
+
+class DailySummaryState(BaseModel):
+    '''
+    Граница посчитанных суточных итогов пользователя
+
+    Итоги сна и веса за дни до summarized_through (не включая) посчитаны
+    без пропусков, более поздние дни читаются из исходных записей.
+    '''
+    __tablename__ = 'daily_summary_states'
+
+    user_id = Column(Integer, unique=True, nullable=False)
+    summarized_through = Column(Date, nullable=False)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, Enum, Index, Date, UniqueConstraint
 from src.models.base import BaseModel
 from enum import Enum as PyEnum
 
@@ -19,8 +19,24 @@ class Category(BaseModel):
 class Transaction(BaseModel):
     """Модель транзакции (расход/доход)"""
     __tablename__ = 'transactions'
+    __table_args__ = (
+        Index('ix_transactions_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     amount = Column(Numeric(10, 2), nullable=False)  # Сумма с двумя знаками после запятой
     category_id = Column(Integer, ForeignKey('categories.id'), nullable=False)
     user_id = Column(Integer, nullable=False)
-    description = Column(String(200))
\ No newline at end of file
+    description = Column(String(200))
+
+class MonthlyBalance(BaseModel):
+    """Помесячные итоги транзакций пользователя по типу категории"""
+    __tablename__ = 'monthly_balances'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'month', 'category_type', name='uq_monthly_balances_user_month_type'),
+    )
+    
+    user_id = Column(Integer, nullable=False)
+    month = Column(Date, nullable=False)  # Первый день месяца
+    category_type = Column(String(20), nullable=False)  # 'income' или 'expense'
+    total = Column(Numeric(12, 2), nullable=False, default=0)
+    transactions_count = Column(Integer, nullable=False, default=0)
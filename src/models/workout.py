@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, DateTime, String, Numeric
+from sqlalchemy import Column, Integer, Date, DateTime, String, Numeric, Index, UniqueConstraint
 from src.models.base import BaseModel
 
 
 class Exercise(BaseModel):
     '''Модель упражнения'''
     __tablename__ = 'exercises'
+    __table_args__ = (
+        Index('ix_exercises_user_id_workout_date', 'user_id', 'workout_date'),
+        Index('ix_exercises_user_id_name_workout_date', 'user_id', 'name', 'workout_date'),
+    )
 
     name = Column(String(100), nullable=False)
     weight = Column(Numeric(5, 2))
@@ -13,3 +17,48 @@ class Exercise(BaseModel):
     user_id = Column(Integer, nullable=False)
     workout_date = Column(DateTime, nullable=False)
 
+
+class ExerciseAggregate(BaseModel):
+    '''
+    Накопленные показатели упражнения пользователя
+
+    Обновляется вместе с каждой записью упражнения, поэтому статистика
+    после подхода читается одной строкой независимо от длины истории.
+    '''
+    __tablename__ = 'exercise_aggregates'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'name', name='uq_exercise_aggregates_user_name'),
+    )
+
+    user_id = Column(Integer, nullable=False)
+    name = Column(String(100), nullable=False)
+    last_weight = Column(Numeric(5, 2))
+    prev_weight = Column(Numeric(5, 2))  # Вес в записи перед последней
+    last_workout_date = Column(DateTime, nullable=False)
+    max_weight = Column(Numeric(5, 2))
+    reps_sum = Column(Integer, nullable=False, default=0)
+    reps_count = Column(Integer, nullable=False, default=0)
+    total_volume = Column(Numeric(14, 2), nullable=False, default=0)  # Σ вес × повторения × подходы
+    sessions_count = Column(Integer, nullable=False, default=0)  # Дней с этим упражнением
+    last_session_date = Column(Date, nullable=False)
+
+
+class PersonalRecord(BaseModel):
+    '''
+    Личные рекорды пользователя по упражнению и диапазону повторений
+
+    Обновляется при записи упражнения, экраны статистики и рекордов
+    читают эту таблицу вместо группировки всей истории.
+    '''
+    __tablename__ = 'personal_records'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'name', 'rep_range', name='uq_personal_records_user_name_range'),
+    )
+
+    user_id = Column(Integer, nullable=False)
+    name = Column(String(100), nullable=False)
+    rep_range = Column(String(10), nullable=False)  # '1-3', '4-6', '7-12', '13+'
+    best_weight = Column(Numeric(5, 2), nullable=False)
+    best_e1rm = Column(Numeric(6, 2), nullable=False)  # Расчетный 1ПМ по Эпли
+    best_volume = Column(Numeric(10, 2), nullable=False)  # Вес × повторения × подходы
+    achieved_at = Column(DateTime, nullable=False)  # Дата последнего улучшения
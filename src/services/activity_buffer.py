@@ -0,0 +1,193 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from loguru import logger
+from sqlalchemy import insert
+
+from src.models.analytics import ActivityType, UserActivity
+from src.services.activity_counters import ActivityCounterService
+
+
+ACTIVITY_COLUMNS = ('user_id', 'action', 'timestamp', 'additional_data', 'created_at', 'updated_at')
+
+
+@dataclass(frozen=True)
+class ActivityEvent:
+    """Событие активности, ожидающее записи в БД"""
+    user_id: int
+    action: ActivityType
+    timestamp: datetime
+    additional_data: Optional[str] = None
+
+
+class ActivityBuffer:
+    """
+    Отложенная пакетная запись активности пользователей
+
+    События складываются в ограниченную очередь и записываются фоновой
+    задачей пачками по batch_size или раз в flush_interval секунд
+    вместе с обновлением счетчиков по корзинам.
+    В PostgreSQL пачка записывается через COPY, в остальных БД - одним
+    executemany. Заполненная очередь задерживает вызывающий код до
+    put_timeout секунд, после чего событие отбрасывается.
+    """
+    def __init__(
+        self,
+        db_service,
+        counters: Optional[ActivityCounterService] = None,
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        put_timeout: float = 1.0
+    ):
+        self.db = db_service
+        self.counters = counters
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def start(self):
+        """Запуск фоновой записи"""
+        if self._task is None:
+            self._closed = False
+            self._task = asyncio.create_task(self._run())
+
+    async def put(
+        self,
+        user_id: int,
+        action: ActivityType,
+        metadata: Optional[dict] = None,
+        timestamp: Optional[datetime] = None
+    ) -> bool:
+        """
+        Добавление события в буфер
+
+        :param user_id: ID пользователя
+        :param action: Тип действия
+        :param metadata: Дополнительные данные (сохраняются в JSON)
+        :param timestamp: Время события (по умолчанию - текущее)
+        :return: False, если событие отброшено
+        """
+        if self._closed:
+            self.dropped += 1
+            return False
+
+        event = ActivityEvent(
+            user_id=user_id,
+            action=ActivityType(action),
+            timestamp=timestamp or datetime.utcnow(),
+            additional_data=json.dumps(metadata, ensure_ascii=False, default=str)[:500] if metadata else None
+        )
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(event), timeout=self.put_timeout)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                logger.warning("Буфер активности переполнен, событие отброшено")
+                return False
+        return True
+
+    async def stop(self):
+        """Остановка с записью всех накопленных событий"""
+        self._closed = True
+        if self._task is not None:
+            # Фоновая задача завершает текущую пачку и выходит
+            # не позже чем через flush_interval
+            await self._task
+            self._task = None
+
+        while not self._queue.empty():
+            await self._flush(self._take_batch())
+
+    def _take_batch(self) -> List[ActivityEvent]:
+        """Пачка событий из очереди без ожидания"""
+        batch = []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        """Фоновая запись пачек по размеру или по времени"""
+        loop = asyncio.get_running_loop()
+        while not self._closed:
+            try:
+                batch = [await asyncio.wait_for(self._queue.get(), timeout=self.flush_interval)]
+            except asyncio.TimeoutError:
+                continue
+            deadline = loop.time() + self.flush_interval
+
+            # Добираем пачку до batch_size, но не дольше flush_interval
+            while len(batch) < self.batch_size and not self._closed:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[ActivityEvent]):
+        """Запись пачки событий"""
+        if not batch:
+            return
+
+        now = datetime.utcnow()
+        rows = [
+            (event.user_id, event.action, event.timestamp, event.additional_data, now, now)
+            for event in batch
+        ]
+        try:
+            async with self.db.get_session() as session:
+                await self._write(session, rows)
+        except Exception as e:
+            self.failed += len(rows)
+            logger.error(f"Ошибка записи активности ({len(rows)} событий): {e}")
+            return
+
+        self.written += len(rows)
+        self.batches += 1
+
+    async def _write(self, session, rows: List[tuple]):
+        """Вставка строк user_activities и обновление счетчиков в транзакции сессии"""
+        if self.counters is not None:
+            await self.counters.increment(session, ((row[1], row[2]) for row in rows))
+
+        if self.db.dialect_name == 'postgresql':
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                UserActivity.__tablename__,
+                # Enum хранится в PostgreSQL по имени члена
+                records=[(row[0], row[1].name, *row[2:]) for row in rows],
+                columns=ACTIVITY_COLUMNS
+            )
+            return
+
+        await session.execute(
+            insert(UserActivity.__table__),
+            [dict(zip(ACTIVITY_COLUMNS, row)) for row in rows]
+        )
+
+    def stats(self) -> dict:
+        """Счетчики буфера"""
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batches': self.batches
+        }
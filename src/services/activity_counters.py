@@ -0,0 +1,177 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+
+from src.models.analytics import ActivityCounter, ActivityGranularity, ActivityType
+from src.utils.sql import dialect_insert
+
+
+class ActivityCounterService:
+    """
+    Счетчики действий пользователей по временным корзинам
+
+    Счетчики увеличиваются вместе с записью событий в user_activities.
+    Свежие данные хранятся по часам, старые сворачиваются в дневные
+    корзины, поэтому отчеты читают сотни строк вместо всего журнала.
+    Границы периода учитываются с точностью до корзины.
+    """
+    def __init__(self, db_service, hourly_retention: timedelta = timedelta(hours=48)):
+        self.db = db_service
+        self.hourly_retention = hourly_retention
+
+    @staticmethod
+    def hour_of(moment: datetime) -> datetime:
+        """Начало часовой корзины"""
+        return moment.replace(minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def day_of(moment: datetime) -> datetime:
+        """Начало дневной корзины"""
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    async def increment(self, session, events: Iterable[Tuple[ActivityType, datetime]]):
+        """
+        Учет событий в часовых корзинах (в транзакции вызывающего кода)
+
+        :param session: Текущая сессия
+        :param events: Пары (тип действия, время события)
+        """
+        counts = Counter(
+            (self.hour_of(timestamp), ActivityType(action).value) for action, timestamp in events
+        )
+        if not counts:
+            return
+
+        await self._upsert(session, ActivityGranularity.HOUR, counts)
+
+    async def _upsert(self, session, granularity: ActivityGranularity, counts: Dict[Tuple[datetime, str], int]):
+        """Прибавление количества к корзинам"""
+        now = datetime.utcnow()
+        statement = dialect_insert(self.db.dialect_name)(ActivityCounter.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=['granularity', 'bucket_start', 'action'],
+            set_={
+                'count': ActivityCounter.count + statement.excluded['count'],
+                'updated_at': now
+            }
+        )
+        # Порядок строк одинаков у всех писателей, чтобы не ловить взаимоблокировки
+        await session.execute(statement, [
+            {
+                'granularity': granularity.value,
+                'bucket_start': bucket_start,
+                'action': action,
+                'count': count,
+                'created_at': now,
+                'updated_at': now
+            }
+            for (bucket_start, action), count in sorted(counts.items())
+        ])
+
+    async def get_counts(self, since: datetime, until: Optional[datetime] = None) -> Dict[ActivityType, int]:
+        """
+        Количество действий каждого типа за период
+
+        :param since: Начало периода
+        :param until: Конец периода (по умолчанию - без ограничения)
+        :return: Словарь {тип действия: количество} по убыванию количества
+        """
+        async with self.db.get_session() as session:
+            result = await session.execute(
+                select(
+                    ActivityCounter.action,
+                    func.sum(ActivityCounter.count).label('count')
+                ).where(
+                    *self._period_filter(since, until)
+                ).group_by(
+                    ActivityCounter.action
+                ).order_by(
+                    func.sum(ActivityCounter.count).desc()
+                )
+            )
+            return {ActivityType(action): count for action, count in result}
+
+    async def get_timeline(
+        self,
+        since: datetime,
+        until: Optional[datetime] = None
+    ) -> List[Tuple[datetime, ActivityType, int]]:
+        """
+        Количество действий по дням для графиков использования
+
+        :param since: Начало периода
+        :param until: Конец периода (по умолчанию - без ограничения)
+        :return: Список (день, тип действия, количество) по возрастанию дня
+        """
+        async with self.db.get_session() as session:
+            result = await session.execute(
+                select(
+                    ActivityCounter.bucket_start,
+                    ActivityCounter.action,
+                    ActivityCounter.count
+                ).where(
+                    *self._period_filter(since, until)
+                )
+            )
+            days = Counter()
+            for bucket_start, action, count in result:
+                days[(self.day_of(bucket_start), action)] += count
+
+        return [
+            (day, ActivityType(action), count)
+            for (day, action), count in sorted(days.items())
+        ]
+
+    def _period_filter(self, since: datetime, until: Optional[datetime]) -> list:
+        """Условия отбора часовых и дневных корзин за период"""
+        hourly = (ActivityCounter.granularity == ActivityGranularity.HOUR.value) & (
+            ActivityCounter.bucket_start >= self.hour_of(since)
+        )
+        daily = (ActivityCounter.granularity == ActivityGranularity.DAY.value) & (
+            ActivityCounter.bucket_start >= self.day_of(since)
+        )
+        conditions = [hourly | daily]
+        if until is not None:
+            conditions.append(ActivityCounter.bucket_start < until)
+        return conditions
+
+    async def compact(self) -> int:
+        """
+        Свертка часовых корзин старше hourly_retention в дневные
+
+        :return: Количество свернутых часовых корзин
+        """
+        # Сворачиваются только целые дни
+        cutoff = self.day_of(datetime.utcnow() - self.hourly_retention)
+
+        async with self.db.get_session() as session:
+            result = await session.execute(
+                select(
+                    ActivityCounter.bucket_start,
+                    ActivityCounter.action,
+                    ActivityCounter.count
+                ).where(
+                    ActivityCounter.granularity == ActivityGranularity.HOUR.value,
+                    ActivityCounter.bucket_start < cutoff
+                )
+            )
+            rows = result.all()
+            if not rows:
+                return 0
+
+            days = Counter()
+            for bucket_start, action, count in rows:
+                days[(self.day_of(bucket_start), action)] += count
+
+            await self._upsert(session, ActivityGranularity.DAY, days)
+            # События пишутся с текущим временем, поэтому корзины старше
+            # cutoff больше не меняются
+            await session.execute(
+                delete(ActivityCounter).where(
+                    ActivityCounter.granularity == ActivityGranularity.HOUR.value,
+                    ActivityCounter.bucket_start < cutoff
+                )
+            )
+            return len(rows)
@@ -1,7 +1,12 @@
+import json
 from datetime import datetime, timedelta
-from sqlalchemy import func, Transaction
+from typing import Dict, Optional, Sequence
+from sqlalchemy import func, literal, select, union_all
 
-from src.models.analytics import UserActivity
+from src.models.analytics import ActivityType, UserActivity
+from src.services.activity_buffer import ActivityBuffer
+from src.services.activity_counters import ActivityCounterService
+from src.models.transaction import Transaction
 from src.models.workout import Exercise
 from src.models.sleep_weight import SleepRecord
 from src.models.goal import Goal, GoalStatus
@@ -11,75 +16,148 @@ class AnalyticsService:
     """
     Сервис для сбора и анализа статистики использования бота
     """
-    def __init__(self, db_service):
+    def __init__(
+        self,
+        db_service,
+        buffer: ActivityBuffer = None,
+        counters: ActivityCounterService = None
+    ):
         self.db = db_service
+        self.buffer = buffer
+        self.counters = counters or ActivityCounterService(db_service)
 
-    async def collect_user_activity(self, user_id: int, action: str):
+    async def log_activity(self, user_id: int, action: ActivityType, metadata: Optional[dict] = None):
+        """
+        Логирование действия пользователя
+        
+        При наличии буфера событие записывается в БД в фоне пачкой,
+        без отдельного INSERT на пути обработки запроса.
+        
+        :param user_id: ID пользователя
+        :param action: Выполненное действие
+        :param metadata: Дополнительные данные
+        """
+        if self.buffer is not None:
+            await self.buffer.put(user_id, action, metadata)
+            return
+        
+        await self.collect_user_activity(user_id, action, metadata)
+
+    async def collect_user_activity(self, user_id: int, action: str, metadata: Optional[dict] = None):
         """
         Сохранение информации о действиях пользователя
         
         :param user_id: ID пользователя
         :param action: Выполненное действие
+        :param metadata: Дополнительные данные
         """
-        with self.db.get_session() as session:
+        async with self.db.get_session() as session:
             activity = UserActivity(
                 user_id=user_id,
-                action=action,
-                timestamp=datetime.utcnow()
+                action=ActivityType(action),
+                timestamp=datetime.utcnow(),
+                additional_data=json.dumps(metadata, ensure_ascii=False, default=str)[:500] if metadata else None
             )
             session.add(activity)
+            await self.counters.increment(session, [(activity.action, activity.timestamp)])
+
+    @staticmethod
+    def _statistics_sources(start_date: datetime):
+        """Источники счетчиков статистики: (ключ, модель, условия)"""
+        return (
+            ('total_transactions', Transaction, (Transaction.created_at >= start_date,)),
+            ('total_workouts', Exercise, (Exercise.created_at >= start_date,)),
+            ('sleep_records', SleepRecord, (SleepRecord.created_at >= start_date,)),
+            ('active_goals', Goal, (Goal.status == GoalStatus.ACTIVE.value,))
+        )
 
     async def get_user_statistics(self, user_id: int, days: int = 7):
         """
         Получение статистики использования бота пользователем
         
+        Все счетчики считаются одним запросом со скалярными подзапросами.
+        
         :param user_id: ID пользователя
         :param days: Количество дней для анализа
         :return: Словарь со статистикой
         """
         start_date = datetime.utcnow() - timedelta(days=days)
+        sources = self._statistics_sources(start_date)
+        
+        query = select(*(
+            select(func.count(model.id))
+            .where(model.user_id == user_id, *conditions)
+            .scalar_subquery()
+            .label(key)
+            for key, model, conditions in sources
+        ))
         
-        with self.db.get_session() as session:
-            stats = {
-                'total_transactions': session.query(Transaction)
-                    .filter(Transaction.user_id == user_id)
-                    .filter(Transaction.created_at >= start_date)
-                    .count(),
-                'total_workouts': session.query(Exercise)
-                    .filter(Exercise.user_id == user_id)
-                    .filter(Exercise.created_at >= start_date)
-                    .count(),
-                'sleep_records': session.query(SleepRecord)
-                    .filter(SleepRecord.user_id == user_id)
-                    .filter(SleepRecord.created_at >= start_date)
-                    .count(),
-                'active_goals': session.query(Goal)
-                    .filter(Goal.user_id == user_id)
-                    .filter(Goal.status == GoalStatus.ACTIVE)
-                    .count()
-            }
-            
-            return stats
+        async with self.db.get_session() as session:
+            row = (await session.execute(query)).mappings().one()
+        
+        return {key: row[key] for key, _, _ in sources}
+
+    async def get_bulk_user_statistics(
+        self,
+        user_ids: Sequence[int],
+        days: int = 7,
+        chunk_size: int = 1000
+    ) -> Dict[int, dict]:
+        """
+        Получение статистики использования для группы пользователей
+        
+        На пачку из chunk_size пользователей выполняется один запрос:
+        сгруппированные счетчики всех таблиц объединяются через UNION ALL.
+        
+        :param user_ids: ID пользователей
+        :param days: Количество дней для анализа
+        :param chunk_size: Пользователей в одном запросе
+        :return: Словарь {user_id: статистика}
+        """
+        start_date = datetime.utcnow() - timedelta(days=days)
+        sources = self._statistics_sources(start_date)
+        stats = {
+            user_id: {key: 0 for key, _, _ in sources}
+            for user_id in user_ids
+        }
+        
+        ids = list(stats)
+        async with self.db.get_session() as session:
+            for offset in range(0, len(ids), chunk_size):
+                chunk = ids[offset:offset + chunk_size]
+                query = union_all(*(
+                    select(
+                        literal(key).label('key'),
+                        model.user_id,
+                        func.count(model.id)
+                    ).where(
+                        model.user_id.in_(chunk), *conditions
+                    ).group_by(model.user_id)
+                    for key, model, conditions in sources
+                ))
+                for key, user_id, count in await session.execute(query):
+                    stats[user_id][key] = count
+        
+        return stats
 
     async def get_popular_features(self, days: int = 7):
         """
         Получение статистики по популярности различных функций бота
         
+        Читает предагрегированные счетчики вместо журнала действий.
+        
         :param days: Количество дней для анализа
         :return: Словарь с статистикой использования функций
         """
         start_date = datetime.utcnow() - timedelta(days=days)
+        return await self.counters.get_counts(start_date)
+
+    async def get_usage_timeline(self, days: int = 30):
+        """
+        Получение количества действий по дням для дашбордов
         
-        with self.db.get_session() as session:
-            activities = session.query(
-                UserActivity.action,
-                func.count(UserActivity.id).label('count')
-            ).filter(
-                UserActivity.timestamp >= start_date
-            ).group_by(
-                UserActivity.action
-            ).order_by(
-                func.count(UserActivity.id).desc()
-            ).all()
-            
-            return {activity.action: activity.count for activity in activities}
+        :param days: Количество дней для анализа
+        :return: Список (день, тип действия, количество)
+        """
+        start_date = datetime.utcnow() - timedelta(days=days)
+        return await self.counters.get_timeline(start_date)
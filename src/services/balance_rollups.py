@@ -0,0 +1,169 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+
+from src.models.transaction import Category, CategoryType, MonthlyBalance, Transaction
+from src.utils.sql import dialect_insert, month_start
+
+
+class BalanceRollupService:
+    """
+    Помесячные итоги доходов и расходов
+
+    Таблица monthly_balances обновляется вместе с каждой транзакцией,
+    поэтому баланс за месяц читается без суммирования транзакций.
+    """
+    def __init__(self, db_service):
+        self.db = db_service
+
+    @staticmethod
+    def month_of(moment: datetime) -> date:
+        """Первый день месяца для даты"""
+        return moment.date().replace(day=1)
+
+    async def apply(
+        self,
+        session,
+        user_id: int,
+        category_type: str,
+        amount: Decimal,
+        created_at: datetime
+    ):
+        """
+        Учет транзакции в итогах месяца (в транзакции вызывающего кода)
+
+        :param session: Текущая сессия
+        :param user_id: ID пользователя
+        :param category_type: Тип категории (income/expense)
+        :param amount: Сумма транзакции
+        :param created_at: Время транзакции
+        """
+        insert = dialect_insert(self.db.dialect_name)
+        statement = insert(MonthlyBalance).values(
+            user_id=user_id,
+            month=self.month_of(created_at),
+            category_type=category_type,
+            total=amount,
+            transactions_count=1
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=['user_id', 'month', 'category_type'],
+            set_={
+                'total': MonthlyBalance.total + statement.excluded.total,
+                'transactions_count': MonthlyBalance.transactions_count + 1,
+                'updated_at': datetime.utcnow()
+            }
+        )
+        await session.execute(statement)
+
+    async def get_month_balance(self, user_id: int, month: date) -> Dict[str, Decimal]:
+        """
+        Баланс пользователя за месяц
+
+        :param user_id: ID пользователя
+        :param month: Первый день месяца
+        :return: Словарь с доходами, расходами и балансом
+        """
+        async with self.db.get_session() as session:
+            result = await session.execute(
+                select(MonthlyBalance.category_type, MonthlyBalance.total).where(
+                    MonthlyBalance.user_id == user_id,
+                    MonthlyBalance.month == month
+                )
+            )
+            totals = dict(result.all())
+
+        income = totals.get(CategoryType.INCOME.value) or Decimal('0')
+        expenses = totals.get(CategoryType.EXPENSE.value) or Decimal('0')
+        return {
+            'income': income,
+            'expenses': expenses,
+            'balance': income - expenses
+        }
+
+    def _raw_totals_query(self, user_id: Optional[int] = None):
+        """Итоги, посчитанные напрямую по транзакциям"""
+        month = month_start(Transaction.created_at, self.db.dialect_name)
+        query = select(
+            Transaction.user_id,
+            month.label('month'),
+            Category.type,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id)
+        ).join(
+            Category, Category.id == Transaction.category_id
+        ).group_by(
+            Transaction.user_id, month, Category.type
+        )
+        if user_id is not None:
+            query = query.where(Transaction.user_id == user_id)
+        return query
+
+    async def rebuild(self, user_id: Optional[int] = None) -> int:
+        """
+        Пересчет итогов по транзакциям
+
+        :param user_id: ID пользователя (по умолчанию - все пользователи)
+        :return: Количество записанных строк итогов
+        """
+        async with self.db.get_session() as session:
+            cleanup = delete(MonthlyBalance)
+            if user_id is not None:
+                cleanup = cleanup.where(MonthlyBalance.user_id == user_id)
+            await session.execute(cleanup)
+
+            now = datetime.utcnow()
+            result = await session.execute(self._raw_totals_query(user_id))
+            rows = [
+                {
+                    'user_id': row_user_id,
+                    'month': month,
+                    'category_type': category_type,
+                    'total': total,
+                    'transactions_count': count,
+                    'created_at': now,
+                    'updated_at': now
+                }
+                for row_user_id, month, category_type, total, count in result
+            ]
+            if rows:
+                await session.execute(MonthlyBalance.__table__.insert(), rows)
+            return len(rows)
+
+    async def check(self, user_id: Optional[int] = None) -> List[Tuple]:
+        """
+        Сверка итогов с суммами транзакций
+
+        :param user_id: ID пользователя (по умолчанию - все пользователи)
+        :return: Расхождения (user_id, месяц, тип, (итог, кол-во), (по транзакциям, кол-во))
+        """
+        async with self.db.get_session() as session:
+            raw = {
+                (row_user_id, month, category_type): (total, count)
+                for row_user_id, month, category_type, total, count
+                in await session.execute(self._raw_totals_query(user_id))
+            }
+
+            query = select(
+                MonthlyBalance.user_id,
+                MonthlyBalance.month,
+                MonthlyBalance.category_type,
+                MonthlyBalance.total,
+                MonthlyBalance.transactions_count
+            )
+            if user_id is not None:
+                query = query.where(MonthlyBalance.user_id == user_id)
+            rollups = {
+                (row_user_id, month, category_type): (total, count)
+                for row_user_id, month, category_type, total, count in await session.execute(query)
+            }
+
+        mismatches = []
+        for key in sorted(raw.keys() | rollups.keys()):
+            expected = raw.get(key, (Decimal('0'), 0))
+            actual = rollups.get(key, (Decimal('0'), 0))
+            if Decimal(expected[0]) != Decimal(actual[0]) or expected[1] != actual[1]:
+                mismatches.append((*key, actual, expected))
+        return mismatches
@@ -0,0 +1,135 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """LRU-кэш в памяти процесса с ограничением по размеру и времени жизни"""
+    def __init__(self, maxsize: int = 10000, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheService:
+    """
+    Двухуровневый кэш: LRU в процессе перед Redis
+
+    Значения в Redis хранятся в JSON. Ошибки Redis не прерывают работу:
+    кэш в этом случае работает как промах. Локальный уровень живет
+    local_ttl секунд, что ограничивает устаревание на других инстансах.
+    """
+    def __init__(
+        self,
+        redis=None,
+        namespace: str = 'cache',
+        maxsize: int = 10000,
+        local_ttl: float = 60,
+        redis_ttl: int = 3600
+    ):
+        self.redis = redis
+        self.namespace = namespace
+        self.redis_ttl = redis_ttl
+        self.local = LRUCache(maxsize=maxsize, ttl=local_ttl)
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str, default=None):
+        """
+        Получение значения из кэша
+
+        :param key: Ключ в пределах пространства имен
+        :param default: Значение при промахе
+        :return: Закэшированное значение или default
+        """
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self.local_hits += 1
+            return value
+
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(self._redis_key(key))
+            except Exception as e:
+                logger.warning(f"Кэш {self.namespace}: ошибка чтения из Redis: {e}")
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self.local.set(key, value)
+                self.redis_hits += 1
+                return value
+
+        self.misses += 1
+        return default
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """
+        Сохранение значения в кэш
+
+        :param key: Ключ в пределах пространства имен
+        :param value: JSON-сериализуемое значение
+        :param ttl: Время жизни в Redis, сек
+        """
+        self.local.set(key, value)
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._redis_key(key), json.dumps(value), ex=ttl or self.redis_ttl)
+            except Exception as e:
+                logger.warning(f"Кэш {self.namespace}: ошибка записи в Redis: {e}")
+
+    async def delete(self, *keys: str):
+        """Инвалидация ключей на обоих уровнях"""
+        for key in keys:
+            self.local.delete(key)
+        if self.redis is not None and keys:
+            try:
+                await self.redis.delete(*(self._redis_key(key) for key in keys))
+            except Exception as e:
+                logger.warning(f"Кэш {self.namespace}: ошибка удаления из Redis: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики попаданий и промахов"""
+        return {
+            'local_hits': self.local_hits,
+            'redis_hits': self.redis_hits,
+            'misses': self.misses,
+            'local_size': len(self.local)
+        }
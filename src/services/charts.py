@@ -0,0 +1,147 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func, select
+
+from src.models.sleep_weight import SleepRecord, WeightRecord
+from src.services.cache import CacheService
+from src.services.daily_summaries import SLEEP_DAY_OFFSET
+from src.utils.charts import render_sleep_chart, render_weight_chart, to_seconds
+
+
+@dataclass
+class Chart:
+    """График для отправки: file_id уже загруженного или PNG для загрузки"""
+    key: str
+    file_id: Optional[str] = None
+    png: Optional[bytes] = None
+
+
+class ChartService:
+    """
+    PNG-графики веса и сна
+
+    Отрисовка выполняется в пуле процессов и не блокирует event loop.
+    После отправки file_id из Telegram кэшируется по паре (пользователь,
+    id последней записи): пока новых записей нет, график отправляется
+    повторно без отрисовки и загрузки.
+    """
+    def __init__(
+        self,
+        db_service,
+        cache: CacheService = None,
+        workers: int = 2,
+        max_points: int = 500,
+        sleep_days: int = 90
+    ):
+        self.db = db_service
+        self.cache = cache or CacheService(namespace='charts')
+        self.max_points = max_points
+        self.sleep_days = sleep_days
+        # spawn: дочерние процессы не наследуют event loop и соединения
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+    async def _render(self, function, *args) -> bytes:
+        """Отрисовка в пуле процессов"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args, self.max_points)
+
+    async def _cached(self, key: str) -> Optional[Chart]:
+        file_id = await self.cache.get(key)
+        return Chart(key, file_id=file_id) if file_id else None
+
+    async def remember(self, chart: Chart, file_id: str):
+        """Сохранение file_id отправленного графика"""
+        await self.cache.set(chart.key, file_id)
+
+    async def weight_chart(self, user_id: int) -> Optional[Chart]:
+        """
+        График всех измерений веса
+
+        :param user_id: ID пользователя
+        :return: График или None, если записей нет
+        """
+        async with self.db.get_session() as session:
+            last_id = await session.scalar(
+                select(func.max(WeightRecord.id)).where(WeightRecord.user_id == user_id)
+            )
+        if last_id is None:
+            return None
+
+        key = f"weight:{user_id}:{last_id}"
+        chart = await self._cached(key)
+        if chart:
+            return chart
+
+        async with self.db.get_session() as session:
+            rows = (await session.execute(
+                select(WeightRecord.record_date, WeightRecord.weight).where(
+                    WeightRecord.user_id == user_id,
+                    WeightRecord.id <= last_id
+                ).order_by(
+                    WeightRecord.record_date
+                )
+            )).all()
+
+        dates, weights = zip(*rows)
+        png = await self._render(
+            render_weight_chart,
+            to_seconds(dates),
+            np.array(weights, dtype=np.float64)
+        )
+        return Chart(key, png=png)
+
+    async def sleep_chart(self, user_id: int) -> Optional[Chart]:
+        """
+        Продолжительность и время засыпания за последние sleep_days дней
+
+        :param user_id: ID пользователя
+        :return: График или None, если завершенных записей нет
+        """
+        since = datetime.utcnow() - timedelta(days=self.sleep_days)
+        period = (
+            SleepRecord.user_id == user_id,
+            SleepRecord.sleep_time >= since,
+            SleepRecord.wake_time != None
+        )
+
+        # Завершение сна меняет существующую запись, поэтому ключ - последняя
+        # завершенная запись, а не последняя созданная
+        async with self.db.get_session() as session:
+            last_id = await session.scalar(select(func.max(SleepRecord.id)).where(*period))
+        if last_id is None:
+            return None
+
+        key = f"sleep:{user_id}:{last_id}:{since.date().isoformat()}"
+        chart = await self._cached(key)
+        if chart:
+            return chart
+
+        async with self.db.get_session() as session:
+            rows = (await session.execute(
+                select(SleepRecord.sleep_time, SleepRecord.wake_time).where(
+                    *period,
+                    SleepRecord.id <= last_id
+                ).order_by(
+                    SleepRecord.sleep_time
+                )
+            )).all()
+
+        sleep_times, wake_times = zip(*rows)
+        seconds = to_seconds(sleep_times)
+        durations = (to_seconds(wake_times) - seconds) / 3600
+        bedtimes = ((seconds + SLEEP_DAY_OFFSET * 60) % 86400) / 3600
+        png = await self._render(render_sleep_chart, seconds, durations, bedtimes)
+        return Chart(key, png=png)
+
+    def close(self):
+        """Остановка пула отрисовки"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,274 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, distinct, func, select
+
+from src.models.sleep_weight import (
+    DailySummaryState,
+    SleepDailySummary,
+    SleepRecord,
+    WeightDailySummary,
+    WeightRecord,
+)
+from src.utils.sql import date_of, dialect_insert, hours_between
+
+
+# Граница «суток сна» в 12:00 вместо полуночи (сдвиг в минутах)
+SLEEP_DAY_OFFSET = 12 * 60
+
+
+def smooth_trend(previous: Optional[Decimal], value: Decimal, smoothing: Decimal) -> Decimal:
+    """
+    Следующее значение тренда веса (экспоненциальное сглаживание)
+
+    :param previous: Тренд на предыдущий день с измерениями
+    :param value: Средний вес за день
+    :param smoothing: Доля нового значения (0-1)
+    :return: Тренд на день
+    """
+    if previous is None:
+        return value
+    return previous + (value - previous) * smoothing
+
+
+class DailySummaryService:
+    """
+    Суточные итоги сна и веса
+
+    Ночное задание считает завершенные дни пачками пользователей и
+    сдвигает для каждого границу summarized_through. Дни пересчитываются
+    целиком (удаление и вставка), поэтому повторный запуск дает тот же
+    результат, а после сбоя продолжается с необработанных пользователей.
+    Последние lookback_days дней пересчитываются каждую ночь, чтобы учесть
+    записи, внесенные задним числом.
+    """
+    def __init__(
+        self,
+        db_service,
+        chunk_size: int = 500,
+        lookback_days: int = 3,
+        trend_smoothing: float = 0.1
+    ):
+        self.db = db_service
+        self.chunk_size = chunk_size
+        self.lookback_days = lookback_days
+        self.trend_smoothing = Decimal(str(trend_smoothing))
+
+    @staticmethod
+    def day_start(day: date, offset: int = 0) -> datetime:
+        """Начало суток (offset - сдвиг границы суток назад в минутах)"""
+        return datetime.combine(day, time()) - timedelta(minutes=offset)
+
+    async def get_summarized_through(self, session, user_id: int) -> Optional[date]:
+        """Первый день, за который итоги пользователя еще не посчитаны"""
+        return await session.scalar(
+            select(DailySummaryState.summarized_through).where(
+                DailySummaryState.user_id == user_id
+            )
+        )
+
+    async def run(self, through: Optional[date] = None) -> int:
+        """
+        Расчет итогов всех пользователей с записями сна или веса
+
+        Каждая пачка пользователей записывается в отдельной транзакции.
+
+        :param through: Первый непосчитываемый день (по умолчанию - сегодня)
+        :return: Количество обработанных пользователей
+        """
+        through = through or datetime.utcnow().date()
+        processed = 0
+        last_user_id = None
+
+        while True:
+            async with self.db.get_session() as session:
+                user_ids = await self._next_users(session, last_user_id)
+                if not user_ids:
+                    return processed
+                processed += await self._summarize(session, user_ids, through)
+
+            last_user_id = user_ids[-1]
+
+    async def _next_users(self, session, last_user_id: Optional[int]) -> List[int]:
+        """Следующая пачка пользователей по возрастанию user_id"""
+        user_ids = set()
+        for column in (WeightRecord.user_id, SleepRecord.user_id):
+            query = select(distinct(column))
+            if last_user_id is not None:
+                query = query.where(column > last_user_id)
+            user_ids.update(await session.scalars(query.order_by(column).limit(self.chunk_size)))
+        return sorted(user_ids)[:self.chunk_size]
+
+    async def _summarize(self, session, user_ids: Sequence[int], through: date) -> int:
+        """Пересчет итогов пачки пользователей до through"""
+        states = dict((await session.execute(
+            select(DailySummaryState.user_id, DailySummaryState.summarized_through).where(
+                DailySummaryState.user_id.in_(user_ids)
+            )
+        )).all())
+
+        # Пользователи группируются по первому пересчитываемому дню;
+        # без сохраненной границы считается вся история
+        groups: Dict[Optional[date], List[int]] = defaultdict(list)
+        for user_id in user_ids:
+            summarized_through = states.get(user_id)
+            if summarized_through is None:
+                groups[None].append(user_id)
+            elif summarized_through < through:
+                groups[summarized_through - timedelta(days=self.lookback_days)].append(user_id)
+
+        for start, group in groups.items():
+            await self._summarize_sleep(session, group, start, through)
+            await self._summarize_weight(session, group, start, through)
+
+        summarized = [user_id for group in groups.values() for user_id in group]
+        if summarized:
+            await self._advance(session, summarized, through)
+        return len(summarized)
+
+    @staticmethod
+    def _days_filter(model, user_ids: Sequence[int], start: Optional[date], through: date) -> list:
+        """Условия отбора итогов пачки пользователей за пересчитываемые дни"""
+        conditions = [model.user_id.in_(user_ids), model.day < through]
+        if start is not None:
+            conditions.append(model.day >= start)
+        return conditions
+
+    async def _summarize_sleep(self, session, user_ids: Sequence[int], start: Optional[date], through: date):
+        """Суммарный сон, количество засыпаний, первое засыпание и последнее пробуждение"""
+        dialect_name = self.db.dialect_name
+        day = date_of(SleepRecord.sleep_time, dialect_name, SLEEP_DAY_OFFSET)
+        conditions = [
+            SleepRecord.user_id.in_(user_ids),
+            SleepRecord.wake_time != None,
+            SleepRecord.sleep_time < self.day_start(through, SLEEP_DAY_OFFSET)
+        ]
+        if start is not None:
+            conditions.append(SleepRecord.sleep_time >= self.day_start(start, SLEEP_DAY_OFFSET))
+
+        result = await session.execute(
+            select(
+                SleepRecord.user_id,
+                day,
+                func.sum(hours_between(SleepRecord.sleep_time, SleepRecord.wake_time, dialect_name)),
+                func.count(SleepRecord.id),
+                func.min(SleepRecord.sleep_time),
+                func.max(SleepRecord.wake_time)
+            ).where(
+                *conditions
+            ).group_by(
+                SleepRecord.user_id, day
+            )
+        )
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                'user_id': user_id,
+                'day': record_day,
+                'total_hours': Decimal(str(total_hours)).quantize(Decimal('0.01')),
+                'sessions_count': sessions_count,
+                'first_bedtime': first_bedtime,
+                'last_wake_time': last_wake_time,
+                'created_at': now,
+                'updated_at': now
+            }
+            for user_id, record_day, total_hours, sessions_count, first_bedtime, last_wake_time in result
+        ]
+
+        await session.execute(
+            delete(SleepDailySummary).where(*self._days_filter(SleepDailySummary, user_ids, start, through))
+        )
+        if rows:
+            await session.execute(SleepDailySummary.__table__.insert(), rows)
+
+    async def _summarize_weight(self, session, user_ids: Sequence[int], start: Optional[date], through: date):
+        """Минимальный и средний вес за день и сглаженный тренд"""
+        day = date_of(WeightRecord.record_date, self.db.dialect_name)
+        conditions = [
+            WeightRecord.user_id.in_(user_ids),
+            WeightRecord.record_date < self.day_start(through)
+        ]
+        if start is not None:
+            conditions.append(WeightRecord.record_date >= self.day_start(start))
+
+        result = await session.execute(
+            select(
+                WeightRecord.user_id,
+                day,
+                func.min(WeightRecord.weight),
+                func.avg(WeightRecord.weight),
+                func.count(WeightRecord.id)
+            ).where(
+                *conditions
+            ).group_by(
+                WeightRecord.user_id, day
+            ).order_by(
+                WeightRecord.user_id, day
+            )
+        )
+        days = result.all()
+
+        # Тренд продолжается от последнего дня до пересчитываемого периода
+        trends = {}
+        if start is not None:
+            latest = select(
+                WeightDailySummary.user_id,
+                WeightDailySummary.trend_weight,
+                func.row_number().over(
+                    partition_by=WeightDailySummary.user_id,
+                    order_by=WeightDailySummary.day.desc()
+                ).label('position')
+            ).where(
+                WeightDailySummary.user_id.in_(user_ids),
+                WeightDailySummary.day < start
+            ).subquery()
+            trends = dict((await session.execute(
+                select(latest.c.user_id, latest.c.trend_weight).where(latest.c.position == 1)
+            )).all())
+
+        now = datetime.utcnow()
+        rows = []
+        for user_id, record_day, min_weight, avg_weight, records_count in days:
+            avg_weight = Decimal(str(avg_weight)).quantize(Decimal('0.01'))
+            trend = smooth_trend(trends.get(user_id), avg_weight, self.trend_smoothing)
+            trends[user_id] = trend.quantize(Decimal('0.01'))
+            rows.append({
+                'user_id': user_id,
+                'day': record_day,
+                'min_weight': min_weight,
+                'avg_weight': avg_weight,
+                'records_count': records_count,
+                'trend_weight': trends[user_id],
+                'created_at': now,
+                'updated_at': now
+            })
+
+        await session.execute(
+            delete(WeightDailySummary).where(*self._days_filter(WeightDailySummary, user_ids, start, through))
+        )
+        if rows:
+            await session.execute(WeightDailySummary.__table__.insert(), rows)
+
+    async def _advance(self, session, user_ids: Sequence[int], through: date):
+        """Сдвиг границы посчитанных итогов"""
+        now = datetime.utcnow()
+        statement = dialect_insert(self.db.dialect_name)(DailySummaryState.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=['user_id'],
+            set_={
+                'summarized_through': statement.excluded.summarized_through,
+                'updated_at': now
+            }
+        )
+        await session.execute(statement, [
+            {
+                'user_id': user_id,
+                'summarized_through': through,
+                'created_at': now,
+                'updated_at': now
+            }
+            for user_id in sorted(user_ids)
+        ])
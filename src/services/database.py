@@ -1,37 +1,116 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
-from contextlib import contextmanager
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from contextlib import asynccontextmanager
 
 from src.models.base import Base
+from src.services.pool_metrics import PoolMetrics
+
+
+# Асинхронные драйверы для синхронных схем подключения
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite',
+}
+
+
+def to_async_url(database_url: str) -> str:
+    '''
+    Приведение строки подключения к асинхронному драйверу
+
+    :param database_url: Строка подключения (postgresql://, sqlite:// и т.д.)
+    :return: Строка подключения с asyncpg/aiosqlite
+    '''
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.drivername)
+    if driver:
+        url = url.set(drivername=driver)
+    return url.render_as_string(hide_password=False)
 
 
 class DatabaseService:
     '''Сервис для работы с БД'''
 
-    def __init__(self, database_url):
-        self.engine = create_engine(database_url)
-        self.SessionLocal = sessionmaker(bind=self.engine)
+    def __init__(
+        self,
+        database_url,
+        echo: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pool_recycle: int = 1800,
+        pool_pre_ping: bool = True
+    ):
+        url = to_async_url(database_url)
+        engine_args = {
+            'echo': echo,
+            'pool_recycle': pool_recycle,
+            'pool_pre_ping': pool_pre_ping
+        }
+        # aiosqlite работает через NullPool, размеры пула к нему неприменимы
+        if make_url(url).get_backend_name() != 'sqlite':
+            engine_args.update(
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout
+            )
 
-    def create_tables(self):
+        self.engine = create_async_engine(url, **engine_args)
+        self.pool_metrics = PoolMetrics(self.engine)
+        # expire_on_commit=False: объекты остаются доступными после выхода из сессии
+        self.SessionLocal = async_sessionmaker(
+            bind=self.engine,
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+
+    @property
+    def dialect_name(self) -> str:
+        '''Название диалекта БД (postgresql, sqlite)'''
+        return self.engine.dialect.name
+
+    async def create_tables(self):
         '''Создание всех таблиц в БД'''
-        Base.metadata.create_all(self.engine)
-    
-    @contextmanager
-    def get_session(self):
-        '''Контекстный менеджер для работы с БД'''
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    @asynccontextmanager
+    async def get_session(self):
+        '''Асинхронный контекстный менеджер для работы с БД (unit of work)'''
         session = self.SessionLocal()
         try:
+            # Сразу берем соединение из пула, чтобы измерить время ожидания
+            started = time.perf_counter()
+            try:
+                await session.connection()
+            except PoolTimeoutError:
+                self.pool_metrics.observe_timeout()
+                raise
+            self.pool_metrics.observe_wait(time.perf_counter() - started)
+
             yield session
-            session.commit()
+            await session.commit()
         except Exception:
-            session.rollback()
+            await session.rollback()
             raise
         finally:
-            session.close()
+            await session.close()
+
+    def pool_stats(self) -> dict:
+        '''Текущее состояние пула соединений'''
+        return self.pool_metrics.snapshot()
+
+    async def close(self):
+        '''Закрытие пула соединений'''
+        await self.engine.dispose()
 
 #Создание таблиц при запуске
-def init_db(database_url):
-    db_service = DatabaseService(database_url)
-    db_service.create_tables()
-    return db_service
\ No newline at end of file
+async def init_db(database_url, **engine_args):
+    db_service = DatabaseService(database_url, **engine_args)
+    await db_service.create_tables()
+    return db_service
@@ -1,14 +1,65 @@
+from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Transaction
+from sqlalchemy import func, select, update
 import math
 
-from src.models.savings import RoundingStep, UserSettings, SavingsAccount
+from src.models.goal import GoalType
+from src.models.savings import RoundingStep, UserSettings
+from src.models.transaction import Category, CategoryType, Transaction
+from src.services.balance_rollups import BalanceRollupService
+from src.services.cache import CacheService
+from src.services.goal_engine import GoalEngine
+from src.services.savings_ledger import SavingsLedgerService
+from src.services.stats_screen import StatsCache, StatsSection
+from src.utils.pagination import Cursor, Page, keyset_page
+from src.utils.sql import dialect_insert
+
+
+@dataclass(frozen=True)
+class UserSettingsData:
+    """Настройки пользователя, отдаваемые из кэша"""
+    user_id: int
+    rounding_step: RoundingStep = RoundingStep.STEP_10
+    savings_enabled: bool = True
+
+    def to_cache(self) -> dict:
+        return {'rounding_step': self.rounding_step.value, 'savings_enabled': self.savings_enabled}
+
+    @classmethod
+    def from_cache(cls, user_id: int, data: dict) -> 'UserSettingsData':
+        return cls(
+            user_id=user_id,
+            rounding_step=RoundingStep(data['rounding_step']),
+            savings_enabled=data['savings_enabled']
+        )
+
+
+@dataclass(frozen=True)
+class CategoryData:
+    """Категория, отдаваемая из кэша"""
+    id: int
+    name: str
 
 
 class ExpensesService:
     """Сервис для работы с расходами и доходами"""
-    def __init__(self, db_service):
+    def __init__(
+        self,
+        db_service,
+        settings_cache: CacheService = None,
+        categories_cache: CacheService = None,
+        stats_cache: StatsCache = None,
+        goal_engine: GoalEngine = None
+    ):
         self.db = db_service
+        self.rollups = BalanceRollupService(db_service)
+        self.savings = SavingsLedgerService(db_service)
+        self.goal_engine = goal_engine or GoalEngine(db_service)
+        # Настройки и категории читаются на каждую транзакцию, а меняются редко
+        self.settings_cache = settings_cache or CacheService(namespace='user_settings')
+        self.categories_cache = categories_cache or CacheService(namespace='categories')
+        self.stats_cache = stats_cache
 
     def calculate_rounding_amount(self, amount: Decimal, rounding_step: RoundingStep) -> tuple[Decimal, Decimal]:
         """
@@ -24,6 +75,64 @@ class ExpensesService:
         savings_amount = rounded_up - amount
         return rounded_up, savings_amount
 
+    @staticmethod
+    def _categories_key(user_id: int, category_type: CategoryType) -> str:
+        return f"{user_id}:{CategoryType(category_type).value}"
+
+    async def get_user_categories(
+        self,
+        user_id: int,
+        category_type: CategoryType
+    ) -> tuple[CategoryData, ...]:
+        """
+        Получение категорий пользователя через кэш
+        
+        :param user_id: ID пользователя
+        :param category_type: Тип категорий
+        :return: Категории в порядке создания
+        """
+        key = self._categories_key(user_id, category_type)
+        cached = await self.categories_cache.get(key)
+        if cached is not None:
+            return tuple(CategoryData(category_id, name) for category_id, name in cached)
+        
+        async with self.db.get_session() as session:
+            result = await session.execute(
+                select(Category.id, Category.name).where(
+                    Category.user_id == user_id,
+                    Category.type == CategoryType(category_type).value
+                ).order_by(Category.id)
+            )
+            categories = tuple(CategoryData(category_id, name) for category_id, name in result)
+        
+        await self.categories_cache.set(key, [[c.id, c.name] for c in categories])
+        return categories
+
+    async def create_category(
+        self,
+        user_id: int,
+        name: str,
+        category_type: CategoryType
+    ) -> Category:
+        """
+        Создание категории с инвалидацией кэша списка
+        
+        :param user_id: ID пользователя
+        :param name: Название категории
+        :param category_type: Тип категории
+        :return: Созданная категория
+        """
+        async with self.db.get_session() as session:
+            category = Category(
+                user_id=user_id,
+                name=name,
+                type=CategoryType(category_type).value
+            )
+            session.add(category)
+        
+        await self.categories_cache.delete(self._categories_key(user_id, category_type))
+        return category
+
     async def create_transaction(
         self,
         user_id: int,
@@ -35,73 +144,218 @@ class ExpensesService:
         Создание новой транзакции с округлением на накопительный счёт
         
         :return: (транзакция, сумма_округления)
+        :raises ValueError: Категория не найдена или принадлежит другому пользователю
         """
-        with self.db.get_session() as session:
-            # Получаем настройки пользователя
-            settings = session.query(UserSettings).filter(
-                UserSettings.user_id == user_id
-            ).first()
-            
-            if not settings:
-                settings = UserSettings(user_id=user_id)
-                session.add(settings)
-            
+        # Настройки пользователя (из кэша)
+        settings = await self.get_user_settings(user_id)
+        
+        completions = []
+        async with self.db.get_session() as session:
             total_amount, savings_amount = self.calculate_rounding_amount(
                 amount,
                 settings.rounding_step
             )
             
+            # Тип категории нужен для итогов месяца; категория из устаревшей
+            # клавиатуры или чужая не должна попасть в итоги
+            category_type = await session.scalar(
+                select(Category.type).where(
+                    Category.id == category_id,
+                    Category.user_id == user_id
+                )
+            )
+            if category_type is None:
+                raise ValueError('Категория не найдена')
+            
             # Создаем транзакцию
             transaction = Transaction(
                 user_id=user_id,
                 category_id=category_id,
                 amount=amount,  # Сохраняем реальную сумму траты
-                description=description
+                description=description,
+                created_at=datetime.utcnow()
             )
             session.add(transaction)
             
+            # Обновляем итоги месяца в той же транзакции БД
+            await self.rollups.apply(
+                session,
+                user_id,
+                category_type,
+                amount,
+                transaction.created_at
+            )
+            
             # Если включено округление, добавляем на накопительный счёт
             if settings.savings_enabled and savings_amount > 0:
-                savings_account = session.query(SavingsAccount).filter(
-                    SavingsAccount.user_id == user_id
-                ).first()
-                
-                if not savings_account:
-                    savings_account = SavingsAccount(user_id=user_id)
-                    session.add(savings_account)
+                # Запись в журнал без чтения и блокировки строки счёта
+                await session.flush()
+                await self.savings.record(session, user_id, savings_amount, transaction.id)
                 
-                savings_account.balance += savings_amount
-                
-                # Если есть активная цель по накоплению, обновляем её
-                await self._update_savings_goals(user_id, savings_amount)
-            
-            return transaction, savings_amount
+                # Все активные цели по накоплению - одним запросом в этой же транзакции
+                completions = await self.goal_engine.add_progress(
+                    session, user_id, GoalType.SAVINGS, savings_amount
+                )
+        
+        # Сбрасываем разделы статистики, зависящие от транзакций
+        if self.stats_cache is not None:
+            sections = [StatsSection.FINANCES]
+            if settings.savings_enabled and savings_amount > 0:
+                sections.append(StatsSection.GOALS)
+            await self.stats_cache.invalidate(user_id, *sections)
+        
+        await self.goal_engine.publish(completions)
+        return transaction, savings_amount
+
+    async def get_balance(self, user_id: int, start_date: datetime = None) -> dict:
+        """
+        Получение доходов, расходов и баланса
+        
+        :param user_id: ID пользователя
+        :param start_date: Начало периода (по умолчанию - начало текущего месяца)
+        :return: Словарь с доходами, расходами и балансом
+        """
+        now = datetime.utcnow()
+        month = self.rollups.month_of(start_date or now)
+        
+        # Период с начала месяца читается из помесячных итогов
+        if start_date is None or (
+            start_date == datetime.combine(month, datetime.min.time()) and month == self.rollups.month_of(now)
+        ):
+            return await self.rollups.get_month_balance(user_id, month)
+        
+        async with self.db.get_session() as session:
+            result = await session.execute(
+                select(Category.type, func.sum(Transaction.amount)).join(
+                    Category, Category.id == Transaction.category_id
+                ).where(
+                    Transaction.user_id == user_id,
+                    Transaction.created_at >= start_date
+                ).group_by(Category.type)
+            )
+            totals = dict(result.all())
+        
+        income = totals.get(CategoryType.INCOME.value) or Decimal('0')
+        expenses = totals.get(CategoryType.EXPENSE.value) or Decimal('0')
+        return {
+            'income': income,
+            'expenses': expenses,
+            'balance': income - expenses
+        }
+
+    async def get_transactions_page(self, user_id: int, cursor: Cursor = None, limit: int = 10) -> Page:
+        """
+        Страница истории транзакций (от новых к старым)
+        
+        :param user_id: ID пользователя
+        :param cursor: Курсор страницы (по умолчанию - первая страница)
+        :param limit: Количество транзакций на странице
+        :return: Страница строк (транзакция, название категории, тип категории)
+        """
+        async with self.db.get_session() as session:
+            return await keyset_page(
+                session,
+                select(Transaction, Category.name, Category.type).join(
+                    Category, Category.id == Transaction.category_id
+                ).where(
+                    Transaction.user_id == user_id
+                ),
+                Transaction.created_at,
+                Transaction.id,
+                cursor,
+                limit
+            )
 
     async def get_savings_balance(self, user_id: int) -> Decimal:
-        """Получение баланса накопительного счёта"""
-        with self.db.get_session() as session:
-            account = session.query(SavingsAccount).filter(
-                SavingsAccount.user_id == user_id
-            ).first()
-            return account.balance if account else Decimal('0')
+        """Получение баланса накопительного счёта (снимок + новые записи журнала)"""
+        return await self.savings.get_balance(user_id)
+
+    async def get_user_settings(self, user_id: int) -> UserSettingsData:
+        """
+        Получение настроек пользователя через кэш
+        
+        При отсутствии настроек создаются настройки по умолчанию.
+        
+        :param user_id: ID пользователя
+        :return: Настройки пользователя
+        """
+        cached = await self.settings_cache.get(str(user_id))
+        if cached is not None:
+            return UserSettingsData.from_cache(user_id, cached)
+        
+        async with self.db.get_session() as session:
+            row = (await session.execute(
+                select(UserSettings.rounding_step, UserSettings.savings_enabled).where(
+                    UserSettings.user_id == user_id
+                )
+            )).first()
+            
+            if row is None:
+                settings = UserSettingsData(user_id=user_id)
+                await self._insert_default_settings(session, settings)
+            else:
+                settings = UserSettingsData(
+                    user_id=user_id,
+                    rounding_step=row.rounding_step or RoundingStep.STEP_10,
+                    savings_enabled=row.savings_enabled if row.savings_enabled is not None else True
+                )
+        
+        await self.settings_cache.set(str(user_id), settings.to_cache())
+        return settings
+
+    async def _insert_default_settings(self, session, settings: UserSettingsData):
+        """Создание настроек без гонки при параллельных первых запросах"""
+        now = datetime.utcnow()
+        statement = dialect_insert(self.db.dialect_name)(UserSettings).values(
+            user_id=settings.user_id,
+            rounding_step=settings.rounding_step,
+            savings_enabled=settings.savings_enabled,
+            created_at=now,
+            updated_at=now
+        )
+        await session.execute(statement.on_conflict_do_nothing(index_elements=['user_id']))
+
+    async def update_settings(
+        self,
+        user_id: int,
+        rounding_step: RoundingStep = None,
+        savings_enabled: bool = None
+    ) -> UserSettingsData:
+        """
+        Обновление настроек пользователя с инвалидацией кэша
+        
+        :param user_id: ID пользователя
+        :param rounding_step: Новый шаг округления
+        :param savings_enabled: Включено ли округление
+        :return: Обновленные настройки
+        """
+        values = {}
+        if rounding_step is not None:
+            values['rounding_step'] = rounding_step
+        if savings_enabled is not None:
+            values['savings_enabled'] = savings_enabled
+        
+        async with self.db.get_session() as session:
+            await self._insert_default_settings(session, UserSettingsData(user_id=user_id))
+            if values:
+                await session.execute(
+                    update(UserSettings).where(
+                        UserSettings.user_id == user_id
+                    ).values(updated_at=datetime.utcnow(), **values)
+                )
+        
+        await self.settings_cache.delete(str(user_id))
+        return await self.get_user_settings(user_id)
 
     async def update_rounding_settings(
         self,
         user_id: int,
         rounding_step: RoundingStep = None,
         enabled: bool = None
-    ):
+    ) -> UserSettingsData:
         """Обновление настроек округления"""
-        with self.db.get_session() as session:
-            settings = session.query(UserSettings).filter(
-                UserSettings.user_id == user_id
-            ).first()
-            
-            if not settings:
-                settings = UserSettings(user_id=user_id)
-                session.add(settings)
-            
-            if rounding_step is not None:
-                settings.rounding_step = rounding_step
-            if enabled is not None:
-                settings.savings_enabled = enabled
\ No newline at end of file
+        return await self.update_settings(
+            user_id,
+            rounding_step=rounding_step,
+            savings_enabled=enabled
+        )
@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Awaitable, Callable, List, Sequence
+
+from loguru import logger
+from sqlalchemy import and_, case, or_, update
+
+from src.models.goal import Goal, GoalStatus, GoalType
+
+
+@dataclass(frozen=True)
+class GoalCompletion:
+    """Цель, достигнутая при обновлении прогресса"""
+    goal_id: int
+    user_id: int
+    title: str
+    goal_type: str
+    target_value: Decimal
+
+
+CompletionHandler = Callable[[GoalCompletion], Awaitable[None]]
+
+
+class GoalEngine:
+    """
+    Пересчет прогресса активных целей в транзакции вызывающего кода
+
+    Все активные цели пользователя нужного типа обновляются одним
+    UPDATE ... RETURNING, статус COMPLETED выставляется в том же запросе.
+    Обновляются только активные цели, поэтому каждая цель попадает в
+    завершенные ровно один раз, даже при параллельных записях.
+    События о завершении рассылаются подписчикам после фиксации
+    транзакции вызовом publish().
+    """
+    def __init__(self, db_service):
+        self.db = db_service
+        self._handlers: List[CompletionHandler] = []
+
+    def subscribe(self, handler: CompletionHandler):
+        """Подписка на события о достижении целей"""
+        self._handlers.append(handler)
+
+    async def set_progress(self, session, user_id: int, goal_type: GoalType, value: Decimal) -> List[GoalCompletion]:
+        """
+        Установка текущего значения целей (например, вес)
+
+        :param session: Текущая сессия
+        :param user_id: ID пользователя
+        :param goal_type: Тип целей
+        :param value: Новое текущее значение
+        :return: Цели, достигнутые этим обновлением
+        """
+        return await self._apply(session, user_id, goal_type, Decimal(str(value)))
+
+    async def add_progress(self, session, user_id: int, goal_type: GoalType, delta: Decimal) -> List[GoalCompletion]:
+        """
+        Увеличение текущего значения целей (например, накопления)
+
+        :param session: Текущая сессия
+        :param user_id: ID пользователя
+        :param goal_type: Тип целей
+        :param delta: Прирост значения
+        :return: Цели, достигнутые этим обновлением
+        """
+        return await self._apply(session, user_id, goal_type, Goal.current_value + Decimal(str(delta)))
+
+    async def _apply(self, session, user_id: int, goal_type: GoalType, new_value) -> List[GoalCompletion]:
+        """Обновление значения и статуса целей одним запросом"""
+        # SET вычисляется по старым значениям строки, поэтому достижение
+        # проверяется по новому значению, а не по колонке
+        if GoalType(goal_type) == GoalType.WEIGHT:
+            # Для веса цель может быть как уменьшение, так и увеличение
+            reached = or_(
+                and_(Goal.target_value > Goal.start_value, new_value >= Goal.target_value),
+                and_(Goal.target_value < Goal.start_value, new_value <= Goal.target_value)
+            )
+        else:
+            reached = new_value >= Goal.target_value
+
+        result = await session.execute(
+            update(Goal).where(
+                Goal.user_id == user_id,
+                Goal.goal_type == GoalType(goal_type).value,
+                Goal.status == GoalStatus.ACTIVE.value
+            ).values(
+                current_value=new_value,
+                status=case((reached, GoalStatus.COMPLETED.value), else_=Goal.status)
+            ).returning(
+                Goal.id,
+                Goal.user_id,
+                Goal.title,
+                Goal.goal_type,
+                Goal.target_value,
+                Goal.status
+            ).execution_options(
+                synchronize_session=False
+            )
+        )
+        return [
+            GoalCompletion(goal_id, row_user_id, title, row_goal_type, target_value)
+            for goal_id, row_user_id, title, row_goal_type, target_value, status in result
+            if status == GoalStatus.COMPLETED.value
+        ]
+
+    async def publish(self, completions: Sequence[GoalCompletion]):
+        """
+        Рассылка событий о достижении целей (после фиксации транзакции)
+
+        Ошибка подписчика не прерывает рассылку остальным.
+        """
+        for completion in completions:
+            for handler in self._handlers:
+                try:
+                    await handler(completion)
+                except Exception as e:
+                    logger.error(f"Ошибка обработки достижения цели {completion.goal_id}: {e}")
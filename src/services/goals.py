@@ -1,17 +1,44 @@
+from sqlalchemy import select, update
+
 from src.models.goal import Goal, GoalType, GoalStatus
+from src.services.stats_screen import StatsCache, StatsSection
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List
+from decimal import Decimal
+from typing import AsyncIterator, List
+
+
+@dataclass(frozen=True)
+class ExpiredGoal:
+    '''Цель, переведенная в FAILED по истечении дедлайна'''
+    goal_id: int
+    user_id: int
+    title: str
+    goal_type: str
+    start_value: Decimal
+    current_value: Decimal
+    target_value: Decimal
+    deadline: datetime
 
 
 class GoalService:
     '''Сервис для работы с целями'''
 
-    def __init__(self, db_service):
+    def __init__(self, db_service, stats_cache: StatsCache = None, sweep_chunk_size: int = 500):
         self.db = db_service
+        self.stats_cache = stats_cache
+        self.sweep_chunk_size = sweep_chunk_size
+
+    async def _invalidate_stats(self, *user_ids: int):
+        '''Сброс раздела целей на экране статистики'''
+        if self.stats_cache is None:
+            return
+        for user_id in set(user_ids):
+            await self.stats_cache.invalidate(user_id, StatsSection.GOALS)
 
     async def create_goal(self, user_id: int, goal_data: dict) -> Goal:
         '''Создание новой цели'''
-        with self.db.get_session() as session:
+        async with self.db.get_session() as session:
             goal = Goal(
                 user_id=user_id,
                 title=goal_data['title'],
@@ -20,15 +47,18 @@ class GoalService:
                 current_value=goal_data.get('start_value', 0),
                 start_value=goal_data.get('start_value', 0),
                 deadline=goal_data['deadline'],
-                description=goal_data.get('description', '')
+                description=goal_data.get('description', ''),
+                status=GoalStatus.ACTIVE.value
             )
             session.add(goal)
-            return goal
+        
+        await self._invalidate_stats(user_id)
+        return goal
 
     async def update_goal_progress(self, goal_id: int, new_value: float) -> Goal:
         '''Обновление прогресса цели'''
-        with self.db.get_session() as session:
-            goal = session.query(Goal).filter(Goal.id == goal_id).first()
+        async with self.db.get_session() as session:
+            goal = await session.get(Goal, goal_id)
             if not goal:
                 raise ValueError('Цель не найдена')
             
@@ -39,30 +69,91 @@ class GoalService:
                 # Для веса цель может быть как уменьшение, так и увеличение
                 if (goal.target_value > goal.start_value and new_value >= goal.target_value) or \
                    (goal.target_value < goal.start_value and new_value <= goal.target_value):
-                    goal.status = GoalStatus.COMPLETED
+                    goal.status = GoalStatus.COMPLETED.value
             else:
                 if new_value >= goal.target_value:
-                    goal.status = GoalStatus.COMPLETED
+                    goal.status = GoalStatus.COMPLETED.value
 
-            return goal
+        await self._invalidate_stats(goal.user_id)
+        return goal
     
-    async def get_user_goal(self, user_id: int) -> List[Goal]:
+    async def get_user_goals(self, user_id: int) -> List[Goal]:
         '''Получение всех активных целей пользователя'''
-        with self.db.get_session as session:
-            goals = session.query(Goal).filter(
-                Goal.user_id == user_id,
-                Goal.status == GoalStatus.ACTIVE
-            ).all()
-            return goals
+        async with self.db.get_session() as session:
+            goals = await session.scalars(
+                select(Goal).where(
+                    Goal.user_id == user_id,
+                    Goal.status == GoalStatus.ACTIVE.value
+                )
+            )
+            return goals.all()
+        
+    async def expire_overdue_goals(self) -> AsyncIterator[List[ExpiredGoal]]:
+        '''
+        Перевод просроченных активных целей в FAILED пачками
+        
+        Каждая пачка - один UPDATE ... RETURNING в отдельной транзакции.
+        Строки захватываются через FOR UPDATE SKIP LOCKED, поэтому
+        параллельные запуски на нескольких инстансах не обрабатывают
+        одну цель дважды. Пачка отдается после фиксации транзакции.
+        Цели захватываются по (user_id, id), поэтому цели пользователя
+        идут подряд и могут разделиться только между соседними пачками.
         
-    async def check_overdue_goals(self):
-        '''Проверка просроченных целей'''
+        :return: Асинхронный итератор по пачкам, отсортированным по user_id
+        '''
         current_date = datetime.utcnow()
-        with self.db.get_session() as session:
-            overdue_goals = session.query(Goal).filter(
-                Goal.status == GoalStatus.ACTIVE,
+        
+        while True:
+            claimed = select(Goal.id).where(
+                Goal.status == GoalStatus.ACTIVE.value,
                 Goal.deadline < current_date
-            ).all()
-
-            for goal in overdue_goals:
-                goal.status = GoalStatus.FAILED
\ No newline at end of file
+            ).order_by(
+                Goal.user_id,
+                Goal.id
+            ).limit(
+                self.sweep_chunk_size
+            ).with_for_update(skip_locked=True)
+            
+            async with self.db.get_session() as session:
+                result = await session.execute(
+                    update(Goal).where(
+                        Goal.id.in_(claimed.scalar_subquery()),
+                        # Цель могла измениться между выборкой и блокировкой
+                        Goal.status == GoalStatus.ACTIVE.value
+                    ).values(
+                        status=GoalStatus.FAILED.value,
+                        updated_at=datetime.utcnow()
+                    ).returning(
+                        Goal.id,
+                        Goal.user_id,
+                        Goal.title,
+                        Goal.goal_type,
+                        Goal.start_value,
+                        Goal.current_value,
+                        Goal.target_value,
+                        Goal.deadline
+                    ).execution_options(
+                        synchronize_session=False
+                    )
+                )
+                expired = sorted(
+                    (ExpiredGoal(*row) for row in result),
+                    key=lambda goal: (goal.user_id, goal.goal_id)
+                )
+            
+            if not expired:
+                return
+            
+            await self._invalidate_stats(*(goal.user_id for goal in expired))
+            yield expired
+        
+    async def check_overdue_goals(self) -> int:
+        '''
+        Проверка просроченных целей без уведомлений
+        
+        :return: Количество целей, переведенных в FAILED
+        '''
+        expired = 0
+        async for chunk in self.expire_overdue_goals():
+            expired += len(chunk)
+        return expired
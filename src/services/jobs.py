@@ -0,0 +1,154 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Set
+
+from apscheduler.jobstores.base import ConflictingIdError
+from apscheduler.jobstores.redis import RedisJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.base import BaseTrigger
+from loguru import logger
+from redis import ConnectionPool
+
+
+JobHandler = Callable[..., Awaitable[None]]
+
+
+class JobRegistry:
+    """
+    Обработчики заданий воркера по именам
+
+    В хранилище заданий лежит только имя задания и аргументы, а не ссылка
+    на метод конкретного объекта, поэтому задания переживают перезапуск
+    и рефакторинг. Выполняемые задания отслеживаются, чтобы при остановке
+    воркера дождаться их завершения.
+    """
+    def __init__(self):
+        self._handlers: Dict[str, JobHandler] = {}
+        self._running: Set[asyncio.Task] = set()
+
+    def register(self, name: str, handler: JobHandler):
+        """Регистрация обработчика задания"""
+        self._handlers[name] = handler
+
+    async def run(self, name: str, *args):
+        """Выполнение задания по имени"""
+        handler = self._handlers.get(name)
+        if handler is None:
+            raise LookupError(f"Обработчик задания {name} не зарегистрирован")
+
+        task = asyncio.current_task()
+        self._running.add(task)
+        try:
+            await handler(*args)
+        finally:
+            self._running.discard(task)
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Ожидание выполняемых заданий
+
+        :param timeout: Максимальное ожидание, сек
+        :return: Количество отмененных по таймауту заданий
+        """
+        if not self._running:
+            return 0
+
+        _, pending = await asyncio.wait(set(self._running), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        return len(pending)
+
+
+registry = JobRegistry()
+
+
+async def run(name: str, *args):
+    """Точка входа всех заданий из хранилища"""
+    await registry.run(name, *args)
+
+
+def create_scheduler(
+    redis_url: str,
+    key_prefix: str = "finance_bot:jobs",
+    misfire_grace_time: int = 3600,
+    timezone: str = "UTC",
+    socket_timeout: float = 2
+) -> AsyncIOScheduler:
+    """
+    Планировщик с заданиями в Redis
+
+    Время следующего запуска хранится в Redis, поэтому запуски, пропущенные
+    во время остановки воркера, выполняются после старта, если опоздание
+    не больше misfire_grace_time. Несколько пропущенных запусков одного
+    задания объединяются в один.
+
+    RedisJobStore работает через синхронный клиент redis, и каждое
+    пробуждение планировщика блокирует event loop на время запросов к
+    Redis. Запросы короткие, а socket_timeout ограничивает блокировку,
+    если Redis завис или соединение оборвалось.
+
+    :param redis_url: Адрес Redis
+    :param key_prefix: Префикс ключей хранилища
+    :param misfire_grace_time: Допустимое опоздание запуска, сек
+    :param timezone: Временная зона расписаний
+    :param socket_timeout: Таймаут подключения и запросов к Redis, сек
+    """
+    jobstore = RedisJobStore(
+        jobs_key=f"{key_prefix}:jobs",
+        run_times_key=f"{key_prefix}:run_times",
+        connection_pool=ConnectionPool.from_url(
+            redis_url,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout
+        )
+    )
+    return AsyncIOScheduler(
+        jobstores={'default': jobstore},
+        job_defaults={
+            'coalesce': True,
+            'max_instances': 1,
+            'misfire_grace_time': misfire_grace_time
+        },
+        timezone=timezone
+    )
+
+
+class JobQueue:
+    """
+    Постановка заданий в хранилище из процесса бота
+
+    Планировщик запускается на паузе и только записывает задания в Redis,
+    выполняет их отдельный процесс воркера.
+    """
+    def __init__(self, scheduler: AsyncIOScheduler):
+        self.scheduler = scheduler
+
+    def start(self):
+        """Подключение к хранилищу без выполнения заданий"""
+        self.scheduler.start(paused=True)
+
+    def schedule(self, name: str, trigger: BaseTrigger):
+        """
+        Регистрация периодического задания
+
+        Задание с тем же расписанием не перезаписывается: иначе время
+        следующего запуска пересчиталось бы от текущего момента и запуск,
+        пропущенный во время остановки воркера, был бы потерян.
+
+        :param name: Имя задания (обработчик в воркере)
+        :param trigger: Расписание
+        """
+        job = self.scheduler.get_job(name)
+        if job is not None and repr(job.trigger) == repr(trigger):
+            return
+
+        try:
+            self.scheduler.add_job(run, trigger, args=[name], id=name, name=name, replace_existing=job is not None)
+        except ConflictingIdError:
+            # Задание одновременно зарегистрировала другая реплика
+            return
+        logger.info(f"Задание {name} запланировано: {trigger}")
+
+    def shutdown(self):
+        """Отключение от хранилища (задания остаются в Redis)"""
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
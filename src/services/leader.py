@@ -0,0 +1,165 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, List, Optional
+
+from loguru import logger
+
+
+# Продление и снятие блокировки только своим владельцем
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+LeadershipCallback = Callable[[], Awaitable[None]]
+
+
+class LeaderElection:
+    """
+    Выбор ведущего инстанса через блокировку в Redis
+
+    Ведущим становится инстанс, установивший ключ через SET NX PX, и
+    продлевает его каждые renew_interval секунд. Если ведущий упал, ключ
+    истекает через ttl и его захватывает другой инстанс.
+
+    Срок аренды отсчитывается локально от момента отправки запроса, то есть
+    не позже, чем ключ истечет в Redis. Инстанс слагает полномочия при
+    ошибке, неудачном продлении, ответе дольше timeout или по истечении
+    срока аренды, даже если Redis так и не ответил. Поэтому он перестает
+    считать себя ведущим раньше, чем ключ сможет захватить другой инстанс.
+    """
+    def __init__(
+        self,
+        redis,
+        key: str = "leader",
+        ttl: float = 30,
+        renew_interval: float = 10,
+        instance_id: Optional[str] = None
+    ):
+        if renew_interval * 2 > ttl:
+            raise ValueError("renew_interval должен быть меньше половины ttl")
+
+        self.redis = redis
+        self.key = key
+        self.ttl_ms = int(ttl * 1000)
+        self.renew_interval = renew_interval
+        # Продление должно завершиться или упасть по таймауту до конца аренды
+        self.timeout = (ttl - renew_interval) / 2
+        self.instance_id = instance_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.elected = asyncio.Event()
+        self.lost = asyncio.Event()
+        self.lost.set()
+        self._on_elected: List[LeadershipCallback] = []
+        self._on_lost: List[LeadershipCallback] = []
+        self._task: Optional[asyncio.Task] = None
+        self._lease_deadline = 0.0
+
+    @property
+    def is_leader(self) -> bool:
+        return self.elected.is_set()
+
+    def on_elected(self, callback: LeadershipCallback):
+        """Колбэк при получении лидерства"""
+        self._on_elected.append(callback)
+
+    def on_lost(self, callback: LeadershipCallback):
+        """Колбэк при потере лидерства"""
+        self._on_lost.append(callback)
+
+    async def _try_acquire(self) -> bool:
+        """Захват или продление блокировки с продлением локального срока аренды"""
+        started = time.monotonic()
+        if self.is_leader:
+            request = self.redis.eval(_RENEW_SCRIPT, 1, self.key, self.instance_id, self.ttl_ms)
+        else:
+            request = self.redis.set(self.key, self.instance_id, nx=True, px=self.ttl_ms)
+
+        # Зависшее соединение не должно продлевать лидерство дольше аренды
+        acquired = bool(await asyncio.wait_for(request, timeout=self.timeout))
+        if acquired:
+            self._lease_deadline = started + self.ttl_ms / 1000
+        return acquired
+
+    def _lease_expired(self) -> bool:
+        return time.monotonic() >= self._lease_deadline
+
+    async def _transition(self, leader: bool):
+        """Переключение состояния и вызов колбэков"""
+        if leader:
+            self.lost.clear()
+            self.elected.set()
+            callbacks = self._on_elected
+            logger.info(f"Инстанс {self.instance_id} стал ведущим")
+        else:
+            self.elected.clear()
+            self.lost.set()
+            callbacks = self._on_lost
+            logger.warning(f"Инстанс {self.instance_id} больше не ведущий")
+
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Ошибка обработки смены ведущего: {e}")
+
+    async def _run(self):
+        while True:
+            # Аренда могла истечь, пока event loop был занят
+            if self.is_leader and self._lease_expired():
+                logger.warning(f"Инстанс {self.instance_id}: срок аренды истек до продления")
+                await self._transition(False)
+
+            try:
+                leader = await self._try_acquire()
+            except asyncio.TimeoutError:
+                logger.warning(f"Выбор ведущего: Redis не ответил за {self.timeout} с")
+                leader = False
+            except Exception as e:
+                logger.warning(f"Выбор ведущего: ошибка Redis: {e}")
+                leader = False
+
+            if leader != self.is_leader:
+                await self._transition(leader)
+
+            delay = self.renew_interval
+            if self.is_leader:
+                delay = min(delay, self._lease_deadline - time.monotonic())
+            await asyncio.sleep(max(delay, 0))
+
+    def start(self):
+        """Запуск фонового участия в выборах"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Остановка и освобождение блокировки для быстрого перехода к другому инстансу"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self.is_leader:
+            try:
+                await asyncio.wait_for(
+                    self.redis.eval(_RELEASE_SCRIPT, 1, self.key, self.instance_id),
+                    timeout=self.timeout
+                )
+            except Exception as e:
+                logger.warning(f"Не удалось освободить блокировку ведущего: {e}")
+            await self._transition(False)
@@ -0,0 +1,224 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterable, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Union
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from loguru import logger
+
+
+# Текст сообщения или корутина, которая его построит (например, сбор статистики)
+MessageText = Union[str, Callable[[], Awaitable[Optional[str]]]]
+Message = Tuple[int, MessageText]
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты отправки сообщений
+
+    Глобальный лимит реализован как token bucket, персональный - как
+    минимальный интервал между сообщениями в один чат. При RetryAfter
+    отправка приостанавливается для всех воркеров.
+    """
+    def __init__(self, rate: float, chat_interval: float):
+        self.rate = rate
+        self.chat_interval = chat_interval
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._chat_next: Dict[int, float] = {}
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Приостановка всех отправок (flood control Telegram)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, chat_id: int):
+        """Ожидание права на отправку сообщения в чат"""
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                wait = max(
+                    self._paused_until - now,
+                    self._chat_next.get(chat_id, 0.0) - now,
+                    (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+                )
+                if wait <= 0:
+                    self._tokens -= 1
+                    self._chat_next[chat_id] = now + self.chat_interval
+                    return
+
+            await asyncio.sleep(wait)
+
+
+@dataclass
+class DeliveryReport:
+    """Итоги рассылки"""
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    skipped: int = 0
+    blocked: int = 0
+    retries: int = 0
+    started: float = field(default_factory=time.monotonic)
+    finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Отправлено сообщений в секунду"""
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+    def format(self) -> str:
+        return (
+            f"всего {self.total}, отправлено {self.sent}, ошибок {self.failed} "
+            f"(заблокировали бота {self.blocked}), пропущено {self.skipped}, "
+            f"повторов {self.retries}, {self.elapsed:.1f} с, {self.throughput:.1f} сообщ./с"
+        )
+
+
+class NotificationService:
+    """
+    Массовая отправка сообщений с ограничением конкурентности
+
+    Сообщения читаются из итератора в ограниченную очередь и отправляются
+    пулом воркеров с учетом лимитов Telegram (глобального и на чат).
+    """
+    def __init__(
+        self,
+        bot: Bot,
+        concurrency: int = 20,
+        global_rate: float = 25,
+        chat_interval: float = 1.0,
+        max_retries: int = 3
+    ):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.global_rate = global_rate
+        self.chat_interval = chat_interval
+        self.max_retries = max_retries
+
+    async def broadcast(
+        self,
+        messages: Union[Iterable[Message], AsyncIterable[Message]],
+        on_sent: Optional[Callable[[int], Awaitable[None]]] = None
+    ) -> DeliveryReport:
+        """
+        Рассылка сообщений
+
+        :param messages: Пары (chat_id, текст или корутина, строящая текст)
+        :param on_sent: Колбэк после успешной отправки в чат
+        :return: Итоги рассылки
+        """
+        report = DeliveryReport()
+        limiter = RateLimiter(self.global_rate, self.chat_interval)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                try:
+                    if item is None:
+                        return
+                    await self._deliver(item, limiter, report, on_sent)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        source_error = None
+        try:
+            # Очередь ограничена, поэтому источник не читается быстрее отправки
+            try:
+                if hasattr(messages, '__aiter__'):
+                    async for message in messages:
+                        report.total += 1
+                        await queue.put(message)
+                else:
+                    for message in messages:
+                        report.total += 1
+                        await queue.put(message)
+            except Exception as e:
+                # Уже поставленные в очередь сообщения все равно отправляются
+                source_error = e
+                logger.error(f"Ошибка источника сообщений рассылки: {e}")
+
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            report.finished = time.monotonic()
+
+        if source_error is not None:
+            raise source_error
+        return report
+
+    async def _deliver(self, message: Message, limiter: RateLimiter, report: DeliveryReport, on_sent):
+        chat_id, text = message
+        try:
+            if callable(text):
+                text = await text()
+        except Exception as e:
+            report.failed += 1
+            logger.error(f"Ошибка подготовки сообщения для {chat_id}: {e}")
+            return
+
+        if not text:
+            report.skipped += 1
+            return
+
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire(chat_id)
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text)
+            except TelegramRetryAfter as e:
+                # Flood control: ждем указанное время и повторяем
+                limiter.pause(e.retry_after)
+                report.retries += 1
+                continue
+            except (TelegramNetworkError, TelegramServerError) as e:
+                if attempt < self.max_retries:
+                    report.retries += 1
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                report.failed += 1
+                logger.error(f"Не удалось отправить сообщение {chat_id}: {e}")
+                return
+            except TelegramForbiddenError:
+                # Пользователь заблокировал бота - повторять бессмысленно
+                report.failed += 1
+                report.blocked += 1
+                return
+            except TelegramBadRequest as e:
+                report.failed += 1
+                logger.error(f"Сообщение для {chat_id} отклонено: {e}")
+                return
+            except Exception as e:
+                report.failed += 1
+                logger.error(f"Ошибка при отправке сообщения {chat_id}: {e}")
+                return
+
+            report.sent += 1
+            if on_sent:
+                try:
+                    await on_sent(chat_id)
+                except Exception as e:
+                    logger.error(f"Ошибка обработки отправки для {chat_id}: {e}")
+            return
+
+        report.failed += 1
+        logger.error(f"Превышено число повторов отправки для {chat_id}")
@@ -0,0 +1,134 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from src.models.workout import Exercise, PersonalRecord
+from src.utils.sql import dialect_insert, greatest
+
+
+# Диапазоны повторений: (минимум, максимум, название)
+REP_RANGES = (
+    (1, 3, '1-3'),
+    (4, 6, '4-6'),
+    (7, 12, '7-12'),
+    (13, None, '13+'),
+)
+
+# Показатели рекорда: поле модели и название для пользователя
+RECORD_METRICS = (
+    ('best_weight', 'вес'),
+    ('best_e1rm', 'расчетный 1ПМ'),
+    ('best_volume', 'объем'),
+)
+
+
+def rep_range(reps: int) -> Optional[str]:
+    """Диапазон повторений для рекорда"""
+    for low, high, name in REP_RANGES:
+        if reps >= low and (high is None or reps <= high):
+            return name
+    return None
+
+
+def estimate_1rm(weight: Decimal, reps: int) -> Decimal:
+    """Расчетный одноповторный максимум по формуле Эпли"""
+    if reps == 1:
+        return weight
+    return (weight * (1 + Decimal(reps) / 30)).quantize(Decimal('0.01'))
+
+
+class PersonalRecordService:
+    """
+    Личные рекорды по упражнению и диапазону повторений
+
+    Рекорды обновляются в транзакции записи упражнения. Строка рекорда
+    читается с блокировкой, поэтому новый рекорд определяется один раз
+    даже при параллельной записи подходов.
+    """
+    def __init__(self, db_service):
+        self.db = db_service
+
+    async def apply(self, session, exercise: Exercise) -> List[str]:
+        """
+        Учет записи упражнения в рекордах (в транзакции вызывающего кода)
+
+        :param session: Текущая сессия
+        :param exercise: Новая запись упражнения
+        :return: Названия побитых показателей (пусто, если рекордов нет)
+        """
+        if not exercise.weight or not exercise.reps or exercise.reps < 1:
+            return []
+
+        weight = Decimal(str(exercise.weight))
+        values = {
+            'best_weight': weight,
+            'best_e1rm': estimate_1rm(weight, exercise.reps),
+            'best_volume': weight * exercise.reps * (exercise.sets or 1)
+        }
+        record_range = rep_range(exercise.reps)
+
+        current = await session.scalar(
+            select(PersonalRecord).where(
+                PersonalRecord.user_id == exercise.user_id,
+                PersonalRecord.name == exercise.name,
+                PersonalRecord.rep_range == record_range
+            ).with_for_update()
+        )
+        # Первая запись в диапазоне - точка отсчета, а не рекорд
+        if current is None:
+            improved = []
+        else:
+            improved = [
+                title for field, title in RECORD_METRICS
+                if values[field] > getattr(current, field)
+            ]
+
+        if current is not None and not improved:
+            return []
+
+        statement = dialect_insert(self.db.dialect_name)(PersonalRecord).values(
+            user_id=exercise.user_id,
+            name=exercise.name,
+            rep_range=record_range,
+            achieved_at=exercise.workout_date,
+            **values
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=['user_id', 'name', 'rep_range'],
+            set_={
+                **{
+                    field: greatest(getattr(PersonalRecord, field), statement.excluded[field], self.db.dialect_name)
+                    for field, _ in RECORD_METRICS
+                },
+                'achieved_at': statement.excluded.achieved_at,
+                'updated_at': datetime.utcnow()
+            }
+        )
+        await session.execute(statement)
+        # Объект в сессии мог быть загружен до обновления
+        if current is not None:
+            session.expire(current)
+        return improved
+
+    async def get_records(self, user_id: int, exercise_name: str = None) -> Dict[str, List[PersonalRecord]]:
+        """
+        Рекорды пользователя, сгруппированные по упражнению
+
+        :param user_id: ID пользователя
+        :param exercise_name: Название упражнения (по умолчанию - все)
+        :return: Словарь {упражнение: рекорды по диапазонам повторений}
+        """
+        query = select(PersonalRecord).where(PersonalRecord.user_id == user_id)
+        if exercise_name:
+            query = query.where(PersonalRecord.name == exercise_name.strip().lower())
+
+        async with self.db.get_session() as session:
+            records = (await session.scalars(query.order_by(PersonalRecord.name))).all()
+
+        order = {name: index for index, (_, _, name) in enumerate(REP_RANGES)}
+        grouped: Dict[str, List[PersonalRecord]] = {}
+        for record in sorted(records, key=lambda r: (r.name, order.get(r.rep_range, len(order)))):
+            grouped.setdefault(record.name, []).append(record)
+        return grouped
@@ -0,0 +1,116 @@
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, Optional, Sequence
+
+
+# Границы корзин гистограммы времени ожидания соединения (секунды)
+DEFAULT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """
+    Метрики пула соединений с БД
+
+    Собирает гистограмму времени ожидания соединения и счетчики таймаутов,
+    а текущую загрузку (checked-out, overflow) читает из пула SQLAlchemy
+    """
+    def __init__(self, engine, buckets: Sequence[float] = DEFAULT_WAIT_BUCKETS):
+        self.engine = engine
+        self.buckets = tuple(buckets)
+        self._bucket_counts = [0] * (len(self.buckets) + 1)
+        self._wait_sum = 0.0
+        self._wait_count = 0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._lock = Lock()
+
+    def observe_wait(self, seconds: float):
+        """
+        Учет времени ожидания соединения
+
+        :param seconds: Время от запроса соединения до его получения
+        """
+        with self._lock:
+            self._bucket_counts[bisect_left(self.buckets, seconds)] += 1
+            self._wait_sum += seconds
+            self._wait_count += 1
+            self._wait_max = max(self._wait_max, seconds)
+
+    def observe_timeout(self):
+        """Учет таймаута ожидания свободного соединения"""
+        with self._lock:
+            self._timeouts += 1
+
+    @property
+    def pool(self):
+        # Пул читается из движка: после dispose() он пересоздается
+        return self.engine.pool
+
+    def _pool_value(self, name: str) -> Optional[int]:
+        # NullPool/StaticPool (SQLite) не ведут учет соединений
+        method = getattr(self.pool, name, None)
+        return method() if callable(method) else None
+
+    def snapshot(self) -> Dict:
+        """
+        Текущее состояние пула
+
+        :return: Словарь с загрузкой пула и гистограммой ожидания
+        """
+        with self._lock:
+            cumulative = []
+            total = 0
+            for bound, count in zip(self.buckets + (float('inf'),), self._bucket_counts):
+                total += count
+                cumulative.append((bound, total))
+
+            return {
+                'pool_class': type(self.pool).__name__,
+                'size': self._pool_value('size'),
+                'checked_in': self._pool_value('checkedin'),
+                'checked_out': self._pool_value('checkedout'),
+                'overflow': self._pool_value('overflow'),
+                'timeouts': self._timeouts,
+                'wait_count': self._wait_count,
+                'wait_sum': self._wait_sum,
+                'wait_avg': self._wait_sum / self._wait_count if self._wait_count else 0.0,
+                'wait_max': self._wait_max,
+                'wait_histogram': cumulative
+            }
+
+    def render_prometheus(self, prefix: str = 'db_pool') -> str:
+        """
+        Метрики в текстовом формате Prometheus
+
+        :param prefix: Префикс имен метрик
+        :return: Текст для отдачи по HTTP
+        """
+        stats = self.snapshot()
+        lines = []
+
+        for name in ('size', 'checked_in', 'checked_out', 'overflow'):
+            if stats[name] is not None:
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                lines.append(f"{prefix}_{name} {stats[name]}")
+
+        lines.append(f"# TYPE {prefix}_timeouts_total counter")
+        lines.append(f"{prefix}_timeouts_total {stats['timeouts']}")
+
+        lines.append(f"# TYPE {prefix}_wait_seconds histogram")
+        for bound, count in stats['wait_histogram']:
+            le = '+Inf' if bound == float('inf') else f"{bound:g}"
+            lines.append(f'{prefix}_wait_seconds_bucket{{le="{le}"}} {count}')
+        lines.append(f"{prefix}_wait_seconds_sum {stats['wait_sum']:.6f}")
+        lines.append(f"{prefix}_wait_seconds_count {stats['wait_count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def format_log(self) -> str:
+        """Краткая строка состояния пула для логов"""
+        stats = self.snapshot()
+        return (
+            f"pool={stats['pool_class']} size={stats['size']} "
+            f"checked_out={stats['checked_out']} overflow={stats['overflow']} "
+            f"timeouts={stats['timeouts']} wait_avg={stats['wait_avg'] * 1000:.1f}ms "
+            f"wait_max={stats['wait_max'] * 1000:.1f}ms"
+        )
@@ -0,0 +1,212 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from sqlalchemy import distinct, func, select
+
+from src.models.goal import Goal, GoalStatus
+from src.models.sleep_weight import SleepRecord, WeightRecord
+from src.models.transaction import CategoryType, MonthlyBalance, Transaction
+from src.utils.sql import hours_between
+
+
+@dataclass
+class GoalProgress:
+    """Прогресс активной цели для отчета"""
+    title: str
+    start_value: Decimal
+    current_value: Decimal
+    target_value: Decimal
+
+
+@dataclass
+class UserReportStats:
+    """Данные еженедельного отчета пользователя"""
+    user_id: int
+    expenses_stats: dict = field(default_factory=lambda: {
+        'income': Decimal('0'), 'expenses': Decimal('0'), 'balance': Decimal('0')
+    })
+    weight_stats: dict = field(default_factory=lambda: {
+        'current_weight': None, 'previous_weight': None, 'week_start_weight': None
+    })
+    sleep_stats: dict = field(default_factory=lambda: {
+        'avg_duration': None, 'records_count': 0
+    })
+    goals: List[GoalProgress] = field(default_factory=list)
+
+
+class ReportStatisticsService:
+    """
+    Пакетный расчет статистики для еженедельных отчетов
+
+    Вместо нескольких запросов на каждого пользователя считает данные
+    группой агрегирующих запросов на пачку пользователей и отдает
+    результат по одному пользователю.
+    """
+    def __init__(self, db_service, chunk_size: int = 1000):
+        self.db = db_service
+        self.chunk_size = chunk_size
+
+    async def iter_weekly_stats(self, days: int = 7) -> AsyncIterator[UserReportStats]:
+        """
+        Статистика всех пользователей, активных за период
+
+        :param days: Период активности в днях
+        :return: Асинхронный итератор по пользователям
+        """
+        now = datetime.utcnow()
+        active_since = now - timedelta(days=days)
+        last_user_id = None
+
+        while True:
+            # Активные пользователи постранично по user_id
+            async with self.db.get_session() as session:
+                query = select(distinct(Transaction.user_id)).where(
+                    Transaction.created_at >= active_since
+                )
+                if last_user_id is not None:
+                    query = query.where(Transaction.user_id > last_user_id)
+                user_ids = (await session.scalars(
+                    query.order_by(Transaction.user_id).limit(self.chunk_size)
+                )).all()
+
+            if not user_ids:
+                return
+
+            for stats in await self.get_stats(user_ids, now=now, days=days):
+                yield stats
+
+            last_user_id = user_ids[-1]
+
+    async def get_stats(
+        self,
+        user_ids: Sequence[int],
+        now: Optional[datetime] = None,
+        days: int = 7
+    ) -> List[UserReportStats]:
+        """
+        Статистика пачки пользователей
+
+        :param user_ids: ID пользователей
+        :param now: Момент расчета
+        :param days: Период для статистики сна
+        :return: Статистика в порядке user_ids
+        """
+        now = now or datetime.utcnow()
+        stats: Dict[int, UserReportStats] = {
+            user_id: UserReportStats(user_id=user_id) for user_id in user_ids
+        }
+
+        async with self.db.get_session() as session:
+            await self._load_balances(session, stats, now)
+            await self._load_weights(session, stats, now)
+            await self._load_sleep(session, stats, now - timedelta(days=days))
+            await self._load_goals(session, stats)
+
+        return list(stats.values())
+
+    async def _load_balances(self, session, stats: Dict[int, UserReportStats], now: datetime):
+        """Доходы и расходы за текущий месяц из помесячных итогов"""
+        result = await session.execute(
+            select(
+                MonthlyBalance.user_id,
+                MonthlyBalance.category_type,
+                MonthlyBalance.total
+            ).where(
+                MonthlyBalance.user_id.in_(list(stats)),
+                MonthlyBalance.month == now.date().replace(day=1)
+            )
+        )
+
+        for user_id, category_type, total in result:
+            balance = stats[user_id].expenses_stats
+            key = 'income' if category_type == CategoryType.INCOME.value else 'expenses'
+            balance[key] += total or Decimal('0')
+            balance['balance'] = balance['income'] - balance['expenses']
+
+    async def _load_weights(self, session, stats: Dict[int, UserReportStats], now: datetime):
+        """Последние два измерения веса и вес на начало недели"""
+        user_ids = list(stats.keys())
+
+        latest = select(
+            WeightRecord.user_id,
+            WeightRecord.weight,
+            func.row_number().over(
+                partition_by=WeightRecord.user_id,
+                order_by=(WeightRecord.record_date.desc(), WeightRecord.id.desc())
+            ).label('position')
+        ).where(
+            WeightRecord.user_id.in_(user_ids)
+        ).subquery()
+
+        result = await session.execute(
+            select(latest.c.user_id, latest.c.weight, latest.c.position).where(latest.c.position <= 2)
+        )
+        for user_id, weight, position in result:
+            key = 'current_weight' if position == 1 else 'previous_weight'
+            stats[user_id].weight_stats[key] = weight
+
+        week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        first_of_week = select(
+            WeightRecord.user_id,
+            WeightRecord.weight,
+            func.row_number().over(
+                partition_by=WeightRecord.user_id,
+                order_by=(WeightRecord.record_date, WeightRecord.id)
+            ).label('position')
+        ).where(
+            WeightRecord.user_id.in_(user_ids),
+            WeightRecord.record_date >= week_start
+        ).subquery()
+
+        result = await session.execute(
+            select(first_of_week.c.user_id, first_of_week.c.weight).where(first_of_week.c.position == 1)
+        )
+        for user_id, weight in result:
+            stats[user_id].weight_stats['week_start_weight'] = weight
+
+    async def _load_sleep(self, session, stats: Dict[int, UserReportStats], start_date: datetime):
+        """Средняя продолжительность и количество записей сна"""
+        duration = hours_between(SleepRecord.sleep_time, SleepRecord.wake_time, self.db.dialect_name)
+        result = await session.execute(
+            select(
+                SleepRecord.user_id,
+                func.avg(duration),
+                func.count(SleepRecord.id)
+            ).where(
+                SleepRecord.user_id.in_(list(stats)),
+                SleepRecord.sleep_time >= start_date,
+                SleepRecord.wake_time != None
+            ).group_by(
+                SleepRecord.user_id
+            )
+        )
+
+        for user_id, avg_duration, records_count in result:
+            stats[user_id].sleep_stats = {
+                'avg_duration': float(avg_duration) if avg_duration is not None else None,
+                'records_count': records_count
+            }
+
+    async def _load_goals(self, session, stats: Dict[int, UserReportStats]):
+        """Активные цели"""
+        result = await session.execute(
+            select(
+                Goal.user_id,
+                Goal.title,
+                Goal.start_value,
+                Goal.current_value,
+                Goal.target_value
+            ).where(
+                Goal.user_id.in_(list(stats)),
+                Goal.status == GoalStatus.ACTIVE.value
+            ).order_by(
+                Goal.user_id, Goal.id
+            )
+        )
+
+        for user_id, title, start_value, current_value, target_value in result:
+            stats[user_id].goals.append(
+                GoalProgress(title, start_value, current_value, target_value)
+            )
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import bindparam, func, insert, or_, select
+
+from src.models.savings import SavingsAccount, SavingsEntry
+from src.utils.sql import dialect_insert
+
+
+class SavingsLedgerService:
+    """
+    Журнал пополнений накопительного счёта
+
+    Каждое округление - отдельная запись в savings_entries, поэтому запись
+    транзакции не читает и не блокирует строку счёта. Баланс равен снимку
+    в savings_accounts плюс записи журнала после снимка.
+    """
+    def __init__(self, db_service, snapshot_lag: timedelta = timedelta(minutes=5)):
+        self.db = db_service
+        # Записи моложе lag не сворачиваются: в PostgreSQL id может
+        # зафиксироваться не по порядку у параллельных транзакций
+        self.snapshot_lag = snapshot_lag
+
+    async def record(self, session, user_id: int, amount: Decimal, transaction_id: int = None):
+        """
+        Добавление записи в журнал (в транзакции вызывающего кода)
+
+        :param session: Текущая сессия
+        :param user_id: ID пользователя
+        :param amount: Сумма пополнения
+        :param transaction_id: ID транзакции, с которой пришло округление
+        """
+        now = datetime.utcnow()
+        await session.execute(
+            insert(SavingsEntry).values(
+                user_id=user_id,
+                amount=amount,
+                transaction_id=transaction_id,
+                created_at=now,
+                updated_at=now
+            )
+        )
+
+    async def get_balance(self, user_id: int) -> Decimal:
+        """
+        Баланс счёта: снимок плюс хвост журнала (один запрос)
+
+        :param user_id: ID пользователя
+        :return: Баланс накопительного счёта
+        """
+        snapshot_balance = select(SavingsAccount.balance).where(
+            SavingsAccount.user_id == user_id
+        ).scalar_subquery()
+        snapshot_entry_id = select(SavingsAccount.snapshot_entry_id).where(
+            SavingsAccount.user_id == user_id
+        ).scalar_subquery()
+        tail = select(func.sum(SavingsEntry.amount)).where(
+            SavingsEntry.user_id == user_id,
+            SavingsEntry.id > func.coalesce(snapshot_entry_id, 0)
+        ).scalar_subquery()
+
+        async with self.db.get_session() as session:
+            balance = await session.scalar(
+                select(func.coalesce(snapshot_balance, 0) + func.coalesce(tail, 0))
+            )
+        return Decimal(str(balance or 0)).quantize(Decimal('0.01'))
+
+    async def compact(self) -> int:
+        """
+        Перенос записей журнала в снимки балансов
+
+        :return: Количество обновленных счетов
+        """
+        cutoff = datetime.utcnow() - self.snapshot_lag
+        base_entry_id = func.coalesce(SavingsAccount.snapshot_entry_id, 0)
+
+        # Граница снимка выбирается по id: все записи до первой молодой.
+        # Отбор по created_at оставил бы ниже границы запись с меньшим id,
+        # но более поздним created_at, и она выпала бы и из снимка, и из хвоста
+        young = select(
+            SavingsEntry.user_id,
+            func.min(SavingsEntry.id).label('first_young_id')
+        ).outerjoin(
+            SavingsAccount, SavingsAccount.user_id == SavingsEntry.user_id
+        ).where(
+            SavingsEntry.id > base_entry_id,
+            SavingsEntry.created_at >= cutoff
+        ).group_by(
+            SavingsEntry.user_id
+        ).subquery()
+
+        async with self.db.get_session() as session:
+            result = await session.execute(
+                select(
+                    SavingsEntry.user_id,
+                    base_entry_id,
+                    func.sum(SavingsEntry.amount),
+                    func.max(SavingsEntry.id)
+                ).outerjoin(
+                    SavingsAccount, SavingsAccount.user_id == SavingsEntry.user_id
+                ).outerjoin(
+                    young, young.c.user_id == SavingsEntry.user_id
+                ).where(
+                    SavingsEntry.id > base_entry_id,
+                    or_(young.c.first_young_id.is_(None), SavingsEntry.id < young.c.first_young_id)
+                ).group_by(
+                    SavingsEntry.user_id, base_entry_id
+                )
+            )
+            rows = result.all()
+            if not rows:
+                return 0
+
+            now = datetime.utcnow()
+            statement = dialect_insert(self.db.dialect_name)(SavingsAccount.__table__)
+            statement = statement.on_conflict_do_update(
+                index_elements=['user_id'],
+                set_={
+                    'balance': func.coalesce(SavingsAccount.balance, 0) + statement.excluded.balance,
+                    'snapshot_entry_id': statement.excluded.snapshot_entry_id,
+                    'updated_at': now
+                },
+                # Снимок, уже сдвинутый параллельным запуском, не трогаем
+                where=SavingsAccount.snapshot_entry_id == bindparam('base_entry_id')
+            )
+            await session.execute(statement, [
+                {
+                    'user_id': user_id,
+                    'base_entry_id': base,
+                    'balance': amount,
+                    'snapshot_entry_id': last_entry_id,
+                    'created_at': now,
+                    'updated_at': now
+                }
+                for user_id, base, amount, last_entry_id in rows
+            ])
+            return len(rows)
@@ -1,21 +1,39 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
+from decimal import Decimal
+import math
+from sqlalchemy import func, select, union_all
 
-import datetime
-
-from src.models.sleep_weight import WeightRecord
+from src.models.sleep_weight import SleepDailySummary, WeightDailySummary, WeightRecord
 from src.models.goal import GoalStatus, Goal, GoalType
 from src.models.sleep_weight import SleepRecord
-
+from src.services.daily_summaries import SLEEP_DAY_OFFSET, DailySummaryService, smooth_trend
+from src.services.goal_engine import GoalEngine
+from src.services.stats_screen import StatsCache, StatsSection
+from src.utils.sql import date_of, hours_between, minutes_of_day
 
 
 class SleepWeightService:
     """Сервис для работы с записями сна и веса"""
-    def __init__(self, db_service):
+    def __init__(
+        self,
+        db_service,
+        stats_cache: StatsCache = None,
+        summaries: DailySummaryService = None,
+        goal_engine: GoalEngine = None
+    ):
         self.db = db_service
+        self.stats_cache = stats_cache
+        self.summaries = summaries or DailySummaryService(db_service)
+        self.goal_engine = goal_engine or GoalEngine(db_service)
+
+    async def _invalidate_stats(self, user_id: int, *sections: StatsSection):
+        """Сброс разделов экрана статистики после записи"""
+        if self.stats_cache is not None:
+            await self.stats_cache.invalidate(user_id, *sections)
 
     async def add_weight_record(self, user_id: int, weight: float) -> WeightRecord:
         """Добавление записи о весе"""
-        with self.db.get_session() as session:
+        async with self.db.get_session() as session:
             record = WeightRecord(
                 user_id=user_id,
                 weight=weight,
@@ -23,44 +41,113 @@ class SleepWeightService:
             )
             session.add(record)
             
-            # Обновляем прогресс цели по весу, если она есть
-            goal = await self.get_active_weight_goal(user_id)
-            if goal:
-                goal.current_value = weight
-                if (goal.target_value > goal.start_value and weight >= goal.target_value) or \
-                   (goal.target_value < goal.start_value and weight <= goal.target_value):
-                    goal.status = GoalStatus.COMPLETED
-            
-            return record
+            # Прогресс целей по весу обновляется в той же транзакции
+            completions = await self.goal_engine.set_progress(session, user_id, GoalType.WEIGHT, weight)
+        
+        await self._invalidate_stats(user_id, StatsSection.WEIGHT, StatsSection.GOALS)
+        await self.goal_engine.publish(completions)
+        return record
 
-    async def get_weight_stats(self, user_id: int) -> dict:
-        """Получение статистики по весу"""
-        with self.db.get_session() as session:
+    async def get_weight_stats(self, user_id: int, days: int = 30) -> dict:
+        """
+        Получение статистики по весу
+        
+        Минимум, среднее и тренд за период берутся из суточных итогов,
+        исходные записи читаются только за еще не посчитанные дни.
+        
+        :param user_id: ID пользователя
+        :param days: Количество дней для минимума и среднего
+        :return: Словарь со статистикой (None в полях, если записей нет)
+        """
+        now = datetime.utcnow()
+        start_day = (now - timedelta(days=days)).date()
+        
+        async with self.db.get_session() as session:
             # Получаем последние две записи для сравнения
-            last_records = session.query(WeightRecord).filter(
-                WeightRecord.user_id == user_id
-            ).order_by(
-                WeightRecord.record_date.desc()
-            ).limit(2).all()
+            last_records = (await session.scalars(
+                select(WeightRecord).where(
+                    WeightRecord.user_id == user_id
+                ).order_by(
+                    WeightRecord.record_date.desc()
+                ).limit(2)
+            )).all()
             
             # Получаем вес на начало недели
-            week_start = datetime.utcnow() - timedelta(days=datetime.utcnow().weekday())
-            week_start_record = session.query(WeightRecord).filter(
-                WeightRecord.user_id == user_id,
-                WeightRecord.record_date >= week_start
-            ).order_by(
-                WeightRecord.record_date
-            ).first()
+            week_start = now - timedelta(days=now.weekday())
+            week_start_record = await session.scalar(
+                select(WeightRecord).where(
+                    WeightRecord.user_id == user_id,
+                    WeightRecord.record_date >= week_start
+                ).order_by(
+                    WeightRecord.record_date
+                ).limit(1)
+            )
             
-            return {
-                'current_weight': last_records[0].weight if last_records else None,
-                'previous_weight': last_records[1].weight if len(last_records) > 1 else None,
-                'week_start_weight': week_start_record.weight if week_start_record else None
-            }
+            summarized_through = await self.summaries.get_summarized_through(session, user_id)
+            tail_start = max(summarized_through or start_day, start_day)
+            period = union_all(
+                select(
+                    WeightDailySummary.min_weight.label('min_weight'),
+                    (WeightDailySummary.avg_weight * WeightDailySummary.records_count).label('weight_sum'),
+                    WeightDailySummary.records_count.label('records_count')
+                ).where(
+                    WeightDailySummary.user_id == user_id,
+                    WeightDailySummary.day >= start_day,
+                    WeightDailySummary.day < tail_start
+                ),
+                select(
+                    func.min(WeightRecord.weight),
+                    func.sum(WeightRecord.weight),
+                    func.count(WeightRecord.id)
+                ).where(
+                    WeightRecord.user_id == user_id,
+                    WeightRecord.record_date >= DailySummaryService.day_start(tail_start)
+                )
+            ).subquery()
+            min_weight, weight_sum, records_count = (await session.execute(
+                select(
+                    func.min(period.c.min_weight),
+                    func.sum(period.c.weight_sum),
+                    func.sum(period.c.records_count)
+                )
+            )).one()
+            
+            trend_weight = await self._get_trend_weight(session, user_id, summarized_through or start_day)
+        
+        return {
+            'current_weight': last_records[0].weight if last_records else None,
+            'previous_weight': last_records[1].weight if len(last_records) > 1 else None,
+            'week_start_weight': week_start_record.weight if week_start_record else None,
+            'min_weight': float(min_weight) if min_weight is not None else None,
+            'avg_weight': float(weight_sum) / records_count if records_count else None,
+            'trend_weight': float(trend_weight) if trend_weight is not None else None
+        }
+
+    async def _get_trend_weight(self, session, user_id: int, tail_start) -> Decimal:
+        """Тренд веса: последний посчитанный, продолженный по дням с tail_start"""
+        trend = await session.scalar(
+            select(WeightDailySummary.trend_weight).where(
+                WeightDailySummary.user_id == user_id,
+                WeightDailySummary.day < tail_start
+            ).order_by(
+                WeightDailySummary.day.desc()
+            ).limit(1)
+        )
+        
+        day = date_of(WeightRecord.record_date, self.db.dialect_name)
+        recent = await session.scalars(
+            select(func.avg(WeightRecord.weight)).where(
+                WeightRecord.user_id == user_id,
+                WeightRecord.record_date >= DailySummaryService.day_start(tail_start)
+            ).group_by(day).order_by(day)
+        )
+        for avg_weight in recent:
+            trend = smooth_trend(trend, Decimal(str(avg_weight)), self.summaries.trend_smoothing)
+        return trend
 
     async def start_sleep_tracking(self, user_id: int):
         """Начало отслеживания сна"""
-        with self.db.get_session() as session:
+        async with self.db.get_session() as session:
             record = SleepRecord(
                 user_id=user_id,
                 sleep_time=datetime.utcnow(),
@@ -71,55 +158,152 @@ class SleepWeightService:
 
     async def end_sleep_tracking(self, user_id: int) -> SleepRecord:
         """Завершение отслеживания сна"""
-        with self.db.get_session() as session:
+        async with self.db.get_session() as session:
             # Ищем последнюю незавершенную запись
-            record = session.query(SleepRecord).filter(
-                SleepRecord.user_id == user_id,
-                SleepRecord.wake_time == None
-            ).order_by(
-                SleepRecord.sleep_time.desc()
-            ).first()
+            record = await session.scalar(
+                select(SleepRecord).where(
+                    SleepRecord.user_id == user_id,
+                    SleepRecord.wake_time == None
+                ).order_by(
+                    SleepRecord.sleep_time.desc()
+                ).limit(1)
+            )
             
             if record:
                 record.wake_time = datetime.utcnow()
-                return record
-            return None
+        
+        if record:
+            await self._invalidate_stats(user_id, StatsSection.SLEEP)
+        return record
 
     async def get_sleep_stats(self, user_id: int, days: int = 7) -> dict:
-        """Получение статистики по сну"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-        
-        with self.db.get_session() as session:
-            records = session.query(SleepRecord).filter(
-                SleepRecord.user_id == user_id,
-                SleepRecord.sleep_time >= start_date,
-                SleepRecord.wake_time != None
-            ).all()
-            
-            if not records:
-                return {
-                    'avg_duration': None,
-                    'optimal_duration': None
-                }
-            
-            durations = [(r.wake_time - r.sleep_time).total_seconds() / 3600 for r in records]
-            avg_duration = sum(durations) / len(durations)
-            
-            # Определяем оптимальную продолжительность сна как медиану
-            optimal_duration = sorted(durations)[len(durations) // 2]
+        """
+        Статистика сна за период, посчитанная в БД
+        
+        Показатели считаются по суткам сна (все засыпания за сутки
+        суммируются): посчитанные дни берутся из суточных итогов, остальные
+        группируются из исходных записей. Продолжительность - в часах,
+        разброс времени засыпания и пробуждения - стандартное отклонение
+        в минутах. Время суток считается со сдвигом на 12 часов, чтобы
+        засыпание около полуночи не разрывалось на 23:59 и 00:00.
+        
+        :param user_id: ID пользователя
+        :param days: Количество дней (7, 30, 90, 365...)
+        :return: Словарь со статистикой (None в полях, если записей нет)
+        """
+        start_day = (datetime.utcnow() - timedelta(days=days, minutes=-SLEEP_DAY_OFFSET)).date()
+        
+        async with self.db.get_session() as session:
+            summarized_through = await self.summaries.get_summarized_through(session, user_id)
+            nights = self._nights_query(
+                user_id, start_day, max(summarized_through or start_day, start_day)
+            ).subquery()
             
-            return {
-                'avg_duration': avg_duration,
-                'optimal_duration': optimal_duration,
-                'records_count': len(records)
-            }
+            if self.db.dialect_name == 'sqlite':
+                stats = await self._sqlite_sleep_stats(session, nights)
+            else:
+                stats = (await session.execute(
+                    select(
+                        func.coalesce(func.sum(nights.c.sessions), 0).label('records_count'),
+                        func.avg(nights.c.duration).label('avg_duration'),
+                        func.percentile_cont(0.5).within_group(nights.c.duration).label('optimal_duration'),
+                        func.var_pop(nights.c.duration).label('duration_variance'),
+                        func.stddev_pop(nights.c.bedtime).label('bedtime_deviation'),
+                        func.stddev_pop(nights.c.wake).label('wake_deviation')
+                    )
+                )).mappings().one()
+        
+        return {
+            key: (int(value) if key == 'records_count' else None if value is None else float(value))
+            for key, value in stats.items()
+        }
+
+    def _nights_query(self, user_id: int, start_day, tail_start):
+        """
+        Сутки сна пользователя: итоги до tail_start и исходные записи после
+        
+        :return: Запрос с колонками duration, sessions, bedtime, wake
+        """
+        dialect_name = self.db.dialect_name
+        summarized = select(
+            SleepDailySummary.total_hours.label('duration'),
+            SleepDailySummary.sessions_count.label('sessions'),
+            minutes_of_day(SleepDailySummary.first_bedtime, dialect_name, SLEEP_DAY_OFFSET).label('bedtime'),
+            minutes_of_day(SleepDailySummary.last_wake_time, dialect_name, SLEEP_DAY_OFFSET).label('wake')
+        ).where(
+            SleepDailySummary.user_id == user_id,
+            SleepDailySummary.day >= start_day,
+            SleepDailySummary.day < tail_start
+        )
+        
+        day = date_of(SleepRecord.sleep_time, dialect_name, SLEEP_DAY_OFFSET)
+        recent = select(
+            func.sum(hours_between(SleepRecord.sleep_time, SleepRecord.wake_time, dialect_name)),
+            func.count(SleepRecord.id),
+            minutes_of_day(func.min(SleepRecord.sleep_time), dialect_name, SLEEP_DAY_OFFSET),
+            minutes_of_day(func.max(SleepRecord.wake_time), dialect_name, SLEEP_DAY_OFFSET)
+        ).where(
+            SleepRecord.user_id == user_id,
+            SleepRecord.sleep_time >= DailySummaryService.day_start(tail_start, SLEEP_DAY_OFFSET),
+            SleepRecord.wake_time != None
+        ).group_by(day)
+        
+        return union_all(summarized, recent)
+
+    @staticmethod
+    async def _sqlite_sleep_stats(session, nights) -> dict:
+        """
+        Статистика сна для SQLite (нет percentile_cont и stddev)
+        
+        Средние и дисперсии считаются агрегатами по суммам квадратов,
+        медиана - выборкой одного-двух средних значений по порядку.
+        """
+        duration, bedtime, wake = nights.c.duration, nights.c.bedtime, nights.c.wake
+        sums = (await session.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(nights.c.sessions), 0),
+                func.avg(duration),
+                func.avg(duration * duration),
+                func.avg(bedtime),
+                func.avg(bedtime * bedtime),
+                func.avg(wake),
+                func.avg(wake * wake)
+            )
+        )).one()
+        count = sums[0]
+        
+        def deviation(mean, mean_square, root=True):
+            if not count:
+                return None
+            variance = max(mean_square - mean * mean, 0.0)
+            return math.sqrt(variance) if root else variance
+        
+        median = None
+        if count:
+            middle = (await session.scalars(
+                select(duration).order_by(duration)
+                .offset((count - 1) // 2).limit(2 - count % 2)
+            )).all()
+            median = sum(middle) / len(middle)
+        
+        return {
+            'records_count': sums[1],
+            'avg_duration': sums[2],
+            'optimal_duration': median,
+            'duration_variance': deviation(sums[2], sums[3], root=False),
+            'bedtime_deviation': deviation(sums[4], sums[5]),
+            'wake_deviation': deviation(sums[6], sums[7])
+        }
 
     async def get_active_weight_goal(self, user_id: int) -> Goal:
         """Получение активной цели по весу"""
-        with self.db.get_session() as session:
-            goal = session.query(Goal).filter(
-                Goal.user_id == user_id,
-                Goal.goal_type == GoalType.WEIGHT,
-                Goal.status == GoalStatus.ACTIVE
-            ).first()
+        async with self.db.get_session() as session:
+            goal = await session.scalar(
+                select(Goal).where(
+                    Goal.user_id == user_id,
+                    Goal.goal_type == GoalType.WEIGHT.value,
+                    Goal.status == GoalStatus.ACTIVE.value
+                ).limit(1)
+            )
             return goal
\ No newline at end of file
@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Optional
+
+from src.services.cache import CacheService
+from src.utils.formatters import (
+    STATISTICS_HEADER,
+    format_finances_section,
+    format_goals_section,
+    format_sleep_section,
+    format_weight_section,
+)
+
+
+class StatsSection(str, Enum):
+    """Разделы экрана статистики"""
+    FINANCES = "finances"
+    WEIGHT = "weight"
+    SLEEP = "sleep"
+    GOALS = "goals"
+
+
+class StatsCache:
+    """
+    Кэш отрисованных разделов экрана статистики
+
+    Раздел хранится вместе с периодом, за который он посчитан (месяц для
+    финансов, день для веса и сна), и считается промахом после смены
+    периода. Сервисы предметных областей сбрасывают свой раздел при записи.
+    """
+    def __init__(self, cache: CacheService = None):
+        self.cache = cache or CacheService(namespace='stats')
+
+    @staticmethod
+    def _key(user_id: int, section: StatsSection) -> str:
+        return f"{user_id}:{StatsSection(section).value}"
+
+    async def get(self, user_id: int, section: StatsSection, period: str) -> Optional[str]:
+        """Текст раздела, если он посчитан за тот же период"""
+        cached = await self.cache.get(self._key(user_id, section))
+        if cached is None or cached['period'] != period:
+            return None
+        return cached['text']
+
+    async def set(self, user_id: int, section: StatsSection, period: str, text: str):
+        await self.cache.set(self._key(user_id, section), {'period': period, 'text': text})
+
+    async def invalidate(self, user_id: int, *sections: StatsSection):
+        """Сброс разделов пользователя после изменения данных"""
+        await self.cache.delete(*(self._key(user_id, section) for section in sections))
+
+
+class StatisticsScreenService:
+    """Сборка экрана «📊 Статистика» из кэшированных разделов"""
+    def __init__(self, expenses_service, sleep_weight_service, goals_service, stats_cache: StatsCache):
+        self.expenses = expenses_service
+        self.sleep_weight = sleep_weight_service
+        self.goals = goals_service
+        self.stats_cache = stats_cache
+
+    def _sections(self, user_id: int, now: datetime) -> Dict[StatsSection, tuple]:
+        """Период и функция расчета текста для каждого раздела"""
+        async def finances():
+            return format_finances_section(await self.expenses.get_balance(user_id))
+
+        async def weight():
+            return format_weight_section(await self.sleep_weight.get_weight_stats(user_id))
+
+        async def sleep():
+            return format_sleep_section(await self.sleep_weight.get_sleep_stats(user_id))
+
+        async def goals():
+            return format_goals_section(await self.goals.get_user_goals(user_id))
+
+        return {
+            StatsSection.FINANCES: (now.strftime('%Y-%m'), finances),
+            StatsSection.WEIGHT: (now.date().isoformat(), weight),
+            StatsSection.SLEEP: (now.date().isoformat(), sleep),
+            StatsSection.GOALS: ('', goals)
+        }
+
+    async def render(self, user_id: int) -> str:
+        """
+        Текст общей статистики пользователя
+
+        Разделы берутся из кэша, недостающие считаются параллельно.
+
+        :param user_id: ID пользователя
+        :return: Текст статистики
+        """
+        sections = self._sections(user_id, datetime.utcnow())
+        cached = await asyncio.gather(*(
+            self.stats_cache.get(user_id, section, period)
+            for section, (period, _) in sections.items()
+        ))
+        texts = dict(zip(sections, cached))
+
+        missing = [section for section, text in texts.items() if text is None]
+        if missing:
+            computed = await asyncio.gather(*(sections[section][1]() for section in missing))
+            for section, text in zip(missing, computed):
+                texts[section] = text
+                await self.stats_cache.set(user_id, section, sections[section][0], text)
+
+        return STATISTICS_HEADER + "".join(texts[section] for section in StatsSection)
@@ -1,15 +1,22 @@
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+from decimal import Decimal
 from typing import List, Dict, Optional
-from sqlalchemy import func
+from sqlalchemy import case, exists, func, select
 from sqlalchemy import distinct
 
-from src.models.workout import Exercise
+from src.models.workout import Exercise, ExerciseAggregate, PersonalRecord
+from src.services.personal_records import PersonalRecordService
+from src.services.workout_analytics import WorkoutAnalyticsService
+from src.utils.pagination import Cursor, Page, keyset_page
+from src.utils.sql import dialect_insert, greatest
 
 
 class ExerciseService:
    """Сервис для работы с тренировками"""
    def __init__(self, db_service):
        self.db = db_service
+       self.records = PersonalRecordService(db_service)
+       self.analytics = WorkoutAnalyticsService(db_service)
 
    async def add_exercise(
        self,
@@ -19,9 +26,9 @@ class ExerciseService:
        reps: int,
        sets: int,
        workout_date: datetime
-   ) -> Exercise:
+   ) -> tuple[Exercise, List[str]]:
        """
-       Добавление нового упражнения
+       Добавление нового упражнения с проверкой личных рекордов
        
        :param user_id: ID пользователя
        :param name: Название упражнения
@@ -29,9 +36,9 @@ class ExerciseService:
        :param reps: Количество повторений
        :param sets: Количество подходов
        :param workout_date: Дата тренировки
-       :return: Созданная запись упражнения
+       :return: (запись упражнения, названия побитых рекордов)
        """
-       with self.db.get_session() as session:
+       async with self.db.get_session() as session:
            exercise = Exercise(
                user_id=user_id,
                name=name.strip().lower(),  # Нормализуем название
@@ -41,7 +48,73 @@ class ExerciseService:
                workout_date=workout_date
            )
            session.add(exercise)
-           return exercise
+           
+           # Обновляем накопленные показатели и рекорды в той же транзакции
+           await self._update_aggregate(session, exercise)
+           new_records = await self.records.apply(session, exercise)
+           return exercise, new_records
+
+   async def _update_aggregate(self, session, exercise: Exercise):
+       """
+       Атомарное обновление накопленных показателей упражнения
+       
+       :param session: Текущая сессия
+       :param exercise: Новая запись упражнения
+       """
+       weight = Decimal(str(exercise.weight)) if exercise.weight is not None else None
+       volume = (weight or 0) * (exercise.reps or 0) * (exercise.sets or 0)
+       
+       # Новый день с этим упражнением - новая тренировка, в том числе задним числом.
+       # Запись еще не сброшена в БД и сама себя не находит
+       day_start = datetime.combine(exercise.workout_date.date(), time())
+       with session.no_autoflush:
+           day_counted = await session.scalar(
+               select(exists().where(
+                   Exercise.user_id == exercise.user_id,
+                   Exercise.name == exercise.name,
+                   Exercise.workout_date >= day_start,
+                   Exercise.workout_date < day_start + timedelta(days=1)
+               ))
+           )
+       
+       statement = dialect_insert(self.db.dialect_name)(ExerciseAggregate).values(
+           user_id=exercise.user_id,
+           name=exercise.name,
+           last_weight=weight,
+           prev_weight=None,
+           last_workout_date=exercise.workout_date,
+           max_weight=weight,
+           reps_sum=exercise.reps or 0,
+           reps_count=1 if exercise.reps is not None else 0,
+           total_volume=volume,
+           sessions_count=0 if day_counted else 1,
+           last_session_date=exercise.workout_date.date()
+       )
+       excluded = statement.excluded
+       aggregate = ExerciseAggregate
+       
+       # Запись задним числом не меняет "последние" значения
+       is_latest = excluded.last_workout_date >= aggregate.last_workout_date
+       
+       def latest(column):
+           return case((is_latest, excluded[column.key]), else_=column)
+       
+       statement = statement.on_conflict_do_update(
+           index_elements=['user_id', 'name'],
+           set_={
+               'prev_weight': case((is_latest, aggregate.last_weight), else_=aggregate.prev_weight),
+               'last_weight': latest(aggregate.last_weight),
+               'last_workout_date': latest(aggregate.last_workout_date),
+               'last_session_date': latest(aggregate.last_session_date),
+               'max_weight': greatest(aggregate.max_weight, excluded.max_weight, self.db.dialect_name),
+               'reps_sum': aggregate.reps_sum + excluded.reps_sum,
+               'reps_count': aggregate.reps_count + excluded.reps_count,
+               'total_volume': aggregate.total_volume + excluded.total_volume,
+               'sessions_count': aggregate.sessions_count + excluded.sessions_count,
+               'updated_at': datetime.utcnow()
+           }
+       )
+       await session.execute(statement)
 
    async def get_exercise_stats(
        self,
@@ -51,40 +124,37 @@ class ExerciseService:
        """
        Получение статистики по конкретному упражнению
        
+       Читает одну строку накопленных показателей по уникальному индексу.
+       
        :param user_id: ID пользователя
        :param exercise_name: Название упражнения
        :return: Словарь со статистикой
        """
-       with self.db.get_session() as session:
-           # Нормализуем название упражнения
-           exercise_name = exercise_name.strip().lower()
-           
-           # Получаем последнюю запись перед текущей
-           prev_exercise = session.query(Exercise).filter(
-               Exercise.user_id == user_id,
-               Exercise.name == exercise_name,
-               Exercise.workout_date < datetime.utcnow()
-           ).order_by(
-               Exercise.workout_date.desc()
-           ).first()
-           
-           # Получаем максимальный вес
-           max_weight = session.query(func.max(Exercise.weight)).filter(
-               Exercise.user_id == user_id,
-               Exercise.name == exercise_name
-           ).scalar()
-           
-           # Получаем среднее количество повторений
-           avg_reps = session.query(func.avg(Exercise.reps)).filter(
-               Exercise.user_id == user_id,
-               Exercise.name == exercise_name
-           ).scalar()
-           
+       async with self.db.get_session() as session:
+           aggregate = await session.scalar(
+               select(ExerciseAggregate).where(
+                   ExerciseAggregate.user_id == user_id,
+                   ExerciseAggregate.name == exercise_name.strip().lower()
+               )
+           )
+       
+       if not aggregate:
            return {
-               'prev_weight': prev_exercise.weight if prev_exercise else None,
-               'max_weight': max_weight,
-               'avg_reps': round(avg_reps) if avg_reps else None
+               'prev_weight': None,
+               'max_weight': None,
+               'avg_reps': None,
+               'total_volume': Decimal('0'),
+               'sessions_count': 0
            }
+       
+       return {
+           # Вес в записи перед последней
+           'prev_weight': aggregate.prev_weight,
+           'max_weight': aggregate.max_weight,
+           'avg_reps': round(aggregate.reps_sum / aggregate.reps_count) if aggregate.reps_count else None,
+           'total_volume': aggregate.total_volume,
+           'sessions_count': aggregate.sessions_count
+       }
 
    async def get_user_stats(self, user_id: int) -> Dict:
        """
@@ -93,34 +163,40 @@ class ExerciseService:
        :param user_id: ID пользователя
        :return: Словарь со статистикой
        """
-       with self.db.get_session() as session:
+       async with self.db.get_session() as session:
            # Последние упражнения
-           recent_exercises = session.query(Exercise).filter(
-               Exercise.user_id == user_id
-           ).order_by(
-               Exercise.workout_date.desc()
-           ).limit(5).all()
+           recent_exercises = (await session.scalars(
+               select(Exercise).where(
+                   Exercise.user_id == user_id
+               ).order_by(
+                   Exercise.workout_date.desc()
+               ).limit(5)
+           )).all()
            
-           # Максимальные веса по каждому упражнению
-           max_weights_query = session.query(
-               Exercise.name,
-               func.max(Exercise.weight).label('max_weight')
-           ).filter(
-               Exercise.user_id == user_id
-           ).group_by(
-               Exercise.name
-           ).all()
+           # Максимальные веса по каждому упражнению из таблицы рекордов
+           max_weights_query = await session.execute(
+               select(
+                   PersonalRecord.name,
+                   func.max(PersonalRecord.best_weight).label('max_weight')
+               ).where(
+                   PersonalRecord.user_id == user_id
+               ).group_by(
+                   PersonalRecord.name
+               )
+           )
            
-           max_weights = {ex.name: weight for ex, weight in max_weights_query}
+           max_weights = {name: weight for name, weight in max_weights_query}
            
            # Количество тренировок за последний месяц
            month_ago = datetime.utcnow() - timedelta(days=30)
-           workouts_count = session.query(
-               func.count(distinct(Exercise.workout_date))
-           ).filter(
-               Exercise.user_id == user_id,
-               Exercise.workout_date >= month_ago
-           ).scalar()
+           workouts_count = await session.scalar(
+               select(
+                   func.count(distinct(Exercise.workout_date))
+               ).where(
+                   Exercise.user_id == user_id,
+                   Exercise.workout_date >= month_ago
+               )
+           )
            
            return {
                'recent_exercises': recent_exercises,
@@ -142,21 +218,45 @@ class ExerciseService:
        :param limit: Ограничение количества записей (опционально)
        :return: Список упражнений
        """
-       with self.db.get_session() as session:
-           query = session.query(Exercise).filter(
+       async with self.db.get_session() as session:
+           query = select(Exercise).where(
                Exercise.user_id == user_id
            )
            
            if days:
                start_date = datetime.utcnow() - timedelta(days=days)
-               query = query.filter(Exercise.workout_date >= start_date)
+               query = query.where(Exercise.workout_date >= start_date)
            
            query = query.order_by(Exercise.workout_date.desc())
            
            if limit:
                query = query.limit(limit)
            
-           return query.all()
+           return (await session.scalars(query)).all()
+
+   async def get_history_page(
+       self,
+       user_id: int,
+       cursor: Optional[Cursor] = None,
+       limit: int = 10
+   ) -> Page:
+       """
+       Страница истории тренировок (от новых записей к старым)
+       
+       :param user_id: ID пользователя
+       :param cursor: Курсор страницы (по умолчанию - первая страница)
+       :param limit: Количество записей на странице
+       :return: Страница упражнений
+       """
+       async with self.db.get_session() as session:
+           return await keyset_page(
+               session,
+               select(Exercise).where(Exercise.user_id == user_id),
+               Exercise.workout_date,
+               Exercise.id,
+               cursor,
+               limit
+           )
 
    async def get_exercise_progress(
        self,
@@ -172,28 +272,28 @@ class ExerciseService:
        :param days: Количество дней для анализа
        :return: Список с данными о прогрессе
        """
-       with self.db.get_session() as session:
-           start_date = datetime.utcnow() - timedelta(days=days)
-           
-           exercises = session.query(Exercise).filter(
-               Exercise.user_id == user_id,
-               Exercise.name == exercise_name.strip().lower(),
-               Exercise.workout_date >= start_date
-           ).order_by(
-               Exercise.workout_date
-           ).all()
-           
-           progress = []
-           for exercise in exercises:
-               progress.append({
-                   'date': exercise.workout_date.strftime('%d.%m.%Y'),
-                   'weight': exercise.weight,
-                   'reps': exercise.reps,
-                   'sets': exercise.sets,
-                   'total_volume': exercise.weight * exercise.reps * exercise.sets
-               })
-           
-           return progress
+       series = await self.analytics.load_series(user_id, exercise_name, days)
+       progress = self.analytics.compute(series)
+       
+       dates = series.dates.astype(datetime)
+       return [
+           {
+               'date': date.strftime('%d.%m.%Y'),
+               'weight': weight,
+               'reps': int(reps),
+               'sets': int(sets),
+               'total_volume': total_volume,
+               'e1rm': e1rm
+           }
+           for date, weight, reps, sets, total_volume, e1rm in zip(
+               dates,
+               series.weight.tolist(),
+               series.reps.tolist(),
+               series.sets.tolist(),
+               progress['volume'].tolist(),
+               progress['e1rm_epley'].tolist()
+           )
+       ]
 
    async def get_user_top_exercises(
        self,
@@ -203,28 +303,43 @@ class ExerciseService:
        """
        Получение топ упражнений пользователя по максимальному весу
        
+       Читает таблицу рекордов и накопленные показатели упражнений.
+       
        :param user_id: ID пользователя
        :param limit: Количество упражнений
        :return: Список топ упражнений
        """
-       with self.db.get_session() as session:
-           top_exercises = session.query(
-               Exercise.name,
-               func.max(Exercise.weight).label('max_weight'),
-               func.count(Exercise.id).label('total_sets')
-           ).filter(
-               Exercise.user_id == user_id
+       async with self.db.get_session() as session:
+           records = select(
+               PersonalRecord.name,
+               func.max(PersonalRecord.best_weight).label('max_weight'),
+               func.max(PersonalRecord.best_e1rm).label('best_e1rm')
+           ).where(
+               PersonalRecord.user_id == user_id
            ).group_by(
-               Exercise.name
-           ).order_by(
-               func.max(Exercise.weight).desc()
-           ).limit(limit).all()
+               PersonalRecord.name
+           ).subquery()
+           
+           top_exercises = (await session.execute(
+               select(
+                   records.c.name,
+                   records.c.max_weight,
+                   records.c.best_e1rm,
+                   ExerciseAggregate.reps_count.label('total_sets')
+               ).outerjoin(
+                   ExerciseAggregate,
+                   (ExerciseAggregate.user_id == user_id) & (ExerciseAggregate.name == records.c.name)
+               ).order_by(
+                   records.c.max_weight.desc()
+               ).limit(limit)
+           )).all()
            
            return [
                {
                    'name': exercise.name,
                    'max_weight': exercise.max_weight,
-                   'total_sets': exercise.total_sets
+                   'best_e1rm': exercise.best_e1rm,
+                   'total_sets': exercise.total_sets or 0
                }
                for exercise in top_exercises
-           ]
\ No newline at end of file
+           ]
@@ -0,0 +1,240 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from src.models.workout import Exercise
+
+
+# Даты переводятся в секунды от эпохи вручную: np.array(datetime, 'datetime64')
+# разбирает каждый объект и на длинной истории медленнее в разы
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+@dataclass
+class ExerciseSeries:
+    """Записи упражнений пользователя в виде столбцов, по возрастанию даты"""
+    dates: np.ndarray    # datetime64[s]
+    weight: np.ndarray   # float64, кг
+    reps: np.ndarray     # float64
+    sets: np.ndarray     # float64
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @classmethod
+    def from_rows(cls, rows) -> 'ExerciseSeries':
+        """
+        Построение серии из строк (дата, вес, повторения, подходы)
+
+        Пустые вес, повторения и подходы считаются нулями.
+        """
+        if not rows:
+            return cls(
+                dates=np.array([], dtype='datetime64[s]'),
+                weight=np.array([], dtype=np.float64),
+                reps=np.array([], dtype=np.float64),
+                sets=np.array([], dtype=np.float64)
+            )
+
+        dates, weight, reps, sets = zip(*rows)
+
+        def numbers(values):
+            return np.nan_to_num(np.array(values, dtype=np.float64))
+
+        seconds = np.fromiter(((date - _EPOCH) // _SECOND for date in dates), dtype=np.int64, count=len(dates))
+        return cls(
+            dates=seconds.astype('datetime64[s]'),
+            weight=numbers(weight),
+            reps=numbers(reps),
+            sets=numbers(sets)
+        )
+
+
+def volume(series: ExerciseSeries) -> np.ndarray:
+    """Объем записи: вес × повторения × подходы"""
+    return series.weight * series.reps * series.sets
+
+
+def epley_1rm(weight: np.ndarray, reps: np.ndarray) -> np.ndarray:
+    """Расчетный 1ПМ по формуле Эпли: w × (1 + r / 30), для одного повторения - сам вес"""
+    return np.where(reps <= 1, weight, weight * (1 + reps / 30))
+
+
+def brzycki_1rm(weight: np.ndarray, reps: np.ndarray) -> np.ndarray:
+    """
+    Расчетный 1ПМ по формуле Бжицки: w × 36 / (37 - r)
+
+    Формула применима до 36 повторений, для большего числа - NaN.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        estimate = weight * 36 / (37 - reps)
+    return np.where(reps < 37, np.where(reps <= 1, weight, estimate), np.nan)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Скользящее среднее по window последним значениям
+
+    Первые window - 1 значений усредняются по имеющимся точкам.
+    """
+    if len(values) == 0:
+        return values.astype(np.float64)
+
+    cumulative = np.cumsum(np.insert(values.astype(np.float64), 0, 0.0))
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    ends = np.arange(1, len(values) + 1)
+    return (cumulative[ends] - cumulative[ends - counts]) / counts
+
+
+def daily_load(dates: np.ndarray, load: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Суммарная нагрузка по календарным дням без пропусков
+
+    :return: (дни datetime64[D], нагрузка за день)
+    """
+    if len(dates) == 0:
+        return np.array([], dtype='datetime64[D]'), np.array([], dtype=np.float64)
+
+    days = dates.astype('datetime64[D]')
+    first = days.min()
+    offsets = (days - first).astype(np.int64)
+    totals = np.bincount(offsets, weights=load)
+    return first + np.arange(len(totals)), totals
+
+
+def weekly_tonnage(dates: np.ndarray, load: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Тоннаж по неделям (с понедельника)
+
+    :return: (понедельники datetime64[D], тоннаж недели) для недель с тренировками
+    """
+    if len(dates) == 0:
+        return np.array([], dtype='datetime64[D]'), np.array([], dtype=np.float64)
+
+    days = dates.astype('datetime64[D]')
+    # 1970-01-01 - четверг, сдвигаем так, чтобы неделя начиналась с понедельника
+    weeks = (days.astype(np.int64) + 3) // 7
+    week_ids, inverse = np.unique(weeks, return_inverse=True)
+    totals = np.bincount(inverse, weights=load)
+    mondays = (week_ids * 7 - 3).astype('datetime64[D]')
+    return mondays, totals
+
+
+def acute_chronic_ratio(
+    dates: np.ndarray,
+    load: np.ndarray,
+    acute_days: int = 7,
+    chronic_days: int = 28
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Отношение острой нагрузки к хронической (ACWR) по дням
+
+    Острая нагрузка - средняя дневная нагрузка за acute_days,
+    хроническая - за chronic_days. Пока хронического окна не накоплено
+    или оно нулевое, отношение не определено (NaN).
+
+    :return: (дни datetime64[D], ACWR)
+    """
+    days, totals = daily_load(dates, load)
+    if len(days) == 0:
+        return days, totals
+
+    cumulative = np.cumsum(np.insert(totals, 0, 0.0))
+    ends = np.arange(1, len(totals) + 1)
+
+    def window_mean(size: int) -> np.ndarray:
+        starts = np.maximum(ends - size, 0)
+        return (cumulative[ends] - cumulative[starts]) / size
+
+    acute = window_mean(acute_days)
+    chronic = window_mean(chronic_days)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where((ends >= chronic_days) & (chronic > 0), acute / chronic, np.nan)
+    return days, ratio
+
+
+class WorkoutAnalyticsService:
+    """
+    Векторизованная аналитика прогресса тренировок
+
+    История упражнения загружается одним запросом в столбцы NumPy,
+    все показатели считаются без циклов по записям.
+    """
+    def __init__(self, db_service):
+        self.db = db_service
+
+    async def load_series(
+        self,
+        user_id: int,
+        exercise_name: Optional[str] = None,
+        days: Optional[int] = None
+    ) -> ExerciseSeries:
+        """
+        Загрузка истории упражнений пользователя
+
+        :param user_id: ID пользователя
+        :param exercise_name: Название упражнения (по умолчанию - все упражнения)
+        :param days: Количество дней (по умолчанию - вся история)
+        :return: Серия по возрастанию даты
+        """
+        query = select(
+            Exercise.workout_date,
+            Exercise.weight,
+            Exercise.reps,
+            Exercise.sets
+        ).where(
+            Exercise.user_id == user_id
+        )
+        if exercise_name:
+            query = query.where(Exercise.name == exercise_name.strip().lower())
+        if days:
+            query = query.where(Exercise.workout_date >= datetime.utcnow() - timedelta(days=days))
+
+        async with self.db.get_session() as session:
+            rows = (await session.execute(
+                query.order_by(Exercise.workout_date, Exercise.id)
+            )).all()
+
+        return ExerciseSeries.from_rows(rows)
+
+    async def get_progress(
+        self,
+        user_id: int,
+        exercise_name: Optional[str] = None,
+        days: Optional[int] = None,
+        rolling_window: int = 5
+    ) -> Dict[str, np.ndarray]:
+        """
+        Показатели прогресса по истории упражнений
+
+        :param user_id: ID пользователя
+        :param exercise_name: Название упражнения (по умолчанию - все упражнения)
+        :param days: Количество дней (по умолчанию - вся история)
+        :param rolling_window: Окно скользящего среднего 1ПМ, записей
+        :return: Словарь столбцов: по записям, по неделям и по дням
+        """
+        series = await self.load_series(user_id, exercise_name, days)
+        return self.compute(series, rolling_window)
+
+    @staticmethod
+    def compute(series: ExerciseSeries, rolling_window: int = 5) -> Dict[str, np.ndarray]:
+        """Расчет всех показателей для серии"""
+        load = volume(series)
+        e1rm = epley_1rm(series.weight, series.reps)
+        weeks, tonnage = weekly_tonnage(series.dates, load)
+        days, acwr = acute_chronic_ratio(series.dates, load)
+        return {
+            'dates': series.dates,
+            'volume': load,
+            'e1rm_epley': e1rm,
+            'e1rm_brzycki': brzycki_1rm(series.weight, series.reps),
+            'e1rm_rolling': rolling_mean(e1rm, rolling_window),
+            'volume_rolling': rolling_mean(load, rolling_window),
+            'weeks': weeks,
+            'weekly_tonnage': tonnage,
+            'days': days,
+            'acwr': acwr
+        }
@@ -0,0 +1,127 @@
+import io
+from datetime import datetime, timedelta
+from typing import Sequence
+
+import numpy as np
+from matplotlib.figure import Figure
+
+
+# Функции модуля выполняются в процессах пула отрисовки, поэтому принимают
+# и возвращают только сериализуемые значения (массивы numpy и байты PNG)
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def to_seconds(dates: Sequence[datetime]) -> np.ndarray:
+    """Даты в секунды от эпохи (int64)"""
+    return np.fromiter(((date - _EPOCH) // _SECOND for date in dates), dtype=np.int64, count=len(dates))
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Прореживание ряда методом Largest-Triangle-Three-Buckets
+
+    Первая и последняя точки сохраняются, из каждой промежуточной корзины
+    берется точка, образующая наибольший треугольник с выбранной точкой
+    предыдущей корзины и средним следующей, поэтому пики не теряются.
+
+    :param x: Значения по оси X по возрастанию
+    :param y: Значения по оси Y
+    :param threshold: Количество точек в результате
+    :return: Индексы выбранных точек
+    """
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    every = (size - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = size - 1
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = size - 1
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else size
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+
+        areas = np.abs(
+            (x[selected] - next_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (next_y - y[selected])
+        )
+        selected = start + int(areas.argmax())
+        indices[bucket + 1] = selected
+    return indices
+
+
+def _to_png(figure: Figure) -> bytes:
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def render_weight_chart(seconds: np.ndarray, weights: np.ndarray, max_points: int = 500) -> bytes:
+    """
+    График веса
+
+    :param seconds: Время измерений в секундах от эпохи, по возрастанию
+    :param weights: Вес, кг
+    :param max_points: Максимум точек на графике
+    :return: PNG
+    """
+    indices = lttb(seconds, weights, max_points)
+    dates = seconds[indices].astype('datetime64[s]')
+
+    figure = Figure(figsize=(8, 4), dpi=100, layout='constrained')
+    axes = figure.subplots()
+    axes.plot(dates, weights[indices], marker='o' if len(indices) <= 60 else None, markersize=3)
+    axes.set_title('Вес')
+    axes.set_ylabel('кг')
+    axes.grid(alpha=0.3)
+    axes.tick_params(axis='x', labelrotation=30)
+    return _to_png(figure)
+
+
+def render_sleep_chart(
+    seconds: np.ndarray,
+    durations: np.ndarray,
+    bedtimes: np.ndarray,
+    max_points: int = 500
+) -> bytes:
+    """
+    Анализ сна: продолжительность и время засыпания
+
+    :param seconds: Время засыпания в секундах от эпохи, по возрастанию
+    :param durations: Продолжительность сна, часов
+    :param bedtimes: Время засыпания в часах со сдвигом суток на 12 часов (0-24)
+    :param max_points: Максимум точек на графике
+    :return: PNG
+    """
+    indices = lttb(seconds, durations, max_points)
+    dates = seconds[indices].astype('datetime64[s]')
+
+    figure = Figure(figsize=(8, 6), dpi=100, layout='constrained')
+    duration_axes, bedtime_axes = figure.subplots(2, 1, sharex=True)
+
+    duration_axes.plot(dates, durations[indices])
+    duration_axes.axhline(float(np.median(durations)), linestyle='--', color='gray', label='медиана')
+    duration_axes.set_title('Продолжительность сна')
+    duration_axes.set_ylabel('ч')
+    duration_axes.legend(loc='upper left')
+    duration_axes.grid(alpha=0.3)
+
+    bedtime_axes.scatter(dates, bedtimes[indices], s=8)
+    bedtime_axes.set_title('Время засыпания')
+    # Ось подписывается реальным временем суток, а не сдвинутым
+    ticks = np.arange(0, 25, 3)
+    bedtime_axes.set_yticks(ticks, [f"{(tick + 12) % 24:02d}:00" for tick in ticks])
+    bedtime_axes.invert_yaxis()
+    bedtime_axes.grid(alpha=0.3)
+    bedtime_axes.tick_params(axis='x', labelrotation=30)
+    return _to_png(figure)
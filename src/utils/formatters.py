@@ -0,0 +1,95 @@
+from typing import Iterable
+
+
+STATISTICS_HEADER = "📊 Ваша статистика:\n\n"
+
+
+def format_finances_section(expenses_stats: dict) -> str:
+    """Раздел статистики с балансом за месяц (income, expenses, balance)"""
+    section = "💰 Финансы (текущий месяц):\n"
+    section += f"• Доходы: {expenses_stats['income']:,.2f} ₽\n"
+    section += f"• Расходы: {expenses_stats['expenses']:,.2f} ₽\n"
+    section += f"• Баланс: {expenses_stats['balance']:+,.2f} ₽\n\n"
+    return section
+
+
+def format_weight_section(weight_stats: dict) -> str:
+    """Раздел статистики веса (current_weight, week_start_weight, опционально trend_weight)"""
+    if not weight_stats['current_weight']:
+        return ""
+
+    section = "⚖️ Вес:\n"
+    section += f"• Текущий: {weight_stats['current_weight']} кг\n"
+    if weight_stats.get('trend_weight') is not None:
+        section += f"• Тренд: {weight_stats['trend_weight']:.1f} кг\n"
+    if weight_stats['week_start_weight']:
+        change = weight_stats['current_weight'] - weight_stats['week_start_weight']
+        section += f"• Изменение за неделю: {change:+.1f} кг\n\n"
+    return section
+
+
+def format_sleep_section(sleep_stats: dict) -> str:
+    """Раздел статистики сна (avg_duration, records_count, опционально bedtime_deviation)"""
+    if not sleep_stats['avg_duration']:
+        return ""
+
+    section = "😴 Сон:\n"
+    section += f"• Средняя продолжительность: {sleep_stats['avg_duration']:.1f} ч\n"
+    if sleep_stats.get('bedtime_deviation') is not None:
+        section += f"• Разброс времени засыпания: ±{sleep_stats['bedtime_deviation']:.0f} мин\n"
+    section += f"• Записей за неделю: {sleep_stats['records_count']}\n\n"
+    return section
+
+
+def format_goals_section(goals: Iterable) -> str:
+    """Раздел активных целей (title, start_value, current_value, target_value)"""
+    if not goals:
+        return ""
+
+    section = "🎯 Активные цели:\n"
+    for goal in goals:
+        progress = (goal.current_value - goal.start_value) / \
+                  (goal.target_value - goal.start_value) * 100 if goal.target_value != goal.start_value else 0
+        section += f"• {goal.title}: {abs(progress):.1f}%\n"
+    return section
+
+
+def format_goal_completed(goal) -> str:
+    """Поздравление с достижением цели (title, goal_type, target_value)"""
+    unit = "кг" if goal.goal_type == "weight" else "₽"
+    return f"🎉 Цель «{goal.title}» достигнута: {goal.target_value:,.2f} {unit}!"
+
+
+def format_expired_goals(goals: Iterable) -> str:
+    """Уведомление об истекших целях (title, start_value, current_value, target_value, deadline)"""
+    text = "⌛ Срок цели истек:\n" if len(goals) == 1 else "⌛ Срок целей истек:\n"
+    for goal in goals:
+        progress = (goal.current_value - goal.start_value) / \
+                  (goal.target_value - goal.start_value) * 100 if goal.target_value != goal.start_value else 0
+        text += f"• {goal.title} (до {goal.deadline:%d.%m.%Y}): достигнуто {abs(progress):.1f}%\n"
+    text += "\nПоставьте новую цель командой /new_goal"
+    return text
+
+
+def format_user_statistics(
+    expenses_stats: dict,
+    weight_stats: dict,
+    sleep_stats: dict,
+    goals: Iterable
+) -> str:
+    """
+    Формирование текста общей статистики пользователя
+
+    :param expenses_stats: Баланс за месяц (income, expenses, balance)
+    :param weight_stats: Статистика веса (current_weight, week_start_weight)
+    :param sleep_stats: Статистика сна (avg_duration, records_count)
+    :param goals: Активные цели (title, start_value, current_value, target_value)
+    :return: Текст статистики
+    """
+    return (
+        STATISTICS_HEADER
+        + format_finances_section(expenses_stats)
+        + format_weight_section(weight_stats)
+        + format_sleep_section(sleep_stats)
+        + format_goals_section(goals)
+    )
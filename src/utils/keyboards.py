@@ -1,5 +1,9 @@
+from functools import lru_cache
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from src.utils.pagination import Page
+
 class KeyboardFactory:
     """Фабрика клавиатур для бота"""
     
@@ -107,4 +111,42 @@ class KeyboardFactory:
             [
                 InlineKeyboardButton(text="◀️ Назад", callback_data="menu:main")
             ]
-        ])
\ No newline at end of file
+        ])
+
+    @staticmethod
+    @lru_cache(maxsize=10000)
+    def get_categories_keyboard(categories: tuple) -> InlineKeyboardMarkup:
+        """
+        Клавиатура выбора категории транзакции
+        
+        Клавиатура кэшируется по содержимому списка категорий: пока список
+        не изменился, повторно используется уже собранная разметка.
+        
+        :param categories: Кортеж категорий (id, name)
+        """
+        return InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text=category.name, callback_data=f"cat:{category.id}")]
+            for category in categories
+        ] + [[InlineKeyboardButton(text="➕ Новая категория", callback_data="new_category")]])
+
+    @staticmethod
+    def get_pagination_keyboard(prefix: str, page: Page, back_callback: str) -> InlineKeyboardMarkup:
+        """
+        Навигация по страницам истории
+        
+        Курсор соседней страницы записывается в callback data кнопки
+        в виде "<prefix>:<курсор>".
+        
+        :param prefix: Префикс callback data раздела
+        :param page: Текущая страница
+        :param back_callback: Callback data кнопки возврата
+        """
+        navigation = []
+        if page.newer:
+            navigation.append(InlineKeyboardButton(text="◀️", callback_data=f"{prefix}:{page.newer.encode()}"))
+        if page.older:
+            navigation.append(InlineKeyboardButton(text="▶️", callback_data=f"{prefix}:{page.older.encode()}"))
+        
+        rows = [navigation] if navigation else []
+        rows.append([InlineKeyboardButton(text="◀️ Назад", callback_data=back_callback)])
+        return InlineKeyboardMarkup(inline_keyboard=rows)
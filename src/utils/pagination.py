@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from sqlalchemy import tuple_
+
+
+CURSOR_DATE_FORMAT = '%Y%m%d%H%M%S%f'
+
+
+class Direction(str, Enum):
+    """Направление листания истории (новые записи идут первыми)"""
+    OLDER = "o"
+    NEWER = "n"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    Позиция в истории: ключ (дата, id) граничной записи страницы
+
+    Курсор целиком передается в callback data, поэтому страница
+    строится одним запросом по индексу без OFFSET.
+    """
+    date: datetime
+    id: int
+    direction: Direction = Direction.OLDER
+
+    def encode(self) -> str:
+        """Компактная строка для callback data (лимит Telegram - 64 байта)"""
+        return f"{self.direction.value}:{self.date.strftime(CURSOR_DATE_FORMAT)}:{self.id}"
+
+    @classmethod
+    def decode(cls, value: str) -> Optional['Cursor']:
+        """Разбор курсора из callback data, None - первая страница"""
+        try:
+            direction, date, row_id = value.split(':')
+            return cls(datetime.strptime(date, CURSOR_DATE_FORMAT), int(row_id), Direction(direction))
+        except ValueError:
+            return None
+
+
+@dataclass
+class Page:
+    """Страница истории и курсоры соседних страниц"""
+    items: list
+    older: Optional[Cursor] = None
+    newer: Optional[Cursor] = None
+
+
+async def keyset_page(
+    session,
+    query,
+    date_column,
+    id_column,
+    cursor: Optional[Cursor] = None,
+    limit: int = 10
+) -> Page:
+    """
+    Страница выборки по ключу (дата, id), от новых записей к старым
+
+    Запрашивается на одну запись больше лимита, чтобы узнать, есть ли
+    следующая страница в направлении листания. Первым элементом строки
+    результата должна быть запись, у которой читаются дата и id.
+
+    :param session: Текущая сессия
+    :param query: SELECT с фильтрами, без сортировки и лимита
+    :param date_column: Колонка даты ключа
+    :param id_column: Колонка id ключа
+    :param cursor: Курсор страницы (по умолчанию - первая страница)
+    :param limit: Количество записей на странице
+    :return: Страница
+    """
+    key = tuple_(date_column, id_column)
+    if cursor is None or cursor.direction == Direction.OLDER:
+        if cursor is not None:
+            query = query.where(key < tuple_(cursor.date, cursor.id))
+        query = query.order_by(date_column.desc(), id_column.desc())
+    else:
+        query = query.where(key > tuple_(cursor.date, cursor.id))
+        query = query.order_by(date_column.asc(), id_column.asc())
+
+    rows = list((await session.execute(query.limit(limit + 1))).all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if cursor is not None and cursor.direction == Direction.NEWER:
+        rows.reverse()
+
+    def position(row, direction: Direction) -> Cursor:
+        record = row[0]
+        return Cursor(getattr(record, date_column.key), getattr(record, id_column.key), direction)
+
+    items: List = [row if len(row) > 1 else row[0] for row in rows]
+    if not rows:
+        return Page(items=items)
+
+    going_newer = cursor is not None and cursor.direction == Direction.NEWER
+    has_older = has_more if not going_newer else True
+    has_newer = cursor is not None if not going_newer else has_more
+    return Page(
+        items=items,
+        older=position(rows[-1], Direction.OLDER) if has_older else None,
+        newer=position(rows[0], Direction.NEWER) if has_newer else None
+    )
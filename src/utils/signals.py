@@ -0,0 +1,15 @@
+import asyncio
+import signal
+
+
+def shutdown_event() -> asyncio.Event:
+    """Событие остановки процесса по SIGINT/SIGTERM"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows: остановка по KeyboardInterrupt
+            pass
+    return stop
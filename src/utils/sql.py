@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from sqlalchemy import Date, Integer, cast, func
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def hours_between(start, end, dialect_name: str):
+    """
+    SQL-выражение для разницы между двумя датами в часах
+
+    :param start: Колонка или выражение начала интервала
+    :param end: Колонка или выражение конца интервала
+    :param dialect_name: Диалект БД (postgresql, sqlite)
+    :return: Выражение SQLAlchemy
+    """
+    if dialect_name == 'sqlite':
+        return (func.julianday(end) - func.julianday(start)) * 24
+    return func.extract('epoch', end - start) / 3600
+
+
+def minutes_of_day(column, dialect_name: str, offset: int = 0):
+    """
+    SQL-выражение для времени суток в минутах (0-1439)
+
+    :param column: Колонка с датой и временем
+    :param dialect_name: Диалект БД (postgresql, sqlite)
+    :param offset: Сдвиг в минутах, переносит границу суток с полуночи
+    :return: Выражение SQLAlchemy с типом Integer
+    """
+    if dialect_name == 'sqlite':
+        minutes = cast(func.strftime('%H', column), Integer) * 60 + cast(func.strftime('%M', column), Integer)
+    else:
+        minutes = cast(func.extract('hour', column) * 60 + func.extract('minute', column), Integer)
+    if offset:
+        return (minutes + offset) % 1440
+    return minutes
+
+
+def date_of(column, dialect_name: str, offset: int = 0):
+    """
+    SQL-выражение для календарного дня даты
+
+    :param column: Колонка с датой и временем
+    :param dialect_name: Диалект БД (postgresql, sqlite)
+    :param offset: Сдвиг в минутах, переносит границу суток с полуночи
+    :return: Выражение SQLAlchemy с типом Date
+    """
+    if dialect_name == 'sqlite':
+        if offset:
+            return func.date(column, f'{offset:+d} minutes', type_=Date)
+        return func.date(column, type_=Date)
+    if offset:
+        column = column + timedelta(minutes=offset)
+    return cast(column, Date)
+
+
+def month_start(column, dialect_name: str):
+    """
+    SQL-выражение для первого дня месяца даты
+
+    :param column: Колонка с датой и временем
+    :param dialect_name: Диалект БД (postgresql, sqlite)
+    :return: Выражение SQLAlchemy с типом Date
+    """
+    if dialect_name == 'sqlite':
+        return func.date(column, 'start of month', type_=Date)
+    return cast(func.date_trunc('month', column), Date)
+
+
+def greatest(first, second, dialect_name: str):
+    """
+    SQL-выражение для большего из двух значений (NULL игнорируется)
+
+    :param first: Первое выражение
+    :param second: Второе выражение
+    :param dialect_name: Диалект БД (postgresql, sqlite)
+    :return: Выражение SQLAlchemy
+    """
+    if dialect_name == 'sqlite':
+        # Скалярный max() в SQLite возвращает NULL, если NULL любой аргумент
+        return func.max(func.coalesce(first, second), func.coalesce(second, first))
+    return func.greatest(first, second)
+
+
+def dialect_insert(dialect_name: str):
+    """
+    Конструктор INSERT с поддержкой ON CONFLICT для диалекта БД
+
+    :param dialect_name: Диалект БД (postgresql, sqlite)
+    :return: Функция insert() диалекта
+    """
+    if dialect_name == 'sqlite':
+        return sqlite.insert
+    return postgresql.insert
@@ -0,0 +1,14 @@
+import asyncio
+from src.bot.config import Config
+from src.bot.worker import JobWorker
+
+async def main():
+   # Загрузка конфигурации
+   config = Config()
+   
+   # Создание и запуск воркера фоновых заданий
+   worker = JobWorker(config)
+   await worker.start()
+
+if __name__ == "__main__":
+   asyncio.run(main())
\ No newline at end of file